@@ -6,6 +6,8 @@ Comprehensive testing suite to evaluate AGENT against leading LLMs
 
 import asyncio
 import json
+import os
+import sys
 import time
 import statistics
 from typing import Dict, List, Any, Optional, Tuple
@@ -19,7 +21,10 @@ from groq import Groq
 import ollama
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+from memory.embedder_registry import get_embedder_registry
 
 @dataclass
 class BenchmarkResult:
@@ -80,8 +85,13 @@ class AGENTBenchmarkFramework:
             "safety": self._load_safety_tests()
         }
 
-        # Performance metrics
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Performance metrics (embedder shared with the vector stores, loaded on first use)
+        self.embedding_model_name = 'all-MiniLM-L6-v2'
+
+    @property
+    def embedding_model(self):
+        """Shared sentence transformer used for similarity scoring"""
+        return get_embedder_registry().get(self.embedding_model_name)
 
     def _load_coding_tests(self) -> List[Dict[str, Any]]:
         """Load coding benchmark tests"""
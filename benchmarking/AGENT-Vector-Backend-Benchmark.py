@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+AGENT Vector Backend Benchmark
+Compares the ChromaDB collection path with the in-process NumPy backend
+(exact, IVF, quantized two-stage and PCA-projected search) on synthetic embeddings
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lib'))
+
+from memory.embedding_projection import EmbeddingProjection
+from memory.numpy_backend import NumpyCollection
+
+
+@dataclass
+class BackendResult:
+    """Benchmark result for one backend at one collection size"""
+    backend: str
+    size: int
+    insert_seconds: float
+    inserts_per_second: float
+    query_p50_ms: float
+    query_p95_ms: float
+    filtered_query_p50_ms: float
+    recall_at_k: float
+    bytes_per_vector: Optional[float]
+
+
+def make_dataset(size: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real sentence embeddings than pure noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, clusters, size=size)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((size, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """Ground-truth neighbour IDs by brute force"""
+    truth = []
+    for query in queries:
+        scores = vectors @ query
+        truth.append({str(i) for i in np.argpartition(-scores, k - 1)[:k]})
+    return truth
+
+
+def run_backend(
+    name: str,
+    collection: Any,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: List[set],
+    k: int,
+    batch_size: int,
+    bytes_per_vector: Optional[float] = None,
+    prepare: Optional[Any] = None
+) -> BackendResult:
+    """Insert the dataset into a collection and time queries against it"""
+
+    modes = ["smart_assistant", "code_companion", "creative_writer", "legal_assistant"]
+
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), batch_size):
+        batch = vectors[offset:offset + batch_size]
+        collection.add(
+            ids=[str(i) for i in range(offset, offset + len(batch))],
+            embeddings=batch,
+            documents=[f"example {i}" for i in range(offset, offset + len(batch))],
+            metadatas=[{"mode": modes[i % len(modes)]} for i in range(offset, offset + len(batch))]
+        )
+    insert_seconds = time.perf_counter() - start
+
+    if bytes_per_vector is None and hasattr(collection, "get_index_stats"):
+        bytes_per_vector = collection.get_index_stats()["first_pass_bytes_per_vector"]
+
+    if prepare is not None:
+        prepare()
+
+    latencies = []
+    recall_hits = 0
+    for query, expected in zip(queries, truth):
+        query_start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=["distances"])
+        latencies.append((time.perf_counter() - query_start) * 1000)
+        recall_hits += len(expected & set(result["ids"][0]))
+
+    filtered_latencies = []
+    for query in queries:
+        query_start = time.perf_counter()
+        collection.query(
+            query_embeddings=[query.tolist()],
+            n_results=k,
+            where={"mode": "code_companion"},
+            include=["distances"]
+        )
+        filtered_latencies.append((time.perf_counter() - query_start) * 1000)
+
+    return BackendResult(
+        backend=name,
+        size=len(vectors),
+        insert_seconds=round(insert_seconds, 3),
+        inserts_per_second=round(len(vectors) / insert_seconds, 1) if insert_seconds > 0 else 0.0,
+        query_p50_ms=round(statistics.median(latencies), 3),
+        query_p95_ms=round(float(np.percentile(latencies, 95)), 3),
+        filtered_query_p50_ms=round(statistics.median(filtered_latencies), 3),
+        recall_at_k=round(recall_hits / (len(queries) * k), 4),
+        bytes_per_vector=bytes_per_vector
+    )
+
+
+def benchmark_size(size: int, args: argparse.Namespace) -> List[BackendResult]:
+    """Run every selected backend at one collection size"""
+
+    vectors = make_dataset(size, args.dimension, args.clusters, args.seed)
+    queries = make_dataset(args.queries, args.dimension, args.clusters, args.seed + 1)
+    truth = exact_top_k(vectors, queries, args.k)
+
+    results = []
+
+    if "numpy" in args.backends:
+        collection = NumpyCollection(f"bench_numpy_{size}")
+        results.append(run_backend(
+            "numpy-exact", collection, vectors, queries, truth, args.k, args.batch_size,
+            bytes_per_vector=collection.dtype.itemsize * args.dimension
+        ))
+
+    if "numpy-fp16" in args.backends:
+        collection = NumpyCollection(f"bench_numpy_fp16_{size}", dtype="float16")
+        results.append(run_backend(
+            "numpy-exact-fp16", collection, vectors, queries, truth, args.k, args.batch_size,
+            bytes_per_vector=collection.dtype.itemsize * args.dimension
+        ))
+
+    if "numpy-ivf" in args.backends:
+        collection = NumpyCollection(f"bench_numpy_ivf_{size}", nprobe=args.nprobe)
+        results.append(run_backend(
+            f"numpy-ivf(nprobe={args.nprobe})", collection, vectors, queries, truth, args.k, args.batch_size,
+            bytes_per_vector=collection.dtype.itemsize * args.dimension,
+            prepare=collection.build_index
+        ))
+
+    for quantization in ("int8", "binary"):
+        if f"numpy-{quantization}" not in args.backends:
+            continue
+        collection = NumpyCollection(f"bench_numpy_{quantization}_{size}", quantization=quantization)
+        results.append(run_backend(
+            f"numpy-{quantization}(rerank={collection.rerank_factor})", collection, vectors, queries, truth,
+            args.k, args.batch_size
+        ))
+
+    # Recall is measured against the full-dimension ground truth
+    for dimension in args.projection_dims:
+        projection = EmbeddingProjection.fit(vectors[:20_000], dimension)
+        collection = NumpyCollection(f"bench_numpy_pca{dimension}_{size}")
+        results.append(run_backend(
+            f"numpy-pca{dimension}", collection, projection.transform(vectors), projection.transform(queries),
+            truth, args.k, args.batch_size,
+            bytes_per_vector=collection.dtype.itemsize * dimension
+        ))
+
+    if "chroma" in args.backends:
+        import chromadb
+
+        client = chromadb.Client()
+        collection_name = f"bench_chroma_{size}"
+        try:
+            client.delete_collection(name=collection_name)
+        except Exception:
+            pass
+        collection = client.create_collection(name=collection_name)
+        results.append(run_backend(
+            "chroma", collection, vectors, queries, truth, args.k,
+            min(args.batch_size, client.get_max_batch_size())
+        ))
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FreeVectorStore search backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    backends = ["numpy", "numpy-fp16", "numpy-ivf", "numpy-int8", "numpy-binary", "chroma"]
+    parser.add_argument("--backends", nargs="+", default=backends, choices=backends)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--projection-dims", type=int, nargs="*", default=[],
+                        help="Also run the exact numpy backend on PCA projections to these dimensions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    print("🔬 AGENT Vector Backend Benchmark")
+    print("=" * 110)
+    header = (f"{'backend':<24}{'size':>10}{'insert/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'filtered p50':>14}{'recall@k':>10}{'bytes/vec':>11}")
+    print(header)
+    print("-" * 110)
+
+    all_results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        for result in benchmark_size(size, args):
+            all_results.append(asdict(result))
+            print(f"{result.backend:<24}{result.size:>10}{result.inserts_per_second:>12}"
+                  f"{result.query_p50_ms:>10}{result.query_p95_ms:>10}{result.filtered_query_p50_ms:>14}"
+                  f"{result.recall_at_k:>10}{str(result.bytes_per_vector or '-'):>11}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"results": all_results, "timestamp": datetime.now().isoformat()}, f, indent=2)
+        print(f"\n💾 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -289,17 +289,12 @@ class FreeDataCollector:
         
         # Add to vector store if high quality (will be determined later with feedback)
         # For now, we'll add all non-error interactions
-        if not error_occurred and len(agent_response.strip()) > 10:
+        if self._is_indexable(interaction):
             try:
                 self.vector_store.add_example(
                     text=user_input,
-                    metadata={
-                        "response": agent_response,
-                        "mode": agent_mode,
-                        "interaction_id": interaction_id,
-                        "quality_score": None,  # Will be updated with feedback
-                        "tags": f"interaction,{agent_mode}"
-                    }
+                    metadata=self._example_metadata(interaction),
+                    custom_id=interaction_id
                 )
             except Exception as e:
                 logger.warning(f"Failed to add example to vector store: {str(e)}")
@@ -307,6 +302,50 @@ class FreeDataCollector:
         logger.info(f"Logged interaction: {interaction_id} for conversation: {conversation_id}")
         return interaction_id
 
+    def reindex_vector_store(self, batch_size: int = 256) -> Dict[str, Any]:
+        """
+        Back-fill the vector store from the logged interactions in bulk
+
+        Examples are keyed by interaction ID, so interactions already in the
+        store only get their metadata refreshed and are not re-embedded.
+
+        Args:
+            batch_size: Number of examples encoded and written per batch
+
+        Returns:
+            Throughput statistics from the vector store bulk ingestion
+        """
+        
+        indexable = [i for i in self.interactions if self._is_indexable(i)]
+        
+        result = self.vector_store.upsert_examples(
+            texts=[i.user_input for i in indexable],
+            ids=[i.interaction_id for i in indexable],
+            metadatas=[self._example_metadata(i) for i in indexable],
+            batch_size=batch_size
+        )
+        
+        logger.info(
+            f"Re-indexed {result['added']} new and {result['updated']} existing interactions "
+            f"in {result['elapsed_seconds']}s "
+            f"({result['examples_per_second']} examples/s)"
+        )
+        return result
+
+    def _is_indexable(self, interaction: InteractionRecord) -> bool:
+        """Whether an interaction should be stored as a retrieval example"""
+        return not interaction.error_occurred and len(interaction.agent_response.strip()) > 10
+
+    def _example_metadata(self, interaction: InteractionRecord) -> Dict[str, Any]:
+        """Build vector store metadata for an interaction"""
+        return {
+            "response": interaction.agent_response,
+            "mode": interaction.agent_mode,
+            "interaction_id": interaction.interaction_id,
+            "quality_score": interaction.response_quality_score,  # Updated with feedback
+            "tags": f"interaction,{interaction.agent_mode}"
+        }
+
     def add_feedback(
         self,
         interaction_id: str,
@@ -331,12 +370,16 @@ class FreeDataCollector:
                 if response_quality_score is not None:
                     interaction.response_quality_score = response_quality_score
                 
-                # Update vector store example if it's high quality
-                if interaction.is_high_quality():
+                # Push the new scores to the stored example (metadata only, no re-embedding)
+                if self._is_indexable(interaction):
                     try:
-                        # Note: In a real implementation, you'd need to update the existing example
-                        # or remove and re-add it with updated metadata
-                        pass
+                        self.vector_store.update_metadata_many({
+                            interaction_id: {
+                                "quality_score": interaction.response_quality_score,
+                                "user_feedback_score": interaction.user_feedback_score,
+                                "high_quality": interaction.is_high_quality()
+                            }
+                        })
                     except Exception as e:
                         logger.warning(f"Failed to update example quality: {str(e)}")
                 
@@ -4,19 +4,34 @@ Provides ReAct and RAISE framework implementation with vector store integration
 """
 
 import asyncio
+import hashlib
 import os
 import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple, Callable
+import time
+from contextlib import aclosing
+from typing import Dict, List, Any, Optional, Tuple, Callable, AsyncIterator, Awaitable
 from datetime import datetime
-import ollama
-from groq import Groq
 from memory.vector_store import FreeVectorStore
+from memory.async_vector_store import get_async_vector_store
+from llm.provider_pool import ProviderClientPool, ProviderLimits
+from llm.provider_health import ProviderHealth, ProviderUnavailableError
+from llm.response_cache import CachedResponse, LLMResponseCache
+from llm.single_flight import SingleFlight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+UNAVAILABLE_MESSAGE = (
+    "I apologize, but I'm currently unable to generate a response due to technical issues "
+    "with both local and cloud LLM services."
+)
+
+
+class ResponseTruncatedError(RuntimeError):
+    """A provider's stream failed after part of the response had already been yielded"""
+
 
 class FreeLLMWrapper:
     """
@@ -30,7 +45,13 @@ class FreeLLMWrapper:
         ollama_host: str = "http://localhost:11434",
         groq_api_key: Optional[str] = None,
         max_retries: int = 3,
-        retry_delay: float = 1.0
+        retry_delay: float = 1.0,
+        ollama_limits: Optional[ProviderLimits] = None,
+        groq_limits: Optional[ProviderLimits] = None,
+        response_cache: Optional[LLMResponseCache] = None,
+        provider_health: Optional[ProviderHealth] = None,
+        hedge_requests: bool = False,
+        coalesce_requests: bool = True
     ):
         """
         Initialize the LLM wrapper
@@ -41,23 +62,46 @@ class FreeLLMWrapper:
             groq_api_key: Groq API key (from environment if None)
             max_retries: Maximum retry attempts for failed requests
             retry_delay: Delay between retries in seconds
+            ollama_limits: Connection pool, concurrency and timeout settings for Ollama
+            groq_limits: Connection pool, concurrency and timeout settings for Groq
+            response_cache: Response cache (caching is opt-in: disabled if None)
+            provider_health: Circuit breakers and latency windows per provider/model (defaults if None)
+            hedge_requests: Also ask Groq when Ollama runs past its p95 latency, taking the first answer
+            coalesce_requests: Share one generation between concurrent identical requests
         """
 
         self.vector_store = vector_store
+        # Non-blocking, micro-batched access to the store (shared with other components)
+        self.async_vector_store = get_async_vector_store(vector_store)
         self.max_retries = max_retries
         self.retry_delay = retry_delay
 
-        # Initialize Ollama client
-        self.ollama_client = ollama.Client(host=ollama_host)
-
-        # Initialize Groq client
+        # Initialize pooled async provider clients (Groq only with an API key)
         if groq_api_key is None:
             groq_api_key = os.getenv('GROQ_API_KEY')
-        if groq_api_key:
-            self.groq_client = Groq(api_key=groq_api_key)
-        else:
+        if not groq_api_key:
             logger.warning("No Groq API key provided - fallback will not be available")
-            self.groq_client = None
+        self.provider_pool = ProviderClientPool(
+            ollama_host=ollama_host,
+            groq_api_key=groq_api_key,
+            ollama_limits=ollama_limits,
+            groq_limits=groq_limits
+        )
+        # Clients assigned in place of the pool's (e.g. test doubles), by provider
+        self._client_overrides: Dict[str, Any] = {}
+
+        # Skip failing providers and (optionally) hedge slow ones with the fallback
+        self.provider_health = provider_health if provider_health is not None else ProviderHealth()
+        self.hedge_requests = hedge_requests
+
+        # Concurrent identical requests attach to one in-flight generation
+        self.single_flight = SingleFlight()
+        self.coalesce_requests = coalesce_requests
+
+        # Reuse responses to repeated prompts; semantic matching embeds questions with the store's model
+        self.response_cache = response_cache if response_cache is not None else LLMResponseCache(max_entries=0)
+        if self.response_cache.semantic_threshold is not None and self.response_cache.embedder is None:
+            self.response_cache.embedder = vector_store._encode_full
 
         # Available models configuration
         self.models = {
@@ -156,7 +200,57 @@ class FreeLLMWrapper:
             Dictionary containing response, reasoning trace, and tool usage
         """
 
+        result: Dict[str, Any] = {}
+        async for event in self.stream_with_react(user_input, agent_mode, max_iterations, use_examples):
+            if event["type"] == "done":
+                result = event["result"]
+        return result
+
+    async def stream_with_react(
+        self,
+        user_input: str,
+        agent_mode: str = "smart_assistant",
+        max_iterations: int = 5,
+        use_examples: bool = True,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the ReAct loop and RAISE synthesis, yielding tokens as they arrive
+
+        Events are dictionaries with a ``type``:
+
+        - ``examples``: ``count`` of retrieved examples
+        - ``reasoning``: a ``text`` fragment of reasoning ``step``
+        - ``action``: a tool call (``tool``, ``parameters``, ``result``) made at ``step``
+        - ``answer``: a ``text`` fragment of the final response
+        - ``done``: the complete ``result``, as returned by generate_with_react
+
+        The stream stops, and the provider's HTTP stream is closed, when the
+        consumer stops iterating (``aclose()``), when the consuming task is
+        cancelled, or when ``cancel_event`` is set (e.g. by a handler that
+        noticed the client disconnect). The event is raced against every
+        wait for a token, so it also interrupts a slow first token, retries
+        and the fallback. A provider failing mid-response raises
+        ResponseTruncatedError.
+
+        Args:
+            user_input: User's input text
+            agent_mode: Agent specialization mode
+            max_iterations: Maximum reasoning iterations
+            use_examples: Whether to retrieve examples from vector store
+            cancel_event: Event that stops the stream when set
+
+        Yields:
+            Stream events
+        """
+
         logger.info(f"Starting ReAct reasoning for mode: {agent_mode}")
+        start_time = time.perf_counter()
+        first_token_time: Optional[float] = None
+        first_answer_time: Optional[float] = None
+
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
 
         # Initialize reasoning trace
         reasoning_trace = []
@@ -165,12 +259,13 @@ class FreeLLMWrapper:
         # Retrieve relevant examples if enabled
         examples = []
         if use_examples:
-            examples = self.vector_store.search_similar(
+            examples = await self.async_vector_store.search_similar(
                 user_input,
                 n_results=3,
                 where={"mode": agent_mode} if agent_mode != "smart_assistant" else None
             )
             logger.info(f"Retrieved {len(examples)} relevant examples")
+            yield {"type": "examples", "count": len(examples)}
 
         # Update working memory
         self.working_memory.update({
@@ -185,11 +280,23 @@ class FreeLLMWrapper:
 
         # ReAct reasoning loop
         for iteration in range(max_iterations):
+            if cancelled():
+                return
             logger.info(f"ReAct iteration {iteration + 1}/{max_iterations}")
 
             # Reasoning phase
             reasoning_prompt = self._build_reasoning_prompt(context, iteration)
-            reasoning_response = await self._generate_with_fallback(reasoning_prompt, agent_mode)
+            fragments = []
+            reasoning_tokens = self._stream_with_fallback(reasoning_prompt, agent_mode, question=user_input)
+            async with aclosing(self._until_cancelled(reasoning_tokens, cancel_event)) as tokens:
+                async for token in tokens:
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter() - start_time
+                    fragments.append(token)
+                    yield {"type": "reasoning", "step": iteration + 1, "text": token}
+            if cancelled():
+                return
+            reasoning_response = "".join(fragments)
 
             reasoning_trace.append({
                 "step": iteration + 1,
@@ -213,6 +320,13 @@ class FreeLLMWrapper:
                     "result": tool_result,
                     "timestamp": datetime.now().isoformat()
                 })
+                yield {
+                    "type": "action",
+                    "step": iteration + 1,
+                    "tool": tool_call["tool"],
+                    "parameters": tool_call["parameters"],
+                    "result": tool_result
+                }
 
                 # Update context with tool result
                 context += f"\n\nTool Result ({tool_call['tool']}): {tool_result}"
@@ -234,81 +348,570 @@ class FreeLLMWrapper:
                 # No tool call - generate final response
                 break
 
-        # Generate final response using RAISE synthesis
-        final_response = await self._generate_raise_response(
-            user_input, reasoning_trace, examples, agent_mode
-        )
+        if cancelled():
+            return
 
-        return {
-            "response": final_response,
-            "reasoning_trace": reasoning_trace,
-            "tool_usage": tool_usage,
-            "examples_used": len(examples),
-            "iterations": len(reasoning_trace),
-            "agent_mode": agent_mode,
-            "timestamp": datetime.now().isoformat()
+        # Generate final response using RAISE synthesis
+        raise_prompt = self._build_raise_prompt(user_input, reasoning_trace, examples, agent_mode)
+        fragments = []
+        answer_tokens = self._stream_with_fallback(raise_prompt, agent_mode, temperature=0.3, question=user_input)
+        async with aclosing(self._until_cancelled(answer_tokens, cancel_event)) as tokens:
+            async for token in tokens:
+                if first_answer_time is None:
+                    first_answer_time = time.perf_counter() - start_time
+                fragments.append(token)
+                yield {"type": "answer", "text": token}
+        if cancelled():
+            return
+
+        yield {
+            "type": "done",
+            "result": {
+                "response": "".join(fragments),
+                "reasoning_trace": reasoning_trace,
+                "tool_usage": tool_usage,
+                "examples_used": len(examples),
+                "iterations": len(reasoning_trace),
+                "agent_mode": agent_mode,
+                "timing": {
+                    "first_token_seconds": round(first_token_time, 3) if first_token_time is not None else None,
+                    "first_answer_token_seconds": (
+                        round(first_answer_time, 3) if first_answer_time is not None else None
+                    ),
+                    "total_seconds": round(time.perf_counter() - start_time, 3)
+                },
+                "timestamp": datetime.now().isoformat()
+            }
         }
 
     async def _generate_with_fallback(
         self,
         prompt: str,
         agent_mode: str = "smart_assistant",
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        question: Optional[str] = None
     ) -> str:
         """
         Generate text with automatic fallback from Ollama to Groq
 
+        Providers whose circuit breaker is open are skipped. With hedging on,
+        Groq is also asked once Ollama runs past its usual (p95) response
+        time, and the first answer wins.
+
         Args:
             prompt: Input prompt
             agent_mode: Agent mode for model selection
             temperature: Generation temperature
+            question: The user's question inside the prompt (lets the cache match similar questions)
 
         Returns:
             Generated text response
         """
 
-        # Try Ollama first
-        for attempt in range(self.max_retries):
+        cached = await self._cached_response(prompt, agent_mode, temperature, question)
+        if cached is not None:
+            return cached.text
+
+        if not self.coalesce_requests:
+            return await self._generate_uncached(prompt, agent_mode, temperature, question)
+        return await self.single_flight.run(
+            self._flight_key("generate", prompt, agent_mode, temperature),
+            lambda: self._generate_uncached(prompt, agent_mode, temperature, question)
+        )
+
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        agent_mode: str,
+        temperature: float,
+        question: Optional[str]
+    ) -> str:
+        """Generate from the providers (racing and falling back between them) and cache the result"""
+
+        start_time = time.perf_counter()
+        routes = self._routes(agent_mode)
+        index, text = await self._race(
+            [
+                lambda provider=provider: self._generate_from(provider, prompt, agent_mode, temperature)
+                for provider, _ in routes
+            ],
+            routes,
+            "response"
+        )
+
+        # If every provider fails, return error message
+        if index is None:
+            logger.error("All LLM providers failed")
+            return UNAVAILABLE_MESSAGE
+
+        await self._cache_response(prompt, agent_mode, temperature, question, routes[index][0], text, start_time)
+        return text
+
+    async def _generate_from(self, provider: str, prompt: str, agent_mode: str, temperature: float) -> str:
+        """One provider's non-streaming generation, with retries (Ollama) and its circuit breaker"""
+
+        model = self.models[provider].get(agent_mode, self.models[provider]["general"])
+        breaker = self.provider_health.breaker(provider, model)
+        attempts = self.max_retries if provider == "ollama" else 1
+        last_error: Exception = ProviderUnavailableError(f"{provider.capitalize()} circuit breaker is open")
+
+        for attempt in range(attempts):
+            if not breaker.allow():
+                break
+            call_start = time.perf_counter()
             try:
-                model = self.models["ollama"].get(agent_mode, self.models["ollama"]["general"])
+                if provider == "ollama":
+                    response = await self.provider_pool.request("ollama", lambda: self.ollama_async_client.generate(
+                        model=model,
+                        prompt=prompt,
+                        options={
+                            "temperature": temperature,
+                            "num_predict": 1024,
+                            "top_p": 0.9
+                        }
+                    ))
+                    text = response["response"]
+                else:
+                    response = await self.provider_pool.request("groq", lambda: self.groq_async_client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=1024,
+                        top_p=0.9
+                    ))
+                    text = response.choices[0].message.content
+
+            except asyncio.CancelledError:
+                # A call cut off (e.g. a primary that lost a hedge race) took at least this
+                # long; leaving it out would shrink the budget and hedge ever more often
+                self.provider_health.record_latency(provider, model, "response", time.perf_counter() - call_start)
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning(f"{provider.capitalize()} attempt {attempt + 1} failed: {str(e) or type(e).__name__}")
+                last_error = e
+                if attempt < attempts - 1 and not breaker.is_open():
+                    await asyncio.sleep(self.retry_delay)
+                continue
+
+            breaker.record_success()
+            self.provider_health.record_latency(provider, model, "response", time.perf_counter() - call_start)
+            return text
+
+        raise last_error
 
-                response = self.ollama_client.generate(
+    async def _stream_with_fallback(
+        self,
+        prompt: str,
+        agent_mode: str = "smart_assistant",
+        temperature: float = 0.7,
+        question: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text with automatic fallback from Ollama to Groq
+
+        Retries, the fallback and hedging only happen before the first token:
+        whichever provider produces a token first serves the whole stream, and
+        a stream that fails part-way ends early rather than replaying text the
+        caller already has from another provider: it raises
+        ResponseTruncatedError after the partial text. A cached response is
+        yielded whole, and only streams that run to completion are cached.
+
+        Args:
+            prompt: Input prompt
+            agent_mode: Agent mode for model selection
+            temperature: Generation temperature
+            question: The user's question inside the prompt (lets the cache match similar questions)
+
+        Yields:
+            Text fragments as the provider produces them
+        """
+
+        cached = await self._cached_response(prompt, agent_mode, temperature, question)
+        if cached is not None:
+            yield cached.text
+            return
+
+        if self.coalesce_requests:
+            tokens = self.single_flight.stream(
+                self._flight_key("stream", prompt, agent_mode, temperature),
+                lambda: self._stream_uncached(prompt, agent_mode, temperature, question)
+            )
+        else:
+            tokens = self._stream_uncached(prompt, agent_mode, temperature, question)
+        async with aclosing(tokens):
+            async for token in tokens:
+                yield token
+
+    async def _stream_uncached(
+        self,
+        prompt: str,
+        agent_mode: str,
+        temperature: float,
+        question: Optional[str]
+    ) -> AsyncIterator[str]:
+        """Stream from the providers (racing and falling back between them) and cache the completed text"""
+
+        start_time = time.perf_counter()
+        routes = self._routes(agent_mode)
+        streams = [self._stream_from(provider, prompt, agent_mode, temperature) for provider, _ in routes]
+        try:
+            index, first_token = await self._race(
+                [lambda stream=stream: self._first_token(stream) for stream in streams],
+                routes,
+                "first_token"
+            )
+
+            # If every provider fails, return error message
+            if index is None:
+                logger.error("All LLM providers failed")
+                yield UNAVAILABLE_MESSAGE
+                return
+
+            provider = routes[index][0]
+            fragments = []
+            try:
+                if first_token is not None:
+                    fragments.append(first_token)
+                    yield first_token
+                    async for token in streams[index]:
+                        fragments.append(token)
+                        yield token
+            except Exception as e:
+                logger.error(f"{provider.capitalize()} stream failed mid-response: {str(e)}")
+                # The caller already has part of the text, so it must not be mistaken for a complete response
+                raise ResponseTruncatedError(
+                    f"{provider.capitalize()} stream failed after {len(fragments)} tokens: {str(e) or type(e).__name__}"
+                ) from e
+
+            await self._cache_response(
+                prompt, agent_mode, temperature, question, provider, "".join(fragments), start_time
+            )
+
+        finally:
+            for stream in streams:
+                await stream.aclose()
+
+    async def _stream_from(self, provider: str, prompt: str, agent_mode: str, temperature: float) -> AsyncIterator[str]:
+        """
+        One provider's token stream, with retries (Ollama) and its circuit breaker
+
+        Raises before the first token if the provider is unavailable; an error
+        after it propagates to the consumer instead of retrying.
+        """
+
+        model = self.models[provider].get(agent_mode, self.models[provider]["general"])
+        breaker = self.provider_health.breaker(provider, model)
+        attempts = self.max_retries if provider == "ollama" else 1
+        stream_tokens = self._stream_ollama if provider == "ollama" else self._stream_groq
+        last_error: Exception = ProviderUnavailableError(f"{provider.capitalize()} circuit breaker is open")
+
+        for attempt in range(attempts):
+            if not breaker.allow():
+                break
+            call_start = time.perf_counter()
+            produced = False
+            try:
+                async with aclosing(stream_tokens(prompt, agent_mode, temperature)) as tokens:
+                    async for token in tokens:
+                        if not produced:
+                            produced = True
+                            self.provider_health.record_latency(
+                                provider, model, "first_token", time.perf_counter() - call_start
+                            )
+                        yield token
+
+            except asyncio.CancelledError:
+                # Censored sample, as in _generate_from
+                if not produced:
+                    self.provider_health.record_latency(provider, model, "first_token", time.perf_counter() - call_start)
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                if produced:
+                    raise
+                logger.warning(f"{provider.capitalize()} attempt {attempt + 1} failed: {str(e) or type(e).__name__}")
+                last_error = e
+                if attempt < attempts - 1 and not breaker.is_open():
+                    await asyncio.sleep(self.retry_delay)
+                continue
+
+            breaker.record_success()
+            return
+
+        raise last_error
+
+    @staticmethod
+    async def _until_cancelled(
+        stream: AsyncIterator[str],
+        cancel_event: Optional[asyncio.Event]
+    ) -> AsyncIterator[str]:
+        """
+        Yield a stream's tokens until it ends or cancel_event is set
+
+        Each wait for the next token is raced against the event, and the
+        losing wait is cancelled, so a set event stops a provider that is
+        still working on its first token, retrying or falling back. The
+        stream is closed either way.
+        """
+
+        if cancel_event is None:
+            async with aclosing(stream):
+                async for token in stream:
+                    yield token
+            return
+
+        cancelled = asyncio.ensure_future(cancel_event.wait())
+        try:
+            while not cancel_event.is_set():
+                next_token = asyncio.ensure_future(stream.__anext__())
+                await asyncio.wait({next_token, cancelled}, return_when=asyncio.FIRST_COMPLETED)
+                if cancel_event.is_set():
+                    next_token.cancel()
+                    await asyncio.gather(next_token, return_exceptions=True)
+                    return
+                try:
+                    token = next_token.result()
+                except StopAsyncIteration:
+                    return
+                yield token
+        finally:
+            cancelled.cancel()
+            await stream.aclose()
+
+    @staticmethod
+    async def _first_token(stream: AsyncIterator[str]) -> Optional[str]:
+        """Start a stream and return its first token (None if it finishes without one)"""
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    async def _race(
+        self,
+        attempts: List[Callable[[], Awaitable[Any]]],
+        routes: List[Tuple[str, str]],
+        kind: str
+    ) -> Tuple[Optional[int], Any]:
+        """
+        Run provider attempts in fallback order and return the first success
+
+        The next attempt starts as soon as the running ones have failed or,
+        with hedging on, once the primary has run past its latency budget;
+        then both run and whichever succeeds first wins. Attempts still
+        running at the end are cancelled.
+
+        Args:
+            attempts: One zero-argument coroutine function per route
+            routes: (provider, model) pairs matching the attempts
+            kind: Latency kind the hedge budget is based on ("response" or "first_token")
+
+        Returns:
+            (index of the winning attempt, its result), or (None, None) if every attempt failed
+        """
+
+        budget = self._hedge_budget(routes, kind)
+        tasks: Dict[asyncio.Task, int] = {}
+        launched = 0
+        hedged = False
+
+        def launch() -> None:
+            nonlocal launched
+            tasks[asyncio.ensure_future(attempts[launched]())] = launched
+            launched += 1
+
+        launch()
+        try:
+            while tasks:
+                can_hedge = budget is not None and launched == 1 and len(attempts) > 1
+                done, _ = await asyncio.wait(
+                    tasks,
+                    timeout=budget if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(
+                        f"{routes[0][0].capitalize()} exceeded its {budget:.2f}s budget - hedging with {routes[1][0]}"
+                    )
+                    hedged = True
+                    launch()
+                    continue
+
+                for task in done:
+                    index = tasks.pop(task)
+                    if task.exception() is None:
+                        if hedged:
+                            self.provider_health.record_hedge(*routes[0], "primary" if index == 0 else "hedge")
+                        return index, task.result()
+
+                if not tasks and launched < len(attempts):
+                    launch()
+
+            if hedged:
+                self.provider_health.record_hedge(*routes[0], None)
+            return None, None
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _hedge_budget(self, routes: List[Tuple[str, str]], kind: str) -> Optional[float]:
+        """Seconds to give the primary before hedging, or None when hedging is off or not possible"""
+        if not self.hedge_requests or len(routes) < 2 or self.provider_health.breaker(*routes[1]).is_open():
+            return None
+        return self.provider_health.hedge_budget(*routes[0], kind)
+
+    def _flight_key(self, kind: str, prompt: str, agent_mode: str, temperature: float) -> str:
+        """Identity of a request for coalescing: identical prompt, mode and sampling settings"""
+        return hashlib.sha256(
+            json.dumps([kind, agent_mode, self._sampling_params(temperature), prompt], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    @property
+    def ollama_async_client(self) -> Any:
+        """Ollama client for the running event loop (or the client assigned in its place)"""
+        if "ollama" in self._client_overrides:
+            return self._client_overrides["ollama"]
+        return self.provider_pool.ollama_client
+
+    @ollama_async_client.setter
+    def ollama_async_client(self, client: Any) -> None:
+        self._client_overrides["ollama"] = client
+
+    @property
+    def groq_async_client(self) -> Any:
+        """Groq client for the running event loop (or the client assigned in its place; None if unavailable)"""
+        if "groq" in self._client_overrides:
+            return self._client_overrides["groq"]
+        return self.provider_pool.groq_client
+
+    @groq_async_client.setter
+    def groq_async_client(self, client: Any) -> None:
+        self._client_overrides["groq"] = client
+
+    def _groq_available(self) -> bool:
+        """Whether Groq can serve as the fallback (without creating a client)"""
+        if "groq" in self._client_overrides:
+            return self._client_overrides["groq"] is not None
+        return self.provider_pool.groq_available
+
+    def _routes(self, agent_mode: str) -> List[Tuple[str, str]]:
+        """(provider, model) pairs that could answer a request, in fallback order"""
+        routes = [("ollama", self.models["ollama"].get(agent_mode, self.models["ollama"]["general"]))]
+        if self._groq_available():
+            routes.append(("groq", self.models["groq"].get(agent_mode, self.models["groq"]["general"])))
+        return routes
+
+    @staticmethod
+    def _sampling_params(temperature: float) -> Dict[str, Any]:
+        """Sampling settings sent to both providers (part of the cache key)"""
+        return {"temperature": temperature, "max_tokens": 1024, "top_p": 0.9}
+
+    async def _cached_response(
+        self,
+        prompt: str,
+        agent_mode: str,
+        temperature: float,
+        question: Optional[str]
+    ) -> Optional[CachedResponse]:
+        """Look up a cached response (off the event loop: it may read disk or embed the question)"""
+
+        if not self.response_cache.enabled_for(agent_mode, self._sampling_params(temperature)):
+            return None
+        cached = await asyncio.to_thread(
+            self.response_cache.get,
+            agent_mode,
+            self._routes(agent_mode),
+            self._sampling_params(temperature),
+            prompt,
+            question
+        )
+        if cached is not None:
+            logger.info(f"Serving cached {cached.provider} response ({cached.match} match, {cached.similarity:.3f})")
+        return cached
+
+    async def _cache_response(
+        self,
+        prompt: str,
+        agent_mode: str,
+        temperature: float,
+        question: Optional[str],
+        provider: str,
+        text: str,
+        start_time: float
+    ) -> None:
+        """Store a completed generation in the response cache"""
+
+        if not text or not self.response_cache.enabled_for(agent_mode, self._sampling_params(temperature)):
+            return
+        model = self.models[provider].get(agent_mode, self.models[provider]["general"])
+        await asyncio.to_thread(
+            self.response_cache.put,
+            agent_mode,
+            provider,
+            model,
+            self._sampling_params(temperature),
+            prompt,
+            text,
+            time.perf_counter() - start_time,
+            question
+        )
+
+    async def _stream_ollama(self, prompt: str, agent_mode: str, temperature: float) -> AsyncIterator[str]:
+        """Stream a completion from Ollama, closing the HTTP stream when the consumer stops"""
+
+        model = self.models["ollama"].get(agent_mode, self.models["ollama"]["general"])
+        async with self.provider_pool.slot("ollama"):
+            try:
+                stream = await self.ollama_async_client.generate(
                     model=model,
                     prompt=prompt,
                     options={
                         "temperature": temperature,
                         "num_predict": 1024,
                         "top_p": 0.9
-                    }
+                    },
+                    stream=True
                 )
 
-                return response["response"]
+                try:
+                    async for part in stream:
+                        if part["response"]:
+                            yield part["response"]
+                finally:
+                    await stream.aclose()
 
             except Exception as e:
-                logger.warning(f"Ollama attempt {attempt + 1} failed: {str(e)}")
-                if attempt < self.max_retries - 1:
-                    await asyncio.sleep(self.retry_delay)
+                self.provider_pool.record_error("ollama", e)
+                raise
 
-        # Fallback to Groq if available
-        if self.groq_client:
-            try:
-                model = self.models["groq"].get(agent_mode, self.models["groq"]["general"])
+    async def _stream_groq(self, prompt: str, agent_mode: str, temperature: float) -> AsyncIterator[str]:
+        """Stream a chat completion from Groq, closing the HTTP stream when the consumer stops"""
 
-                response = self.groq_client.chat.completions.create(
+        model = self.models["groq"].get(agent_mode, self.models["groq"]["general"])
+        async with self.provider_pool.slot("groq"):
+            try:
+                stream = await self.groq_async_client.chat.completions.create(
                     model=model,
                     messages=[{"role": "user", "content": prompt}],
                     temperature=temperature,
                     max_tokens=1024,
-                    top_p=0.9
+                    top_p=0.9,
+                    stream=True
                 )
 
-                return response.choices[0].message.content
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await stream.close()
 
             except Exception as e:
-                logger.error(f"Groq fallback also failed: {str(e)}")
-
-        # If both fail, return error message
-        return "I apologize, but I'm currently unable to generate a response due to technical issues with both local and cloud LLM services."
+                self.provider_pool.record_error("groq", e)
+                raise
 
     def _build_react_context(
         self,
@@ -321,7 +924,8 @@ class FreeLLMWrapper:
         context_parts = [
             f"User Input: {user_input}",
             f"Agent Mode: {agent_mode}",
-            f"Current Date/Time: {datetime.now().isoformat()}"
+            # Day precision keeps repeated prompts identical, so concurrent runs coalesce (and can be cached)
+            f"Current Date: {datetime.now().date().isoformat()}"
         ]
 
         if examples:
@@ -434,6 +1038,18 @@ Reasoning step {iteration + 1}:"""
     ) -> str:
         """Generate final response using RAISE synthesis"""
 
+        raise_prompt = self._build_raise_prompt(user_input, reasoning_trace, examples, agent_mode)
+        return await self._generate_with_fallback(raise_prompt, agent_mode, temperature=0.3, question=user_input)
+
+    def _build_raise_prompt(
+        self,
+        user_input: str,
+        reasoning_trace: List[Dict[str, Any]],
+        examples: List[Dict[str, Any]],
+        agent_mode: str
+    ) -> str:
+        """Build the RAISE synthesis prompt"""
+
         # Build RAISE context
         raise_context = f"""
 User Input: {user_input}
@@ -462,7 +1078,7 @@ Synthesize a comprehensive, helpful response by combining:
 
 Provide a clear, actionable response that addresses the user's needs:"""
 
-        return await self._generate_with_fallback(raise_prompt, agent_mode, temperature=0.3)
+        return raise_prompt
 
     def _summarize_reasoning_trace(self, trace: List[Dict[str, Any]]) -> str:
         """Summarize reasoning trace for RAISE context"""
@@ -495,7 +1111,7 @@ Provide a clear, actionable response that addresses the user's needs:"""
     async def _tool_search_examples(self, query: str, mode: str = None, limit: int = 5) -> str:
         """Search examples tool"""
         where = {"mode": mode} if mode else None
-        results = self.vector_store.search_similar(query, n_results=limit, where=where)
+        results = await self.async_vector_store.search_similar(query, n_results=limit, where=where)
 
         if not results:
             return "No relevant examples found."
@@ -508,7 +1124,7 @@ Provide a clear, actionable response that addresses the user's needs:"""
 
     async def _tool_add_example(self, text: str, mode: str, quality_score: float = 3.0) -> str:
         """Add example tool"""
-        example_id = self.vector_store.add_example(
+        example_id = await self.async_vector_store.add_example(
             text=text,
             metadata={
                 "mode": mode,
@@ -528,6 +1144,10 @@ Provide a clear, actionable response that addresses the user's needs:"""
         self.working_memory[key] = value
         return f"Stored '{value}' in working memory under key '{key}'"
 
+    async def aclose(self) -> None:
+        """Close the pooled provider connections"""
+        await self.provider_pool.aclose()
+
     def get_system_stats(self) -> Dict[str, Any]:
         """Get system statistics"""
 
@@ -536,11 +1156,16 @@ Provide a clear, actionable response that addresses the user's needs:"""
         return {
             "llm_wrapper": {
                 "ollama_available": True,  # Assume available if initialized
-                "groq_available": self.groq_client is not None,
+                "groq_available": self._groq_available(),
                 "max_retries": self.max_retries,
                 "retry_delay": self.retry_delay,
                 "available_tools": len(self.tools),
-                "working_memory_keys": len(self.working_memory)
+                "working_memory_keys": len(self.working_memory),
+                "providers": self.provider_pool.get_stats(),
+                "response_cache": self.response_cache.get_stats(),
+                "hedge_requests": self.hedge_requests,
+                "provider_health": self.provider_health.get_stats(),
+                "single_flight": self.single_flight.get_stats()
             },
             "vector_store": vector_stats,
             "timestamp": datetime.now().isoformat()
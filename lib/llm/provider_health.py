@@ -0,0 +1,230 @@
+"""
+Provider Health - Circuit breakers and latency budgets for LLM providers
+Lets the wrapper skip providers that keep failing and hedge slow ones with the fallback
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderUnavailableError(RuntimeError):
+    """A provider was skipped because its circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    requests are refused without contacting the provider. Every
+    ``reset_timeout`` seconds one probe request is let through (half-open);
+    a success closes the breaker, a failure keeps it open for another
+    period. A probe that never reports back simply allows the next one after
+    the period, so the breaker cannot get stuck half-open.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds between probe requests while open
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+        self.times_opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def is_open(self) -> bool:
+        """Whether requests are currently refused (without using up a probe)"""
+        with self._lock:
+            return self._state != CLOSED and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Whether a request may go to the provider now (claims the probe when half-open)"""
+
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._opened_at = time.monotonic()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state == CLOSED:
+                    self.times_opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "successes": self.successes,
+                "failures": self.failures
+            }
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies for percentile budgets"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile (0-100) of the window, or None without samples"""
+        with self._lock:
+            if not self._samples:
+                return None
+            return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+
+class ProviderHealth:
+    """
+    Breakers, latency windows and hedge outcomes per (provider, model)
+
+    Latencies are kept separately per kind: ``first_token`` for streams and
+    ``response`` for whole non-streaming generations, since their
+    percentiles differ by orders of magnitude. All operations are thread-safe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        latency_window: int = 200,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20
+    ):
+        """
+        Initialize the registry
+
+        Args:
+            failure_threshold: Consecutive failures that open a provider/model's breaker
+            reset_timeout: Seconds between probe requests to an open breaker
+            latency_window: Recent latencies kept per provider/model and kind
+            hedge_percentile: Latency percentile used as the hedge budget
+            hedge_min_samples: Samples needed before a budget is trusted (no hedging before)
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.latency_window = latency_window
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._latencies: Dict[Tuple[str, str, str], LatencyTracker] = {}
+        self._hedges: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider: str, model: str) -> CircuitBreaker:
+        with self._lock:
+            key = (provider, model)
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[key]
+
+    def _tracker(self, provider: str, model: str, kind: str) -> LatencyTracker:
+        with self._lock:
+            key = (provider, model, kind)
+            if key not in self._latencies:
+                self._latencies[key] = LatencyTracker(self.latency_window)
+            return self._latencies[key]
+
+    def record_latency(self, provider: str, model: str, kind: str, seconds: float) -> None:
+        self._tracker(provider, model, kind).record(seconds)
+
+    def hedge_budget(self, provider: str, model: str, kind: str) -> Optional[float]:
+        """Seconds to wait for the provider before hedging, or None while there are too few samples"""
+        tracker = self._tracker(provider, model, kind)
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return tracker.percentile(self.hedge_percentile)
+
+    def record_hedge(self, provider: str, model: str, winner: Optional[str]) -> None:
+        """Count a hedged request and which side answered first ("primary", "hedge" or None if neither)"""
+        with self._lock:
+            counts = self._hedges.setdefault((provider, model), {"fired": 0, "primary_wins": 0, "hedge_wins": 0})
+            counts["fired"] += 1
+            if winner is not None:
+                counts[f"{winner}_wins"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Breaker states, latency percentiles and hedge win rates per provider/model"""
+
+        with self._lock:
+            breakers = dict(self._breakers)
+            latencies = dict(self._latencies)
+            hedges = {key: dict(counts) for key, counts in self._hedges.items()}
+
+        stats: Dict[str, Any] = {}
+        for provider, model in sorted(set(breakers) | {key[:2] for key in latencies} | set(hedges)):
+            entry: Dict[str, Any] = {}
+            if (provider, model) in breakers:
+                entry["breaker"] = breakers[(provider, model)].get_stats()
+            for (p, m, kind), tracker in latencies.items():
+                if (p, m) == (provider, model):
+                    p50, p95 = tracker.percentile(50), tracker.percentile(95)
+                    entry[f"{kind}_latency"] = {
+                        "samples": len(tracker),
+                        "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                        "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+                    }
+            if (provider, model) in hedges:
+                counts = hedges[(provider, model)]
+                entry["hedges"] = dict(
+                    counts,
+                    hedge_win_rate=round(counts["hedge_wins"] / counts["fired"], 3) if counts["fired"] else 0.0
+                )
+            stats[f"{provider}/{model}"] = entry
+
+        return stats
@@ -0,0 +1,248 @@
+"""
+Provider Pool - Shared async Ollama and Groq clients for the LLM wrapper
+Keeps HTTP connections alive between calls and bounds concurrent requests per provider
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict, replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+import httpx
+import ollama
+from groq import AsyncGroq, APITimeoutError
+
+TIMEOUT_ERRORS = (asyncio.TimeoutError, httpx.TimeoutException, APITimeoutError)
+
+
+@dataclass
+class ProviderLimits:
+    """Connection pool, concurrency and timeout settings for one provider"""
+    max_concurrency: int = 4  # Requests in flight at once; later ones queue
+    max_connections: int = 16
+    max_keepalive_connections: int = 8
+    keepalive_expiry: float = 60.0  # Seconds an idle connection stays open
+    connect_timeout: float = 5.0
+    read_timeout: float = 120.0  # Longest silence between response bytes (or stream tokens)
+    request_timeout: Optional[float] = 300.0  # Whole non-streaming request; None disables
+
+    def http_timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout, pool=None)
+
+    def http_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+# Ollama shares one local GPU, so few generations run in parallel there;
+# Groq is a hosted API that answers quickly but should not be flooded
+DEFAULT_OLLAMA_LIMITS = ProviderLimits()
+DEFAULT_GROQ_LIMITS = ProviderLimits(max_concurrency=8, read_timeout=60.0, request_timeout=60.0)
+
+
+class _ProviderState:
+    """Settings and counters for one provider (shared by every event loop)"""
+
+    def __init__(self, limits: ProviderLimits):
+        self.limits = limits
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "avg_queue_wait_ms": round(self.total_wait_seconds * 1000 / self.requests, 2) if self.requests else 0.0,
+            "limits": asdict(self.limits)
+        }
+
+
+@dataclass
+class _LoopClients:
+    """Provider clients and concurrency gates bound to one event loop"""
+    ollama_client: Any
+    groq_client: Any
+    semaphores: Dict[str, asyncio.Semaphore]
+
+
+class ProviderClientPool:
+    """
+    Async Ollama and Groq clients with persistent connection pools
+
+    Each provider gets one httpx connection pool reused by every request,
+    so calls skip the TCP/TLS handshake, and a semaphore that caps how many
+    requests run at once; callers beyond the cap wait their turn without
+    blocking the event loop. Connections and semaphores cannot move between
+    event loops, so each loop that uses the pool gets its own clients and
+    semaphores, created on first use (the cap applies per loop).
+    """
+
+    def __init__(
+        self,
+        ollama_host: str = "http://localhost:11434",
+        groq_api_key: Optional[str] = None,
+        ollama_limits: Optional[ProviderLimits] = None,
+        groq_limits: Optional[ProviderLimits] = None
+    ):
+        """
+        Initialize the provider clients
+
+        Args:
+            ollama_host: Ollama server host URL
+            groq_api_key: Groq API key (no Groq client without one)
+            ollama_limits: Pool, concurrency and timeout settings for Ollama
+            groq_limits: Pool, concurrency and timeout settings for Groq
+        """
+
+        self.ollama_host = ollama_host
+        self.groq_api_key = groq_api_key
+        self.groq_available = bool(groq_api_key)
+
+        # Private copies, so tuning one pool never changes another
+        self._providers = {
+            "ollama": _ProviderState(replace(ollama_limits or DEFAULT_OLLAMA_LIMITS)),
+            "groq": _ProviderState(replace(groq_limits or DEFAULT_GROQ_LIMITS))
+        }
+
+        self._loops: Dict[asyncio.AbstractEventLoop, _LoopClients] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ollama_client(self) -> ollama.AsyncClient:
+        """Ollama client for the running event loop"""
+        return self._clients().ollama_client
+
+    @property
+    def groq_client(self) -> Optional[AsyncGroq]:
+        """Groq client for the running event loop (None without an API key)"""
+        return self._clients().groq_client
+
+    def _clients(self) -> _LoopClients:
+        """The running loop's clients and semaphores, created on first use"""
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._loops.get(loop)
+            if clients is None:
+                # Clients of finished loops can no longer be used (or closed)
+                for closed in [other for other in self._loops if other.is_closed()]:
+                    del self._loops[closed]
+                clients = self._loops[loop] = self._create_clients()
+            return clients
+
+    def _create_clients(self) -> _LoopClients:
+        """Fresh clients and semaphores for one event loop"""
+
+        ollama_limits = self._providers["ollama"].limits
+        groq_limits = self._providers["groq"].limits
+
+        groq_client = None
+        if self.groq_api_key:
+            groq_client = AsyncGroq(
+                api_key=self.groq_api_key,
+                timeout=groq_limits.http_timeout(),
+                http_client=httpx.AsyncClient(
+                    timeout=groq_limits.http_timeout(),
+                    limits=groq_limits.http_limits()
+                )
+            )
+
+        return _LoopClients(
+            ollama_client=ollama.AsyncClient(
+                host=self.ollama_host,
+                timeout=ollama_limits.http_timeout(),
+                limits=ollama_limits.http_limits()
+            ),
+            groq_client=groq_client,
+            semaphores={
+                provider: asyncio.Semaphore(state.limits.max_concurrency)
+                for provider, state in self._providers.items()
+            }
+        )
+
+    def limits(self, provider: str) -> ProviderLimits:
+        """Settings for a provider ("ollama" or "groq")"""
+        return self._providers[provider].limits
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """
+        Hold one of the provider's concurrency slots
+
+        Streaming callers keep the slot until the stream is closed, since the
+        provider is still generating until then.
+        """
+
+        state = self._providers[provider]
+        semaphore = self._clients().semaphores[provider]
+        state.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            state.waiting -= 1
+
+        state.requests += 1
+        state.total_wait_seconds += time.perf_counter() - queued_at
+        state.in_flight += 1
+        try:
+            yield
+        finally:
+            state.in_flight -= 1
+            semaphore.release()
+
+    async def request(self, provider: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a non-streaming provider call inside a slot, bounded by request_timeout
+
+        Args:
+            provider: "ollama" or "groq"
+            call: Zero-argument function returning the request awaitable
+
+        Returns:
+            The call's result (errors are counted and re-raised)
+        """
+
+        state = self._providers[provider]
+        async with self.slot(provider):
+            try:
+                return await asyncio.wait_for(call(), timeout=state.limits.request_timeout)
+            except Exception as e:
+                self.record_error(provider, e)
+                raise
+
+    def record_error(self, provider: str, error: BaseException) -> None:
+        """Count a failed request, including timeouts raised mid-stream by the HTTP layer"""
+        state = self._providers[provider]
+        state.errors += 1
+        if isinstance(error, TIMEOUT_ERRORS):
+            state.timeouts += 1
+
+    async def aclose(self) -> None:
+        """Close the pooled connections opened on the running event loop"""
+        with self._lock:
+            clients = self._loops.pop(asyncio.get_running_loop(), None)
+        if clients is None:
+            return
+        await clients.ollama_client.close()
+        if clients.groq_client:
+            await clients.groq_client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-provider concurrency and queueing statistics"""
+        return {
+            provider: {**state.get_stats(), "available": provider == "ollama" or self.groq_available}
+            for provider, state in self._providers.items()
+        }
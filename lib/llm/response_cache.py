@@ -0,0 +1,380 @@
+"""
+LLM Response Cache - Exact and semantic reuse of generated responses
+Provides a bounded in-memory LRU tier and an optional on-disk SQLite tier with TTLs
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class CachedResponse:
+    """A stored generation (match and similarity describe the lookup that found it)"""
+    text: str
+    provider: str
+    model: str
+    latency_seconds: float
+    expires_at: float
+    semantic_namespace: Optional[str] = None
+    embedding: Optional[np.ndarray] = None
+    match: str = "exact"
+    similarity: float = 1.0
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM responses keyed by (mode, provider, model, sampling params, prompt hash)
+
+    Exact lookups hit the in-memory LRU first, then the on-disk tier (if
+    configured); disk hits are promoted into memory. With a
+    ``semantic_threshold`` and an embedder, a miss can also be served by a
+    cached response whose prompt differs only in the user's question, when
+    the two questions' embeddings are at least that similar. Only the
+    question is compared: the rest of the prompt (instructions, retrieved
+    examples, tool results) must match exactly, so a semantic hit never
+    answers a different task. Semantic matching covers the in-memory tier.
+
+    Only requests sampled at or below ``max_temperature`` are cached: above
+    it each call is one draw from the model, and replaying a single draw
+    would make every repeat identical. Entries expire after ``ttl_seconds``
+    (wall-clock, so persisted entries expire across restarts too). All
+    operations are thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        cache_dir: Optional[str] = None,
+        ttl_seconds: Optional[float] = 3600.0,
+        semantic_threshold: Optional[float] = None,
+        embedder: Optional[Callable[[List[str]], Any]] = None,
+        disabled_modes: Iterable[str] = (),
+        max_temperature: Optional[float] = 0.0
+    ):
+        """
+        Initialize the response cache
+
+        Args:
+            max_entries: Maximum number of responses held in memory (0 disables caching)
+            cache_dir: Directory for the persistent tier (memory-only if None)
+            ttl_seconds: Seconds a response stays valid (no expiry if None)
+            semantic_threshold: Cosine similarity a question needs for a semantic hit (exact only if None)
+            embedder: Callable embedding a list of texts (required for semantic hits)
+            disabled_modes: Agent modes whose responses are never cached
+            max_temperature: Highest sampling temperature whose responses are cached (any if None)
+        """
+
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.embedder = embedder
+        self.disabled_modes = set(disabled_modes)
+        self.max_temperature = max_temperature
+
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(cache_dir, "llm_responses.sqlite3"),
+                check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, semantic_namespace TEXT, provider TEXT NOT NULL, model TEXT NOT NULL, "
+                "response TEXT NOT NULL, latency_seconds REAL NOT NULL, expires_at REAL NOT NULL, "
+                "embedding BLOB, created_at REAL NOT NULL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+            self._load_recent()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.semantic_threshold is not None and self.embedder is not None
+
+    def enabled_for(self, agent_mode: str, params: Optional[Dict[str, Any]] = None) -> bool:
+        """Whether responses in this agent mode (sampled with these params) are cached"""
+        if self.max_entries <= 0 or agent_mode in self.disabled_modes:
+            return False
+        temperature = (params or {}).get("temperature", 0.0)
+        return self.max_temperature is None or temperature <= self.max_temperature
+
+    @staticmethod
+    def _namespace(agent_mode: str, provider: str, model: str, params: Dict[str, Any]) -> str:
+        return hashlib.sha256(
+            json.dumps([agent_mode, provider, model, params], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def make_key(cls, agent_mode: str, provider: str, model: str, params: Dict[str, Any], prompt: str) -> str:
+        """Hash a prompt and everything that shapes its response into a cache key"""
+        digest = hashlib.sha256(cls._namespace(agent_mode, provider, model, params).encode("utf-8"))
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def semantic_namespace(
+        cls,
+        agent_mode: str,
+        provider: str,
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+        question: Optional[str]
+    ) -> Optional[str]:
+        """Group of prompts that may share responses: same settings, same prompt apart from the question"""
+        if not question or question not in prompt:
+            return None
+        digest = hashlib.sha256(cls._namespace(agent_mode, provider, model, params).encode("utf-8"))
+        for part in prompt.split(question):
+            digest.update(hashlib.sha256(part.encode("utf-8")).digest())
+        return digest.hexdigest()
+
+    def _embed(self, text: str) -> np.ndarray:
+        embedding = np.asarray(self.embedder([text]), dtype=np.float32).reshape(-1)
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+    def get(
+        self,
+        agent_mode: str,
+        routes: Sequence[Tuple[str, str]],
+        params: Dict[str, Any],
+        prompt: str,
+        question: Optional[str] = None
+    ) -> Optional[CachedResponse]:
+        """
+        Look up a cached response
+
+        Args:
+            agent_mode: Agent mode of the request
+            routes: (provider, model) pairs that could serve the request, in preference order
+            params: Sampling parameters of the request
+            prompt: Full prompt text
+            question: The user's question inside the prompt (enables semantic matching)
+
+        Returns:
+            The cached response, or None on a miss
+        """
+
+        if not self.enabled_for(agent_mode, params):
+            return None
+
+        with self._lock:
+            for provider, model in routes:
+                entry = self._lookup(self.make_key(agent_mode, provider, model, params, prompt))
+                if entry is not None:
+                    self.exact_hits += 1
+                    self.saved_seconds += entry.latency_seconds
+                    return replace(entry, match="exact", similarity=1.0)
+
+            namespaces = [
+                self.semantic_namespace(agent_mode, provider, model, params, prompt, question)
+                for provider, model in routes
+            ] if self.semantic_enabled else []
+            namespaces = [namespace for namespace in namespaces if namespace is not None]
+            has_candidates = any(entry.semantic_namespace in namespaces for entry in self._memory.values())
+
+        if has_candidates:
+            found = self._semantic_lookup(namespaces, self._embed(question))
+            if found is not None:
+                return found
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _semantic_lookup(self, namespaces: List[str], embedding: np.ndarray) -> Optional[CachedResponse]:
+        """Most similar live entry in the first namespace holding one above the threshold"""
+
+        now = time.time()
+        with self._lock:
+            for namespace in namespaces:
+                candidates = [
+                    (key, entry) for key, entry in self._memory.items()
+                    if entry.semantic_namespace == namespace and entry.embedding is not None and entry.expires_at >= now
+                ]
+                if not candidates:
+                    continue
+                similarities = np.stack([entry.embedding for _, entry in candidates]) @ embedding
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.semantic_threshold:
+                    key, entry = candidates[best]
+                    self._memory.move_to_end(key)
+                    self.semantic_hits += 1
+                    self.saved_seconds += entry.latency_seconds
+                    return replace(entry, match="semantic", similarity=float(similarities[best]))
+        return None
+
+    def put(
+        self,
+        agent_mode: str,
+        provider: str,
+        model: str,
+        params: Dict[str, Any],
+        prompt: str,
+        text: str,
+        latency_seconds: float,
+        question: Optional[str] = None
+    ) -> None:
+        """
+        Store a generated response
+
+        Args:
+            agent_mode: Agent mode of the request
+            provider: Provider that generated the response
+            model: Model that generated the response
+            params: Sampling parameters of the request
+            prompt: Full prompt text
+            text: Generated response
+            latency_seconds: How long the generation took (reported as saved time on later hits)
+            question: The user's question inside the prompt (enables semantic matching)
+        """
+
+        if not self.enabled_for(agent_mode, params):
+            return
+
+        namespace = None
+        embedding = None
+        if self.semantic_enabled:
+            namespace = self.semantic_namespace(agent_mode, provider, model, params, prompt, question)
+            if namespace is not None:
+                embedding = self._embed(question)
+
+        expires_at = time.time() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        key = self.make_key(agent_mode, provider, model, params, prompt)
+        entry = CachedResponse(text, provider, model, latency_seconds, expires_at, namespace, embedding)
+
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, semantic_namespace, provider, model, response, "
+                    "latency_seconds, expires_at, embedding, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key, namespace, provider, model, text, latency_seconds, expires_at,
+                        embedding.tobytes() if embedding is not None else None, time.time()
+                    )
+                )
+                self._db.commit()
+
+    def _lookup(self, key: str) -> Optional[CachedResponse]:
+        """Look up a live entry in memory, then on disk (caller holds the lock)"""
+
+        entry = self._memory.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT semantic_namespace, provider, model, response, latency_seconds, expires_at, embedding "
+                "FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                entry = self._from_row(row)
+                self._remember(key, entry)
+
+        if entry is None:
+            return None
+        if entry.expires_at < time.time():
+            self._forget(key)
+            self.expirations += 1
+            return None
+
+        self._memory.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def _from_row(row: Tuple[Any, ...]) -> CachedResponse:
+        namespace, provider, model, text, latency_seconds, expires_at, embedding = row
+        return CachedResponse(
+            text, provider, model, latency_seconds, expires_at, namespace,
+            np.frombuffer(embedding, dtype=np.float32) if embedding is not None else None
+        )
+
+    def _load_recent(self) -> None:
+        """Fill the in-memory tier from the newest persisted entries, so semantic matching sees them"""
+        rows = self._db.execute(
+            "SELECT key, semantic_namespace, provider, model, response, latency_seconds, expires_at, embedding "
+            "FROM responses ORDER BY created_at DESC LIMIT ?",
+            (self.max_entries,)
+        ).fetchall()
+        for row in reversed(rows):
+            self._memory[row[0]] = self._from_row(row[1:])
+
+    def _remember(self, key: str, entry: CachedResponse) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _forget(self, key: str) -> None:
+        """Drop an entry from both tiers (caller holds the lock)"""
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters, time saved and tier sizes"""
+
+        with self._lock:
+            hits = self.exact_hits + self.semantic_hits
+            lookups = hits + self.misses
+            stats = {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "semantic_threshold": self.semantic_threshold if self.semantic_enabled else None,
+                "disabled_modes": sorted(self.disabled_modes),
+                "max_temperature": self.max_temperature,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "avg_saved_ms_per_hit": round(self.saved_seconds * 1000 / hits, 1) if hits else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "persistent": self._db is not None
+            }
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+        return stats
+
+    def clear(self, include_disk: bool = False) -> None:
+        """Drop cached responses (and the persistent tier if requested)"""
+
+        with self._lock:
+            self._memory.clear()
+            if include_disk and self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the persistent tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
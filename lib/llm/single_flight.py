@@ -0,0 +1,165 @@
+"""
+Single Flight - Coalescing of identical in-flight async calls and streams
+Concurrent callers with the same key share one underlying generation
+"""
+
+import asyncio
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+class StreamAbandonedError(RuntimeError):
+    """A shared stream was cancelled after its last subscriber left"""
+
+
+class _Flight:
+    """One in-flight call or stream and the callers attached to it"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.items: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.updated = asyncio.Event()
+
+    def notify(self) -> None:
+        """Wake subscribers waiting for the next item"""
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests onto one execution
+
+    The first caller for a key starts the work in its own task; callers
+    arriving while it runs attach to it instead of starting their own.
+    Stream subscribers that join late first receive everything produced so
+    far, so every subscriber sees the whole stream. A caller that is
+    cancelled or stops iterating only detaches itself; the shared work is
+    cancelled once no caller is left. Keys are released as soon as the
+    work finishes, so only concurrent requests are coalesced.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _Flight] = {}
+
+        self.leaders = 0
+        self.followers = 0
+        self.abandoned = 0
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await func(), sharing the result with concurrent calls for the same key
+
+        Args:
+            key: Identity of the request
+            func: Zero-argument coroutine function doing the work
+
+        Returns:
+            The shared result (or raises the shared exception)
+        """
+
+        flight = self._calls.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(func())
+            flight.task.add_done_callback(lambda _: self._release(self._calls, key, flight))
+            self._calls[key] = flight
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Unregister first, so a new identical call starts fresh instead of joining a dying flight
+                self._release(self._calls, key, flight)
+                flight.task.cancel()
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def stream(self, key: str, func: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """
+        Iterate func(), sharing its items with concurrent streams for the same key
+
+        Args:
+            key: Identity of the request
+            func: Zero-argument function returning the async iterator doing the work
+
+        Yields:
+            Every item of the shared stream, from the first one
+        """
+
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(self._produce(key, flight, func))
+            self._streams[key] = flight
+            self.leaders += 1
+        else:
+            self.followers += 1
+
+        flight.waiters += 1
+        try:
+            position = 0
+            while True:
+                while position < len(flight.items):
+                    yield flight.items[position]
+                    position += 1
+                if flight.done:
+                    break
+                await flight.updated.wait()
+
+            if flight.error is not None:
+                raise flight.error
+
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Last subscriber gone: unregister before any await, so a new identical
+                # stream starts fresh, then stop the shared stream and close it upstream
+                self._release(self._streams, key, flight)
+                flight.task.cancel()
+                self.abandoned += 1
+                await asyncio.wait([flight.task])
+
+    async def _produce(self, key: str, flight: _Flight, func: Callable[[], AsyncIterator[Any]]) -> None:
+        """Drive the shared stream, buffering items for the subscribers"""
+        try:
+            async with aclosing(func()) as items:
+                async for item in items:
+                    flight.items.append(item)
+                    flight.notify()
+        except Exception as e:
+            flight.error = e
+        except asyncio.CancelledError:
+            # Never let a cut-off stream look finished to a subscriber
+            flight.error = StreamAbandonedError("The shared stream was cancelled before it finished")
+            raise
+        finally:
+            flight.done = True
+            flight.notify()
+            self._release(self._streams, key, flight)
+
+    @staticmethod
+    def _release(flights: Dict[str, _Flight], key: str, flight: _Flight) -> None:
+        if flights.get(key) is flight:
+            del flights[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Coalescing counters"""
+        requests = self.leaders + self.followers
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "executions": self.leaders,
+            "coalesced": self.followers,
+            "coalesced_rate": round(self.followers / requests, 3) if requests else 0.0,
+            "abandoned": self.abandoned
+        }
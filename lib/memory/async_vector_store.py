@@ -0,0 +1,320 @@
+"""
+Async Vector Store - Non-blocking facade over FreeVectorStore
+Runs encoding and backend calls in a bounded thread pool and micro-batches concurrent searches
+"""
+
+import asyncio
+import json
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+from memory.vector_store import FreeVectorStore
+
+
+@dataclass
+class _PendingSearch:
+    """A search waiting for the next micro-batch flush"""
+    query: str
+    n_results: int
+    where: Optional[Dict[str, Any]]
+    where_document: Optional[Dict[str, str]]
+    future: asyncio.Future
+    group_key: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.group_key = json.dumps(
+            [self.n_results, self.where, self.where_document],
+            sort_keys=True,
+            default=str
+        )
+
+
+@dataclass
+class _LoopBatch:
+    """Searches waiting on one event loop and the task that will flush them"""
+    loop: asyncio.AbstractEventLoop
+    pending: List[_PendingSearch] = field(default_factory=list)
+    flush_task: Optional[asyncio.Task] = None
+
+
+class AsyncFreeVectorStore:
+    """
+    Async facade for FreeVectorStore
+
+    - Every store call runs in a bounded thread pool, so encoding and backend
+      I/O never block the event loop. (A thread pool rather than a process
+      pool: the encoder and NumPy release the GIL, and the store's model and
+      client cannot be shared across processes.)
+    - Searches arriving within ``batch_window`` seconds are flushed together:
+      all query texts go through one encoder call, then one backend query is
+      issued per distinct (n_results, where, where_document) group.
+    - Cancelling a caller drops its search from the pending batch; if the
+      batch is already running, its result is discarded.
+    - Pending searches are batched per event loop, so the facade can be
+      shared by callers running on different loops.
+    """
+
+    def __init__(
+        self,
+        vector_store: FreeVectorStore,
+        max_workers: int = 4,
+        batch_window: float = 0.005,
+        max_batch_size: int = 64
+    ):
+        """
+        Initialize the async facade
+
+        Args:
+            vector_store: FreeVectorStore to wrap
+            max_workers: Size of the thread pool running store calls
+            batch_window: Seconds to wait for more searches before flushing a batch
+            max_batch_size: Flush immediately once this many searches are pending
+        """
+
+        self.vector_store = vector_store
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vector-store")
+        self._batches: Dict[asyncio.AbstractEventLoop, _LoopBatch] = {}
+        # Stop the worker threads once the facade is garbage collected without close()
+        weakref.finalize(self, self._executor.shutdown, wait=False)
+
+        # Micro-batching statistics
+        self.batches_flushed = 0
+        self.searches_batched = 0
+        self.searches_cancelled = 0
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking store call in the thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def search_similar(
+        self,
+        query: str,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None,
+        mode: str = "vector"
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for semantically similar examples (micro-batched)
+
+        Args:
+            query: The search query text
+            n_results: Number of results to return
+            where: Metadata filters
+            where_document: Document content filters
+            mode: "vector", "keyword" or "hybrid" (only vector searches are micro-batched)
+
+        Returns:
+            List of similar examples with scores and metadata
+        """
+
+        if mode != "vector":
+            return await self._run(self.vector_store.search_similar, query, n_results, where, where_document, mode)
+
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = _LoopBatch(loop)
+        pending = _PendingSearch(query, n_results, where, where_document, loop.create_future())
+        batch.pending.append(pending)
+
+        if len(batch.pending) >= self.max_batch_size:
+            self._start_flush(batch, delay=0)
+        elif batch.flush_task is None:
+            self._start_flush(batch, delay=self.batch_window)
+
+        try:
+            return await pending.future
+        except asyncio.CancelledError:
+            self.searches_cancelled += 1
+            if pending in batch.pending:
+                batch.pending.remove(pending)
+            raise
+
+    async def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Batched multi-query search (already one encoder call, so not micro-batched)"""
+        return await self._run(self.vector_store.search_many, queries, n_results, where, where_document)
+
+    async def search_with_fallback(
+        self,
+        query: str,
+        mode: Optional[str],
+        n_results: int = 5,
+        min_mode_results: int = 3
+    ) -> List[Dict[str, Any]]:
+        """Mode search topped up with examples from any mode, in one call"""
+        return await self._run(self.vector_store.search_with_fallback, query, mode, n_results, min_mode_results)
+
+    async def add_example(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        custom_id: Optional[str] = None
+    ) -> str:
+        """Add a text example to the vector store"""
+        return await self._run(self.vector_store.add_example, text, metadata, custom_id)
+
+    async def add_examples(self, texts: List[str], **kwargs: Any) -> Dict[str, Any]:
+        """Add many text examples in batches"""
+        return await self._run(self.vector_store.add_examples, texts, **kwargs)
+
+    async def add_document(self, source: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Add a long document as overlapping chunks"""
+        return await self._run(self.vector_store.add_document, source, **kwargs)
+
+    async def search_documents(self, query: str, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Search chunks grouped back into their parent documents"""
+        return await self._run(self.vector_store.search_documents, query, **kwargs)
+
+    async def upsert_examples(self, texts: List[str], ids: List[str], **kwargs: Any) -> Dict[str, Any]:
+        """Insert new examples and update existing ones in batches"""
+        return await self._run(self.vector_store.upsert_examples, texts, ids, **kwargs)
+
+    async def update_metadata_many(self, updates: Dict[str, Dict[str, Any]], **kwargs: Any) -> int:
+        """Merge metadata changes into many examples without re-embedding"""
+        return await self._run(self.vector_store.update_metadata_many, updates, **kwargs)
+
+    async def update_example(self, example_id: str, **kwargs: Any) -> bool:
+        """Update an existing example"""
+        return await self._run(self.vector_store.update_example, example_id, **kwargs)
+
+    async def delete_example(self, example_id: str) -> bool:
+        """Delete an example from the vector store"""
+        return await self._run(self.vector_store.delete_example, example_id)
+
+    async def get_example_by_id(self, example_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a specific example by ID"""
+        return await self._run(self.vector_store.get_example_by_id, example_id)
+
+    async def get_collection_stats(self) -> Dict[str, Any]:
+        """Get statistics about the vector store collection"""
+        stats = await self._run(self.vector_store.get_collection_stats)
+        stats["async_batching"] = self.get_batching_stats()
+        return stats
+
+    def _start_flush(self, batch: _LoopBatch, delay: float) -> None:
+        """Schedule a flush of a loop's pending searches"""
+        if batch.flush_task is not None and delay > 0:
+            return
+        if batch.flush_task is not None:
+            batch.flush_task.cancel()
+        batch.flush_task = batch.loop.create_task(self._flush_after(batch, delay))
+
+    def _detach(self, batch: _LoopBatch) -> None:
+        """Stop collecting into a batch; the loop's next search starts a new one"""
+        batch.flush_task = None
+        if self._batches.get(batch.loop) is batch:
+            del self._batches[batch.loop]
+
+    async def _flush_after(self, batch: _LoopBatch, delay: float) -> None:
+        """Wait for the batching window, then run everything pending"""
+
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # An immediate flush that replaced this one takes the batch over
+                if batch.flush_task is asyncio.current_task():
+                    self._detach(batch)
+                raise
+
+        self._detach(batch)
+        searches = [pending for pending in batch.pending if not pending.future.done()]
+
+        if not searches:
+            return
+
+        self.batches_flushed += 1
+        self.searches_batched += len(searches)
+
+        try:
+            results = await self._run(self._search_batch, searches)
+        except Exception as e:
+            for pending in searches:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in zip(searches, results):
+            if not pending.future.done():
+                pending.future.set_result(result)
+
+    def _search_batch(self, batch: List[_PendingSearch]) -> List[List[Dict[str, Any]]]:
+        """Encode all queries in one call, then query once per filter group (runs in the pool)"""
+
+        groups: Dict[str, List[int]] = {}
+        for i, pending in enumerate(batch):
+            groups.setdefault(pending.group_key, []).append(i)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in batch]
+        # One state snapshot, so every query is encoded for the collection it searches
+        with self.vector_store._reading() as state:
+            embeddings = self.vector_store._encode([pending.query for pending in batch], state=state)
+            for positions in groups.values():
+                first = batch[positions[0]]
+                group_results = self.vector_store.search_by_embeddings(
+                    embeddings[positions],
+                    n_results=first.n_results,
+                    where=first.where,
+                    where_document=first.where_document,
+                    state=state
+                )
+                for i, result in zip(positions, group_results):
+                    results[i] = result
+                if getattr(self.vector_store, "read_listeners", None):
+                    self.vector_store._notify_read(
+                        [batch[i].query for i in positions], first.n_results, first.where, first.where_document,
+                        group_results
+                    )
+
+        return results
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Micro-batching counters"""
+        return {
+            "batches_flushed": self.batches_flushed,
+            "searches_batched": self.searches_batched,
+            "searches_cancelled": self.searches_cancelled,
+            "average_batch_size": (
+                round(self.searches_batched / self.batches_flushed, 2) if self.batches_flushed else 0.0
+            ),
+            "pending": sum(len(batch.pending) for batch in list(self._batches.values()))
+        }
+
+    def close(self) -> None:
+        """Shut down the thread pool"""
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncFreeVectorStore":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def get_async_vector_store(vector_store: FreeVectorStore) -> AsyncFreeVectorStore:
+    """
+    Get or create the shared async facade for a vector store, so all callers batch together
+
+    The facade is kept on the store itself, so both are freed together.
+    """
+
+    facade = getattr(vector_store, "_async_facade", None)
+    if facade is None:
+        facade = AsyncFreeVectorStore(vector_store)
+        vector_store._async_facade = facade
+
+    return facade
@@ -0,0 +1,186 @@
+"""
+Text Chunking - Streaming, overlapping splits of long documents for embedding
+Keeps each chunk within the embedder's token window so nothing is silently truncated
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import IO, Any, Iterable, Iterator, List, Optional, Union
+
+# Words and individual punctuation marks; sentence-transformer tokenizers
+# never merge across these boundaries, so chunks cut here split no token
+DEFAULT_TOKEN_PATTERN = r"\w+|[^\w\s]"
+
+
+@dataclass
+class TextChunk:
+    """One chunk of a document with its character span"""
+    text: str
+    index: int
+    start: int
+    end: int
+    tokens: int
+
+
+class TextChunker:
+    """
+    Splits text into overlapping chunks of at most ``max_tokens`` tokens
+
+    Chunks start and end on word or punctuation boundaries and the last
+    ``overlap_tokens`` tokens of each chunk open the next one, so a passage
+    that straddles a boundary is still embedded whole in one of them. Input
+    can be a string, a file object or any iterable of string pieces; only the
+    current chunk and one unread piece are held in memory.
+
+    With the embedder's ``tokenizer``, each word is counted as the number of
+    word pieces the model will actually see. Without one, every
+    ``token_pattern`` match counts as one token. The default budget of 160
+    tokens leaves headroom below the 256 word-piece window of the MiniLM
+    models in that case, since a word can split into several word pieces.
+    A single word longer than the budget gets a chunk of its own.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 160,
+        overlap_tokens: int = 32,
+        token_pattern: str = DEFAULT_TOKEN_PATTERN,
+        read_size: int = 1 << 16,
+        tokenizer: Optional[Any] = None
+    ):
+        """
+        Initialize the chunker
+
+        Args:
+            max_tokens: Maximum tokens per chunk
+            overlap_tokens: Tokens repeated at the start of the following chunk
+            token_pattern: Regular expression matching one word (the possible chunk boundaries)
+            read_size: Characters read per call when chunking a file object
+            tokenizer: The embedder's tokenizer (a Hugging Face tokenizer or a ``tokenizers.Tokenizer``);
+                tokens are counted with it when given
+        """
+
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be between 0 and max_tokens - 1")
+
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.token_pattern = re.compile(token_pattern)
+        self.read_size = read_size
+        self.tokenizer = tokenizer
+        # Documents repeat the same words, so each word is tokenized once
+        self._word_tokens = lru_cache(maxsize=1 << 16)(self._count_word_tokens)
+
+    def _count_word_tokens(self, word: str) -> int:
+        """Word pieces the tokenizer splits one word into (at least one)"""
+        if self.tokenizer is None:
+            return 1
+        if hasattr(self.tokenizer, "tokenize"):
+            pieces = self.tokenizer.tokenize(word)
+        else:
+            pieces = self.tokenizer.encode(word, add_special_tokens=False).tokens
+        return max(1, len(pieces))
+
+    def _window_end(self, counts: List[int], start: int) -> int:
+        """End (exclusive) of the longest run from start within max_tokens (at least one word)"""
+        end, total = start, 0
+        while end < len(counts) and (end == start or total + counts[end] <= self.max_tokens):
+            total += counts[end]
+            end += 1
+        return end
+
+    def _next_start(self, counts: List[int], start: int, end: int) -> int:
+        """Start of the next window: the trailing words of this one that fit in overlap_tokens"""
+        next_start, overlap = end, 0
+        while next_start - 1 > start and overlap + counts[next_start - 1] <= self.overlap_tokens:
+            next_start -= 1
+            overlap += counts[next_start]
+        return next_start
+
+    def _pieces(self, source: Union[str, IO[str], Iterable[str]]) -> Iterator[str]:
+        """Normalize the supported inputs to a stream of string pieces"""
+        if isinstance(source, str):
+            yield source
+        elif hasattr(source, "read"):
+            while True:
+                piece = source.read(self.read_size)
+                if not piece:
+                    break
+                yield piece
+        else:
+            yield from source
+
+    def chunk(self, source: Union[str, IO[str], Iterable[str]]) -> Iterator[TextChunk]:
+        """
+        Stream chunks of a document
+
+        Args:
+            source: Document text, a text file object or an iterable of text pieces
+
+        Yields:
+            TextChunk objects in document order (character offsets refer to the whole document)
+        """
+
+        buffer = ""
+        buffer_offset = 0  # Document position of buffer[0]
+        emitted_end = 0  # Document position where the last chunk ended
+        index = 0
+
+        pieces = self._pieces(source)
+        exhausted = False
+        while not exhausted:
+            piece = next(pieces, None)
+            if piece is None:
+                exhausted = True
+            else:
+                buffer += piece
+
+            # A word touching the end of the buffer may continue in the next piece
+            spans = [match.span() for match in self.token_pattern.finditer(buffer)]
+            if not exhausted and spans and spans[-1][1] == len(buffer):
+                spans.pop()
+            counts = [self._word_tokens(buffer[word_start:word_end]) for word_start, word_end in spans]
+
+            start = 0
+            while start < len(spans) and buffer_offset + spans[-1][1] > emitted_end:
+                end = self._window_end(counts, start)
+                if end < len(spans) and buffer_offset + spans[end - 1][1] <= emitted_end:
+                    # The overlap left no room for the next word: shed overlap until the window moves on
+                    start += 1
+                    continue
+                tokens = sum(counts[start:end])
+                # Unless the window is full, more text may still extend it
+                if not exhausted and end == len(spans) and tokens < self.max_tokens:
+                    break
+                chunk_start, chunk_end = spans[start][0], spans[end - 1][1]
+                yield TextChunk(
+                    text=buffer[chunk_start:chunk_end],
+                    index=index,
+                    start=buffer_offset + chunk_start,
+                    end=buffer_offset + chunk_end,
+                    tokens=tokens
+                )
+                index += 1
+                emitted_end = buffer_offset + chunk_end
+                if exhausted and end == len(spans):
+                    start = len(spans)
+                    break
+                start = self._next_start(counts, start, end)
+
+            # Drop text no later chunk will need
+            if start < len(spans):
+                keep_from = spans[start][0]
+            elif spans:
+                keep_from = spans[-1][1]
+            else:
+                keep_from = len(buffer) if exhausted else 0
+            buffer = buffer[keep_from:]
+            buffer_offset += keep_from
+
+    def split(self, text: str) -> List[str]:
+        """Split a whole string into chunk texts"""
+        return [chunk.text for chunk in self.chunk(text)]
+
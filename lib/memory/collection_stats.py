@@ -0,0 +1,90 @@
+"""
+Collection Statistics - Incrementally maintained vector store statistics
+Keeps totals, per-mode counts and a running quality-score mean up to date on writes
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+
+@dataclass
+class CollectionStatistics:
+    """Running statistics for one collection, updated on every add/update/delete"""
+    total_examples: int = 0
+    mode_counts: Dict[str, int] = field(default_factory=dict)
+    quality_sum: float = 0.0
+    quality_count: int = 0
+    last_reconciled: Optional[datetime] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @staticmethod
+    def _quality(metadata: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Parse the quality score from metadata, if present and numeric"""
+        if not metadata or "quality_score" not in metadata:
+            return None
+        try:
+            return float(metadata["quality_score"])
+        except (ValueError, TypeError):
+            return None
+
+    def _apply(self, metadata: Optional[Dict[str, Any]], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one record's contribution (caller holds the lock)"""
+        self.total_examples += sign
+
+        if metadata and "mode" in metadata:
+            mode = metadata["mode"]
+            count = self.mode_counts.get(mode, 0) + sign
+            if count > 0:
+                self.mode_counts[mode] = count
+            else:
+                self.mode_counts.pop(mode, None)
+
+        quality = self._quality(metadata)
+        if quality is not None:
+            self.quality_sum += sign * quality
+            self.quality_count += sign
+
+    def record_add(self, metadata: Optional[Dict[str, Any]]) -> None:
+        """Account for a newly added record"""
+        with self._lock:
+            self._apply(metadata, 1)
+
+    def record_delete(self, metadata: Optional[Dict[str, Any]]) -> None:
+        """Account for a deleted record"""
+        with self._lock:
+            self._apply(metadata, -1)
+
+    def record_update(self, old_metadata: Optional[Dict[str, Any]], new_metadata: Optional[Dict[str, Any]]) -> None:
+        """Account for a record whose metadata changed"""
+        with self._lock:
+            self._apply(old_metadata, -1)
+            self._apply(new_metadata, 1)
+
+    def rebuild(self, metadatas: Iterable[Optional[Dict[str, Any]]]) -> None:
+        """Replace the running statistics with a full recount"""
+        fresh = CollectionStatistics()
+        for metadata in metadatas:
+            fresh._apply(metadata, 1)
+
+        with self._lock:
+            self.total_examples = fresh.total_examples
+            self.mode_counts = fresh.mode_counts
+            self.quality_sum = fresh.quality_sum
+            self.quality_count = fresh.quality_count
+            self.last_reconciled = datetime.now()
+
+    def get_average_quality(self) -> float:
+        """Running mean of all parseable quality scores"""
+        return self.quality_sum / self.quality_count if self.quality_count > 0 else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of the current statistics"""
+        with self._lock:
+            return {
+                "total_examples": self.total_examples,
+                "examples_by_mode": dict(self.mode_counts),
+                "average_quality_score": round(self.get_average_quality(), 2),
+                "stats_last_reconciled": self.last_reconciled.isoformat() if self.last_reconciled else None
+            }
@@ -0,0 +1,170 @@
+"""
+Embedder Registry - Process-wide shared sentence transformer models
+Loads each embedder lazily on first use and shares it across vector stores
+Model names prefixed with "onnx:" load the ONNX Runtime CPU backend instead of PyTorch
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ONNX_PREFIX = "onnx:"
+
+
+class EmbedderRegistry:
+    """
+    Registry of loaded embedder models keyed by model name
+
+    Models are loaded on the first ``get`` call and shared by every caller in
+    the process. Loading is thread-safe: concurrent first requests for the
+    same model wait on a single load.
+
+    ``"onnx:all-MiniLM-L6-v2"`` selects the ONNX Runtime embedder for that
+    model (int8-quantized by default); plain names load a SentenceTransformer.
+    Because the backend is part of the name, stores using different backends
+    never share embedding cache entries.
+    """
+
+    def __init__(
+        self,
+        loader: Optional[Callable[[str], Any]] = None,
+        onnx_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the registry
+
+        Args:
+            loader: Callable that loads a model by name (SentenceTransformer / OnnxEmbedder if None)
+            onnx_options: Keyword arguments for OnnxEmbedder (quantize, intra_op_threads, inter_op_threads, ...)
+        """
+
+        self.loader = loader or self._default_loader
+        self.onnx_options = dict(onnx_options or {})
+
+        self._models: Dict[str, Any] = {}
+        self._load_times: Dict[str, float] = {}
+        self._loaded_at: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._model_locks: Dict[str, threading.Lock] = {}
+
+    def _default_loader(self, model_name: str) -> Any:
+        """Load an "onnx:"-prefixed model on ONNX Runtime, anything else with SentenceTransformer"""
+
+        if model_name.startswith(ONNX_PREFIX):
+            from memory.onnx_embedder import OnnxEmbedder
+            return OnnxEmbedder(model_name[len(ONNX_PREFIX):], **self.onnx_options)
+
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    def get(self, model_name: str) -> Any:
+        """
+        Get a model, loading it on first use
+
+        Args:
+            model_name: Sentence transformer model name or path
+
+        Returns:
+            The shared model instance
+        """
+
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model_lock = self._model_locks.setdefault(model_name, threading.Lock())
+
+        with model_lock:
+            # Another thread may have finished loading while we waited
+            model = self._models.get(model_name)
+            if model is not None:
+                return model
+
+            start_time = time.perf_counter()
+            model = self.loader(model_name)
+            load_time = time.perf_counter() - start_time
+
+            self._models[model_name] = model
+            self._load_times[model_name] = load_time
+            self._loaded_at[model_name] = datetime.now().isoformat()
+
+        logger.info(f"Loaded embedder {model_name} in {load_time:.2f}s")
+        return model
+
+    def warm_up(self, model_names: List[str]) -> Dict[str, float]:
+        """
+        Load models ahead of the first request
+
+        Args:
+            model_names: Models to load
+
+        Returns:
+            Load time in seconds per model (0.0 if it was already loaded)
+        """
+
+        load_times = {}
+        for model_name in model_names:
+            already_loaded = self.is_loaded(model_name)
+            self.get(model_name)
+            load_times[model_name] = 0.0 if already_loaded else round(self._load_times[model_name], 3)
+
+        return load_times
+
+    def unload(self, model_name: Optional[str] = None) -> List[str]:
+        """
+        Release loaded models so their memory can be reclaimed
+
+        Stores holding the registry reload the model on their next encode.
+
+        Args:
+            model_name: Model to unload (all models if None)
+
+        Returns:
+            Names of the models that were unloaded
+        """
+
+        with self._lock:
+            names = [model_name] if model_name is not None else list(self._models)
+            unloaded = []
+            for name in names:
+                if self._models.pop(name, None) is not None:
+                    self._load_times.pop(name, None)
+                    self._loaded_at.pop(name, None)
+                    unloaded.append(name)
+
+        if unloaded:
+            logger.info(f"Unloaded embedders: {', '.join(unloaded)}")
+        return unloaded
+
+    def is_loaded(self, model_name: str) -> bool:
+        """Whether a model is currently loaded"""
+        return model_name in self._models
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loaded models and their load times"""
+        return {
+            "loaded_models": list(self._models),
+            "load_times": {name: round(seconds, 3) for name, seconds in self._load_times.items()},
+            "loaded_at": dict(self._loaded_at),
+            "runtime_configs": {
+                name: model.get_config() for name, model in self._models.items() if hasattr(model, "get_config")
+            }
+        }
+
+
+# Global instance for easy access
+embedder_registry = None
+
+def get_embedder_registry() -> EmbedderRegistry:
+    """Get or create the process-wide embedder registry"""
+    global embedder_registry
+
+    if embedder_registry is None:
+        embedder_registry = EmbedderRegistry()
+
+    return embedder_registry
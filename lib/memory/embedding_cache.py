@@ -0,0 +1,224 @@
+"""
+Embedding Cache - Content-hash keyed cache for sentence embeddings
+Provides a bounded in-memory LRU tier and an optional on-disk SQLite tier
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (embedder model, normalized text hash)
+
+    Lookups hit the in-memory LRU first, then the on-disk tier (if configured).
+    Disk hits are promoted into memory. All operations are thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        cache_dir: Optional[str] = None
+    ):
+        """
+        Initialize the embedding cache
+
+        Args:
+            max_entries: Maximum number of embeddings held in memory
+            cache_dir: Directory for the persistent tier (memory-only if None)
+        """
+
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(
+                os.path.join(cache_dir, "embeddings.sqlite3"),
+                check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash TEXT NOT NULL, embedding BLOB NOT NULL, "
+                "PRIMARY KEY (model, text_hash))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so trivially different inputs share a cache entry"""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def text_hash(cls, text: str) -> str:
+        """Content hash of the normalized text"""
+        return hashlib.sha256(cls.normalize_text(text).encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a cached embedding
+
+        Args:
+            model: Embedder model name
+            text: Text that was embedded
+
+        Returns:
+            The cached embedding or None on a miss
+        """
+
+        key = (model, self.text_hash(text))
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, model: str, text: str, embedding: np.ndarray) -> None:
+        """Store an embedding in both tiers"""
+        key = (model, self.text_hash(text))
+        with self._lock:
+            self._store([(key, np.asarray(embedding, dtype=np.float32))])
+
+    def encode(
+        self,
+        model: str,
+        texts: List[str],
+        encoder: Callable[[List[str]], Any]
+    ) -> np.ndarray:
+        """
+        Return embeddings for texts, calling the encoder only for cache misses
+
+        Duplicate texts within one call are encoded once.
+
+        Args:
+            model: Embedder model name
+            texts: Texts to embed
+            encoder: Callable that embeds a list of texts into a 2D array
+
+        Returns:
+            Array of shape (len(texts), dim) in input order
+        """
+
+        keys = [(model, self.text_hash(text)) for text in texts]
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing: Dict[Tuple[str, str], List[int]] = OrderedDict()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                if key in missing:
+                    # Duplicate of a miss already queued for encoding
+                    missing[key].append(i)
+                    continue
+                cached = self._lookup(key)
+                if cached is None:
+                    missing[key] = [i]
+                else:
+                    embeddings[i] = cached
+
+        if missing:
+            miss_texts = [texts[positions[0]] for positions in missing.values()]
+            encoded = np.asarray(encoder(miss_texts), dtype=np.float32)
+
+            with self._lock:
+                self._store(list(zip(missing.keys(), encoded)))
+
+            for positions, embedding in zip(missing.values(), encoded):
+                for i in positions:
+                    embeddings[i] = embedding
+
+        if not embeddings:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        return np.stack(embeddings)
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        """Look up a key in memory, then on disk (caller holds the lock)"""
+
+        embedding = self._memory.get(key)
+        if embedding is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return embedding
+
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT embedding FROM embeddings WHERE model = ? AND text_hash = ?",
+                key
+            ).fetchone()
+            if row is not None:
+                embedding = np.frombuffer(row[0], dtype=np.float32)
+                self._remember(key, embedding)
+                self.disk_hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    def _store(self, items: List[Tuple[Tuple[str, str], np.ndarray]]) -> None:
+        """Write entries to both tiers (caller holds the lock)"""
+
+        for key, embedding in items:
+            self._remember(key, embedding)
+
+        if self._db is not None and items:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, embedding) VALUES (?, ?, ?)",
+                [(model, text_hash, embedding.tobytes()) for (model, text_hash), embedding in items]
+            )
+            self._db.commit()
+
+    def _remember(self, key: Tuple[str, str], embedding: np.ndarray) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entries"""
+
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes"""
+
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            stats = {
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "persistent": self._db is not None
+            }
+            if self._db is not None:
+                stats["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        return stats
+
+    def clear(self, include_disk: bool = False) -> None:
+        """Drop cached embeddings (and the persistent tier if requested)"""
+
+        with self._lock:
+            self._memory.clear()
+            if include_disk and self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def close(self) -> None:
+        """Close the persistent tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
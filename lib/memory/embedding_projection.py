@@ -0,0 +1,252 @@
+"""
+Embedding Projection - Dimensionality reduction for stored and query embeddings
+PCA or Matryoshka-style truncation to shrink vectors and speed up distance computation
+"""
+
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+PROJECTION_METHODS = ("pca", "truncate")
+
+
+class EmbeddingProjection:
+    """
+    Linear projection of embeddings to fewer dimensions
+
+    ``pca`` centers vectors on the fitted mean and keeps the top principal
+    components; ``truncate`` keeps the leading coordinates, which only
+    preserves quality for Matryoshka-trained models. Projected vectors are
+    L2-normalized so cosine and L2 rankings keep agreeing.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        dimension: int,
+        input_dimension: int,
+        mean: Optional[np.ndarray] = None,
+        components: Optional[np.ndarray] = None,
+        explained_variance_ratio: Optional[float] = None
+    ):
+        """
+        Initialize a projection (use fit() to compute one from embeddings)
+
+        Args:
+            method: "pca" or "truncate"
+            dimension: Output dimension
+            input_dimension: Dimension of the embeddings being projected
+            mean: Mean vector subtracted before projecting (pca)
+            components: Projection matrix of shape (dimension, input_dimension) (pca)
+            explained_variance_ratio: Share of the fitted variance the kept components explain
+        """
+
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Unsupported projection method: {method}")
+        if not 0 < dimension <= input_dimension:
+            raise ValueError(f"Projection dimension must be between 1 and {input_dimension}")
+        if method == "pca" and (mean is None or components is None):
+            raise ValueError("A PCA projection needs a mean and components")
+
+        self.method = method
+        self.dimension = dimension
+        self.input_dimension = input_dimension
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self.components = None if components is None else np.asarray(components, dtype=np.float32)
+        self.explained_variance_ratio = explained_variance_ratio
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, dimension: int, method: str = "pca") -> "EmbeddingProjection":
+        """
+        Fit a projection on a sample of embeddings
+
+        Args:
+            embeddings: Matrix of shape (n, input_dimension)
+            dimension: Output dimension
+            method: "pca" or "truncate"
+
+        Returns:
+            The fitted projection
+        """
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or not len(embeddings):
+            raise ValueError("Fitting a projection needs a non-empty 2D embedding matrix")
+        input_dimension = embeddings.shape[1]
+
+        if method == "truncate":
+            return cls("truncate", dimension, input_dimension)
+
+        # Eigenvectors of the covariance matrix; input_dimension x input_dimension
+        # stays small, so this is cheaper than an SVD of the sample itself
+        mean = embeddings.mean(axis=0)
+        centered = (embeddings - mean).astype(np.float64)
+        covariance = centered.T @ centered / max(1, len(embeddings) - 1)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1][:dimension]
+        total_variance = float(eigenvalues.clip(min=0).sum())
+        explained = float(eigenvalues[order].clip(min=0).sum() / total_variance) if total_variance > 0 else 1.0
+
+        return cls(
+            "pca",
+            dimension,
+            input_dimension,
+            mean=mean,
+            components=eigenvectors[:, order].T,
+            explained_variance_ratio=explained
+        )
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Project embeddings (1D or 2D) and L2-normalize the result"""
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        single = embeddings.ndim == 1
+        if single:
+            embeddings = embeddings[None, :]
+        if embeddings.shape[1] != self.input_dimension:
+            raise ValueError(
+                f"Embedding dimension {embeddings.shape[1]} does not match projection input {self.input_dimension}"
+            )
+
+        if self.method == "truncate":
+            projected = embeddings[:, :self.dimension].copy()
+        else:
+            projected = (embeddings - self.mean) @ self.components.T
+
+        projected /= np.maximum(np.linalg.norm(projected, axis=1, keepdims=True), 1e-12)
+        return projected[0] if single else projected
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Write the projection to an .npz file (atomically)"""
+        path = os.fspath(path)
+        arrays: Dict[str, Any] = {
+            "method": np.array(self.method),
+            "dimension": np.array(self.dimension),
+            "input_dimension": np.array(self.input_dimension)
+        }
+        if self.method == "pca":
+            arrays.update(
+                mean=self.mean,
+                components=self.components,
+                explained_variance_ratio=np.array(self.explained_variance_ratio)
+            )
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> "EmbeddingProjection":
+        """Read a projection written by save()"""
+        with np.load(os.fspath(path)) as data:
+            method = str(data["method"])
+            return cls(
+                method,
+                int(data["dimension"]),
+                int(data["input_dimension"]),
+                mean=data["mean"] if method == "pca" else None,
+                components=data["components"] if method == "pca" else None,
+                explained_variance_ratio=float(data["explained_variance_ratio"]) if method == "pca" else None
+            )
+
+    def get_config(self) -> Dict[str, Any]:
+        """Projection settings, for stats and manifests"""
+        return {
+            "method": self.method,
+            "dimension": self.dimension,
+            "input_dimension": self.input_dimension,
+            "explained_variance_ratio": (
+                round(self.explained_variance_ratio, 4) if self.explained_variance_ratio is not None else None
+            )
+        }
+
+
+def _top_k_excluding_self(corpus: np.ndarray, queries: np.ndarray, query_rows: np.ndarray, k: int) -> np.ndarray:
+    """Row indices of each query's k nearest corpus vectors by cosine, skipping the query's own row"""
+    scores = queries @ corpus.T
+    scores[np.arange(len(query_rows)), query_rows] = -np.inf
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return top
+
+
+def projection_recall_report(
+    embeddings: np.ndarray,
+    dimensions: Sequence[int],
+    k: int = 10,
+    n_queries: int = 200,
+    method: str = "pca",
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Measure how well projected embeddings preserve nearest neighbours
+
+    A sample of the embeddings serves as queries; for each dimension the
+    projection is fitted on the embeddings and recall@k is the share of each
+    query's exact full-dimension top-k that the projected search also returns.
+
+    Args:
+        embeddings: Full-dimension embeddings of shape (n, input_dimension)
+        dimensions: Output dimensions to evaluate
+        k: Neighbours compared per query
+        n_queries: Number of embeddings used as queries
+        method: "pca" or "truncate"
+        seed: Random seed for the query sample
+
+    Returns:
+        One row per dimension (plus the full dimension as a baseline) with
+        recall@k, bytes per vector, brute-force search time and explained variance
+    """
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    n, input_dimension = embeddings.shape
+    k = min(k, n - 1)
+    if k < 1:
+        raise ValueError("The recall report needs at least two embeddings")
+
+    rng = np.random.default_rng(seed)
+    query_rows = rng.choice(n, size=min(n_queries, n), replace=False)
+
+    start_time = time.perf_counter()
+    truth = _top_k_excluding_self(embeddings, embeddings[query_rows], query_rows, k)
+    full_search_ms = (time.perf_counter() - start_time) * 1000 / len(query_rows)
+
+    report = [{
+        "dimension": input_dimension,
+        "method": "none",
+        f"recall_at_{k}": 1.0,
+        "bytes_per_vector": input_dimension * 4,
+        "compression": 1.0,
+        "search_ms_per_query": round(full_search_ms, 4),
+        "explained_variance_ratio": 1.0
+    }]
+
+    for dimension in sorted(set(dimensions), reverse=True):
+        if dimension >= input_dimension:
+            continue
+        projection = EmbeddingProjection.fit(embeddings, dimension, method=method)
+        projected = projection.transform(embeddings)
+
+        start_time = time.perf_counter()
+        found = _top_k_excluding_self(projected, projected[query_rows], query_rows, k)
+        search_ms = (time.perf_counter() - start_time) * 1000 / len(query_rows)
+
+        recall = np.mean([
+            len(set(truth_row.tolist()) & set(found_row.tolist())) / k
+            for truth_row, found_row in zip(truth, found)
+        ])
+        report.append({
+            "dimension": dimension,
+            "method": method,
+            f"recall_at_{k}": round(float(recall), 4),
+            "bytes_per_vector": dimension * 4,
+            "compression": round(input_dimension / dimension, 2),
+            "search_ms_per_query": round(search_ms, 4),
+            "explained_variance_ratio": (
+                round(projection.explained_variance_ratio, 4)
+                if projection.explained_variance_ratio is not None else None
+            )
+        })
+
+    return report
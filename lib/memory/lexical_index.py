@@ -0,0 +1,277 @@
+"""
+Lexical Index - Incrementally maintained inverted index with BM25 ranking
+Serves keyword search and narrows document substring filters without scanning every document
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Document filter operators the index understands (ChromaDB where_document syntax)
+_DOCUMENT_OPERATORS = {"$contains", "$not_contains", "$regex", "$not_regex", "$and", "$or"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens"""
+    return _TOKEN_PATTERN.findall((text or "").lower())
+
+
+def document_matches(document: Optional[str], where_document: Dict[str, Any]) -> bool:
+    """Evaluate a ChromaDB-style document filter against one document"""
+
+    document = document or ""
+    for operator, operand in where_document.items():
+        if operator == "$and":
+            if not all(document_matches(document, clause) for clause in operand):
+                return False
+        elif operator == "$or":
+            if not any(document_matches(document, clause) for clause in operand):
+                return False
+        elif operator == "$contains":
+            if operand not in document:
+                return False
+        elif operator == "$not_contains":
+            if operand in document:
+                return False
+        elif operator == "$regex":
+            if re.search(operand, document) is None:
+                return False
+        elif operator == "$not_regex":
+            if re.search(operand, document) is not None:
+                return False
+        else:
+            raise ValueError(f"Unsupported document operator: {operator}")
+    return True
+
+
+class LexicalIndex:
+    """
+    Inverted index over example texts with Okapi BM25 scoring
+
+    Postings, document lengths and per-document term counts are updated on
+    every add/remove, so keyword search never rescans the collection. Substring
+    filters (``$contains``) are answered with a candidate superset built from
+    the postings; callers verify candidates with ``document_matches``.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize the index
+
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_lengths
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index a document, replacing any previous text for the same ID"""
+
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove(doc_id)
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+            self._doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def add_many(self, documents: Iterable[Tuple[str, str]]) -> None:
+        """Index (doc_id, text) pairs"""
+        for doc_id, text in documents:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a document from the index; returns False if it was not indexed"""
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> bool:
+        """Drop a document (caller holds the lock)"""
+
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        return True
+
+    def clear(self) -> None:
+        """Remove every document"""
+        with self._lock:
+            self._postings = {}
+            self._doc_terms = {}
+            self._doc_lengths = {}
+            self._total_length = 0
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        doc_ids: Optional[Set[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank documents against a keyword query with BM25
+
+        Args:
+            query: Query text (tokenized like the documents)
+            k: Maximum number of results
+            doc_ids: Restrict scoring to these documents (all if None)
+
+        Returns:
+            (doc_id, score) pairs, best first; documents sharing no term with the query are omitted
+        """
+
+        terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+
+        with self._lock:
+            total_docs = len(self._doc_lengths)
+            if total_docs == 0 or not terms:
+                return []
+            average_length = self._total_length / total_docs
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                document_frequency = len(postings)
+                idf = math.log(1 + (total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+                for doc_id, frequency in postings.items():
+                    if doc_ids is not None and doc_id not in doc_ids:
+                        continue
+                    length_norm = 1 - self.b + self.b * self._doc_lengths[doc_id] / average_length
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (
+                        frequency + self.k1 * length_norm
+                    )
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:k]
+
+    def candidates(self, where_document: Dict[str, Any]) -> Optional[Set[str]]:
+        """
+        Superset of the documents that can satisfy a document filter
+
+        Returns None when the index cannot narrow the filter (e.g. only
+        ``$not_contains`` or ``$regex`` clauses), in which case the caller
+        should fall back to evaluating it against every document.
+        """
+
+        if not self._supported(where_document):
+            return None
+
+        with self._lock:
+            return self._candidates(where_document)
+
+    def _supported(self, where_document: Dict[str, Any]) -> bool:
+        """Whether every operator in a filter can be verified by document_matches"""
+        for operator, operand in where_document.items():
+            if operator not in _DOCUMENT_OPERATORS:
+                return False
+            if operator in ("$and", "$or") and not all(self._supported(clause) for clause in operand):
+                return False
+        return True
+
+    def _candidates(self, where_document: Dict[str, Any]) -> Optional[Set[str]]:
+        """Candidate superset for a filter (caller holds the lock)"""
+
+        result: Optional[Set[str]] = None
+        for operator, operand in where_document.items():
+            if operator == "$contains":
+                clause = self._substring_candidates(operand)
+            elif operator == "$and":
+                clause = None
+                for sub_filter in operand:
+                    sub_candidates = self._candidates(sub_filter)
+                    if sub_candidates is not None:
+                        clause = sub_candidates if clause is None else clause & sub_candidates
+            elif operator == "$or":
+                clause = set()
+                for sub_filter in operand:
+                    sub_candidates = self._candidates(sub_filter)
+                    if sub_candidates is None:
+                        clause = None
+                        break
+                    clause |= sub_candidates
+            else:
+                # Negations and regexes cannot be narrowed through postings
+                clause = None
+
+            if clause is not None:
+                result = clause if result is None else result & clause
+        return result
+
+    def _substring_candidates(self, pattern: str) -> Optional[Set[str]]:
+        """
+        Documents whose tokens can contain ``pattern`` as a substring
+
+        Tokens strictly inside the pattern must be whole document tokens; the
+        first and last pattern tokens may be the tail or head of a longer
+        document token, so they are matched against the vocabulary.
+        """
+
+        lowered = pattern.lower()
+        matches = list(_TOKEN_PATTERN.finditer(lowered))
+        if not matches:
+            return None
+
+        result: Optional[Set[str]] = None
+        for match in matches:
+            token = match.group()
+            open_start = match.start() == 0
+            open_end = match.end() == len(lowered)
+
+            if not open_start and not open_end:
+                documents = set(self._postings.get(token, ()))
+            else:
+                documents = set()
+                for term, postings in self._postings.items():
+                    if open_start and open_end:
+                        hit = token in term
+                    elif open_start:
+                        hit = term.endswith(token)
+                    else:
+                        hit = term.startswith(token)
+                    if hit:
+                        documents.update(postings)
+
+            result = documents if result is None else result & documents
+            if not result:
+                break
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size statistics"""
+        with self._lock:
+            total_docs = len(self._doc_lengths)
+            return {
+                "documents": total_docs,
+                "vocabulary_size": len(self._postings),
+                "postings": sum(len(postings) for postings in self._postings.values()),
+                "average_document_length": round(self._total_length / total_docs, 2) if total_docs else 0.0
+            }
@@ -0,0 +1,1057 @@
+"""
+NumPy Vector Backend - In-process exact/ANN search for FreeVectorStore
+Drop-in replacement for the ChromaDB client/collection subset the vector store uses
+"""
+
+import atexit
+import base64
+import json
+import math
+import os
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+class NumpyCollection:
+    """
+    Collection backed by a contiguous embedding matrix
+
+    Implements the part of the ChromaDB collection API used by FreeVectorStore
+    (add, get, query, update, delete, count) with the same result layout.
+
+    - Embeddings are L2-normalized on insert and kept in one float32 or float16
+      matrix; search is a vectorized dot product with ``argpartition`` top-k.
+      Distances are cosine distances (1 - cosine similarity). float16 halves
+      memory but each query pays a conversion to float32.
+    - Deletes swap the last row into the freed slot, so the matrix stays dense.
+    - ``where`` filters on ``indexed_fields`` are served from incrementally
+      maintained boolean masks; other fields fall back to a metadata scan.
+    - An optional IVF index (spherical k-means lists) restricts search to the
+      ``nprobe`` closest lists once the collection reaches ``ann_threshold``.
+    - Persisted collections are memory-mapped copy-on-write on load, so only
+      the pages touched by queries are read from disk.
+    - With ``quantization`` ("int8" or "binary"), a compact quantized copy of
+      the matrix serves the first-pass candidate search and only the top
+      ``k * rerank_factor`` candidates are rescored with the full-precision
+      vectors. The full matrix then lives in a file-backed memory map (an
+      unlinked scratch file in the collection directory, or the system temp
+      directory when not persisted), so resident memory is dominated by the
+      quantized copy.
+    - Persisted collections grow into such a scratch map too, so the first add
+      after loading does not pull the whole mapped matrix into RAM.
+    - Durability: on a persisted collection every add, update and delete is
+      appended to ``wal.jsonl`` before the call returns, and replayed on the
+      next load. A write therefore survives the process crashing or being
+      killed. It also survives power loss with ``fsync=True``; otherwise it
+      may sit in the OS page cache. ``persist`` (run on compaction, rename
+      and interpreter exit) rewrites the matrix and records and empties the
+      log. A write torn by a crash mid-append is dropped on replay.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: Optional[str] = None,
+        dtype: str = "float32",
+        indexed_fields: Sequence[str] = ("mode",),
+        ann_threshold: Optional[int] = None,
+        nprobe: int = 16,
+        quantization: Optional[str] = None,
+        rerank_factor: Optional[int] = None,
+        fsync: bool = False
+    ):
+        """
+        Initialize the collection
+
+        Args:
+            name: Collection name
+            path: Directory the collection is persisted to (in-memory if None)
+            dtype: Storage dtype for embeddings ("float32" or "float16")
+            indexed_fields: Metadata fields with precomputed filter masks
+            ann_threshold: Collection size at which the IVF index is built (exact search only if None)
+            nprobe: Number of IVF lists searched per query
+            quantization: First-pass quantization ("int8", "binary", or None for exact scoring)
+            rerank_factor: Candidates reranked per result (default 4 for int8, 10 for binary)
+            fsync: Sync the write log to disk after every write (durable across power loss)
+        """
+
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        if quantization not in (None, "int8", "binary"):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        self.name = name
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.indexed_fields = tuple(indexed_fields)
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor or (10 if quantization == "binary" else 4)
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._replaying = False
+        self._reset_state()
+
+        if path and os.path.exists(os.path.join(path, "records.jsonl")):
+            self._load(path)
+        if path:
+            self._replay_log()
+
+    def _reset_state(self) -> None:
+        """Empty the collection (caller holds the lock or is the constructor)"""
+
+        self._count = 0
+        self._dimension: Optional[int] = None
+        self._embeddings: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._id_to_row: Dict[str, int] = {}
+
+        # field -> value -> row mask (length == capacity)
+        self._field_masks: Dict[str, Dict[Any, np.ndarray]] = {field: {} for field in self.indexed_fields}
+
+        # IVF index state
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._indexed_size = 0
+
+        # Quantized first-pass copy: int8 codes + per-row scales, or packed sign bits
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+        # Whether there are writes not yet persisted
+        self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Chroma-compatible API
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        """Number of stored records"""
+        return self._count
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: Any,
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> None:
+        """Add records; IDs that already exist are ignored (as in ChromaDB)"""
+
+        vectors = self._normalize(embeddings)
+        if len(vectors) != len(ids):
+            raise ValueError("ids and embeddings must have the same length")
+
+        with self._lock:
+            self._dirty = True
+            self._log({
+                "op": "add",
+                "ids": list(ids),
+                "embeddings": _encode_vectors(vectors),
+                "documents": documents,
+                "metadatas": metadatas
+            })
+            for i, example_id in enumerate(ids):
+                if example_id in self._id_to_row:
+                    continue
+                row = self._append_row(vectors[i])
+                self._ids.append(example_id)
+                self._documents.append(documents[i] if documents is not None else None)
+                metadata = dict(metadatas[i]) if metadatas is not None and metadatas[i] else None
+                self._metadatas.append(metadata)
+                self._id_to_row[example_id] = row
+                self._index_metadata(row, metadata, 1)
+                if self._centroids is not None:
+                    self._assignments[row] = int(np.argmax(self._centroids @ vectors[i]))
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = ("metadatas", "documents")
+    ) -> Dict[str, Any]:
+        """Fetch records by ID and/or filter, with optional paging"""
+
+        with self._lock:
+            mask = self._filter_mask(where, where_document)
+
+            if ids is not None:
+                rows = [self._id_to_row[example_id] for example_id in ids if example_id in self._id_to_row]
+                if mask is not None:
+                    rows = [row for row in rows if mask[row]]
+            elif mask is not None:
+                rows = np.flatnonzero(mask)
+            else:
+                rows = range(self._count)
+
+            start = offset or 0
+            rows = rows[start:start + limit] if limit is not None else rows[start:]
+
+            return self._records(rows, include)
+
+    def query(
+        self,
+        query_embeddings: Any,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None,
+        include: Sequence[str] = ("metadatas", "documents", "distances")
+    ) -> Dict[str, Any]:
+        """Nearest-neighbour search for one or more query embeddings"""
+
+        queries = self._normalize(query_embeddings)
+
+        with self._lock:
+            results: Dict[str, Any] = {"ids": [], "distances": [], "documents": [], "metadatas": [], "embeddings": []}
+
+            if self._count == 0:
+                for _ in range(len(queries)):
+                    for key in results:
+                        results[key].append([])
+                return self._select_keys(results, include, nested=True)
+
+            mask = self._filter_mask(where, where_document)
+            self._maybe_build_index()
+
+            for rows, similarities in self._search(queries, n_results, mask):
+                batch = self._records(rows, include)
+                results["ids"].append(batch["ids"])
+                results["distances"].append([float(1.0 - similarity) for similarity in similarities])
+                results["documents"].append(batch.get("documents"))
+                results["metadatas"].append(batch.get("metadatas"))
+                results["embeddings"].append(batch.get("embeddings"))
+
+            return self._select_keys(results, include, nested=True)
+
+    def update(
+        self,
+        ids: List[str],
+        embeddings: Any = None,
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> None:
+        """Update records in place; metadata is merged (as in ChromaDB), unknown IDs are ignored"""
+
+        vectors = self._normalize(embeddings) if embeddings is not None else None
+
+        with self._lock:
+            self._dirty = True
+            self._log({
+                "op": "update",
+                "ids": list(ids),
+                "embeddings": _encode_vectors(vectors) if vectors is not None else None,
+                "documents": documents,
+                "metadatas": metadatas
+            })
+            for i, example_id in enumerate(ids):
+                row = self._id_to_row.get(example_id)
+                if row is None:
+                    continue
+
+                if vectors is not None:
+                    self._embeddings[row] = vectors[i]
+                    self._set_codes(row, vectors[i])
+                    if self._centroids is not None:
+                        self._assignments[row] = int(np.argmax(self._centroids @ vectors[i]))
+
+                if documents is not None:
+                    self._documents[row] = documents[i]
+
+                if metadatas is not None and metadatas[i] is not None:
+                    old_metadata = self._metadatas[row]
+                    merged = dict(old_metadata or {})
+                    merged.update(metadatas[i])
+                    self._index_metadata(row, old_metadata, -1)
+                    self._metadatas[row] = merged
+                    self._index_metadata(row, merged, 1)
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+        """Delete records by ID and/or filter"""
+
+        with self._lock:
+            if ids is None and where is None:
+                return
+
+            targets = set(ids) if ids is not None else set(self._ids[:self._count])
+            if where is not None:
+                mask = self._filter_mask(where, None)
+                targets = {example_id for example_id in targets
+                           if example_id in self._id_to_row and mask[self._id_to_row[example_id]]}
+
+            removed = [example_id for example_id in targets if example_id in self._id_to_row]
+            if removed:
+                self._log({"op": "delete", "ids": removed})
+            for example_id in removed:
+                self._remove_row(self._id_to_row[example_id])
+                self._dirty = True
+
+    # ------------------------------------------------------------------
+    # ANN index
+    # ------------------------------------------------------------------
+
+    def build_index(self, nlist: Optional[int] = None, iterations: int = 15, seed: int = 0) -> Dict[str, Any]:
+        """
+        Build (or rebuild) the IVF index with spherical k-means
+
+        Args:
+            nlist: Number of inverted lists (about sqrt(count) if None)
+            iterations: k-means iterations
+            seed: Random seed for centroid initialization
+
+        Returns:
+            Index statistics
+        """
+
+        with self._lock:
+            n = self._count
+            if n == 0:
+                return {"nlist": 0, "indexed": 0}
+
+            nlist = nlist or int(min(4096, max(1, math.sqrt(n))))
+            nlist = min(nlist, n)
+
+            rng = np.random.default_rng(seed)
+            sample_size = min(n, nlist * 256)
+            sample = self._embeddings[rng.choice(n, size=sample_size, replace=False)].astype(np.float32)
+            centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for list_id in range(nlist):
+                    members = sample[labels == list_id]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        norm = np.linalg.norm(centroid)
+                        centroids[list_id] = centroid / norm if norm > 0 else centroid
+
+            assignments = np.zeros(len(self._embeddings), dtype=np.int32)
+            for start in range(0, n, 65536):
+                block = self._embeddings[start:min(n, start + 65536)].astype(np.float32)
+                assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+            self._centroids = centroids
+            self._assignments = assignments
+            self._indexed_size = n
+
+            return {"nlist": nlist, "indexed": n, "nprobe": self.nprobe}
+
+    def drop_index(self) -> None:
+        """Discard the IVF index and go back to exact search"""
+        with self._lock:
+            self._centroids = None
+            self._assignments = None
+            self._indexed_size = 0
+
+    def _maybe_build_index(self) -> None:
+        """Build the IVF index lazily once the size threshold is reached"""
+        if self.ann_threshold is None or self._count < self.ann_threshold:
+            return
+        # Rebuild after the collection doubles so list sizes stay balanced
+        if self._centroids is None or self._count >= 2 * self._indexed_size:
+            self.build_index()
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Release spare capacity left by deletions and rewrite the persisted files
+
+        The IVF index, if any, is retrained so its lists reflect the surviving rows.
+
+        Returns:
+            Capacity before and after compaction
+        """
+
+        with self._lock:
+            capacity_before = self._capacity()
+            if self._count and capacity_before > self._count:
+                self._grow(self._count)
+            if self._centroids is not None:
+                self.build_index()
+
+            self._dirty = True
+            self.persist()
+
+            return {
+                "count": self._count,
+                "capacity_before": capacity_before,
+                "capacity_after": self._capacity()
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def persist(self) -> None:
+        """Write the collection to its directory (atomically replacing the old files)"""
+
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+
+            os.makedirs(self.path, exist_ok=True)
+
+            embeddings_file = os.path.join(self.path, "embeddings.npy")
+            embeddings = (
+                self._embeddings[:self._count]
+                if self._embeddings is not None
+                else np.zeros((0, 0), dtype=self.dtype)
+            )
+            # Write to a temporary file first: the current file may be memory-mapped
+            with open(embeddings_file + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(embeddings))
+            os.replace(embeddings_file + ".tmp", embeddings_file)
+
+            records_file = os.path.join(self.path, "records.jsonl")
+            with open(records_file + ".tmp", "w", encoding="utf-8") as f:
+                for row in range(self._count):
+                    f.write(json.dumps({
+                        "id": self._ids[row],
+                        "document": self._documents[row],
+                        "metadata": self._metadatas[row]
+                    }, default=str, ensure_ascii=False) + "\n")
+            os.replace(records_file + ".tmp", records_file)
+            # The base files now hold every logged write
+            self._discard_log()
+            self._dirty = False
+
+    def _log_path(self) -> str:
+        return os.path.join(self.path, "wal.jsonl")
+
+    def _log(self, entry: Dict[str, Any]) -> None:
+        """Append one write to the log before it is applied (caller holds the lock)"""
+
+        if not self.path or self._replaying:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._log_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str, ensure_ascii=False) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _discard_log(self) -> None:
+        """Drop the write log (caller holds the lock)"""
+        if self.path and os.path.exists(self._log_path()):
+            os.remove(self._log_path())
+
+    def _replay_log(self) -> None:
+        """Re-apply writes logged since the last persist"""
+
+        if not os.path.exists(self._log_path()):
+            return
+        with open(self._log_path(), encoding="utf-8") as f:
+            lines = f.readlines()
+
+        self._replaying = True
+        try:
+            for number, line in enumerate(lines):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Only the final append can be torn by a crash
+                    if number == len(lines) - 1:
+                        break
+                    raise ValueError(f"Corrupt write log entry {number + 1} in {self._log_path()}")
+                embeddings = _decode_vectors(entry.get("embeddings"))
+                if entry["op"] == "add":
+                    self.add(entry["ids"], embeddings, entry["documents"], entry["metadatas"])
+                elif entry["op"] == "update":
+                    self.update(entry["ids"], embeddings, entry["documents"], entry["metadatas"])
+                elif entry["op"] == "delete":
+                    self.delete(ids=entry["ids"])
+        finally:
+            self._replaying = False
+
+    def load_files(self, directory: str) -> int:
+        """
+        Replace the collection's contents with a persisted layout from another directory
+
+        The directory holds ``embeddings.npy`` and ``records.jsonl`` (as written
+        by ``persist`` or a vector store snapshot). The matrix is memory-mapped
+        copy-on-write, so loading does not read the embeddings up front.
+
+        Returns:
+            Number of records loaded
+        """
+
+        with self._lock:
+            self._reset_state()
+            self._load(directory)
+            # Logged writes applied to the replaced contents
+            self._discard_log()
+            self._dirty = True
+            self._maybe_build_index()
+            return self._count
+
+    def _load(self, directory: str) -> None:
+        """Load a persisted collection, memory-mapping the embedding matrix"""
+
+        embeddings = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="c")
+
+        with open(os.path.join(directory, "records.jsonl"), encoding="utf-8") as f:
+            for row, line in enumerate(f):
+                record = json.loads(line)
+                self._ids.append(record["id"])
+                self._documents.append(record["document"])
+                self._metadatas.append(record["metadata"])
+                self._id_to_row[record["id"]] = row
+
+        self._count = len(self._ids)
+        if self._count:
+            self.dtype = embeddings.dtype
+            self._dimension = embeddings.shape[1]
+            self._embeddings = embeddings
+            if self.quantization is not None:
+                # Quantize in blocks: converting the whole mapped matrix at once would load it into RAM
+                blocks = [self._quantize(embeddings[start:start + 65536]) for start in range(0, self._count, 65536)]
+                self._codes = np.concatenate([codes for codes, _ in blocks])
+                self._scales = np.concatenate([scales for _, scales in blocks])
+            for field in self.indexed_fields:
+                self._field_masks[field] = {}
+            for row, metadata in enumerate(self._metadatas):
+                self._index_metadata(row, metadata, 1)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _normalize(self, embeddings: Any) -> np.ndarray:
+        """Convert embeddings to a 2D float32 array of unit vectors"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _capacity(self) -> int:
+        return 0 if self._embeddings is None else len(self._embeddings)
+
+    def _append_row(self, vector: np.ndarray) -> int:
+        """Append one vector, growing the matrix geometrically (caller holds the lock)"""
+
+        if self._dimension is None:
+            self._dimension = len(vector)
+        elif len(vector) != self._dimension:
+            raise ValueError(f"Embedding dimension {len(vector)} does not match collection dimension {self._dimension}")
+
+        row = self._count
+        if row >= self._capacity():
+            self._grow(max(1024, 2 * self._capacity()))
+
+        self._embeddings[row] = vector
+        self._set_codes(row, vector)
+        self._count += 1
+        return row
+
+    def _allocate_embeddings(self, capacity: int) -> np.ndarray:
+        """Zeroed matrix for capacity rows, file-backed for persisted or quantized collections"""
+
+        shape = (capacity, self._dimension)
+        if not self.path and self.quantization is None:
+            return np.zeros(shape, dtype=self.dtype)
+
+        directory = self.path
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The scratch file is already unlinked; the mapping keeps it alive until the matrix is dropped
+        with tempfile.TemporaryFile(dir=directory) as scratch:
+            scratch.truncate(max(1, capacity * self._dimension * self.dtype.itemsize))
+            return np.memmap(scratch, dtype=self.dtype, mode="r+", shape=shape)
+
+    def _grow(self, capacity: int) -> None:
+        """Reallocate the embedding matrix and per-row arrays to a new capacity (at least the row count)"""
+
+        embeddings = self._allocate_embeddings(capacity)
+        if self._embeddings is not None:
+            # Copy in blocks so a memory-mapped source is streamed, not materialised
+            for start in range(0, self._count, 65536):
+                end = min(self._count, start + 65536)
+                embeddings[start:end] = self._embeddings[start:end]
+        self._embeddings = embeddings
+
+        for masks in self._field_masks.values():
+            for value, mask in masks.items():
+                grown = np.zeros(capacity, dtype=bool)
+                kept = min(capacity, len(mask))
+                grown[:kept] = mask[:kept]
+                masks[value] = grown
+
+        if self._assignments is not None:
+            assignments = np.zeros(capacity, dtype=np.int32)
+            kept = min(capacity, len(self._assignments))
+            assignments[:kept] = self._assignments[:kept]
+            self._assignments = assignments
+
+        if self.quantization is not None:
+            code_width = self._dimension if self.quantization == "int8" else (self._dimension + 7) // 8
+            codes = np.zeros((capacity, code_width), dtype=np.int8 if self.quantization == "int8" else np.uint8)
+            scales = np.zeros(capacity, dtype=np.float32)
+            if self._codes is not None:
+                codes[:self._count] = self._codes[:self._count]
+                scales[:self._count] = self._scales[:self._count]
+            self._codes, self._scales = codes, scales
+
+    def _remove_row(self, row: int) -> None:
+        """Remove a row by moving the last row into its slot (caller holds the lock)"""
+
+        last = self._count - 1
+        self._index_metadata(row, self._metadatas[row], -1)
+        del self._id_to_row[self._ids[row]]
+
+        if row != last:
+            self._index_metadata(last, self._metadatas[last], -1)
+            self._embeddings[row] = self._embeddings[last]
+            self._ids[row] = self._ids[last]
+            self._documents[row] = self._documents[last]
+            self._metadatas[row] = self._metadatas[last]
+            self._id_to_row[self._ids[row]] = row
+            self._index_metadata(row, self._metadatas[row], 1)
+            if self._assignments is not None:
+                self._assignments[row] = self._assignments[last]
+            if self._codes is not None:
+                self._codes[row] = self._codes[last]
+                self._scales[row] = self._scales[last]
+
+        self._ids.pop()
+        self._documents.pop()
+        self._metadatas.pop()
+        self._count -= 1
+
+    def _index_metadata(self, row: int, metadata: Optional[Dict[str, Any]], sign: int) -> None:
+        """Set (sign=1) or clear (sign=-1) a row's bits in the field masks"""
+
+        if not metadata:
+            return
+        for field in self.indexed_fields:
+            if field not in metadata:
+                continue
+            value = metadata[field]
+            masks = self._field_masks[field]
+            if sign > 0:
+                if value not in masks:
+                    masks[value] = np.zeros(self._capacity(), dtype=bool)
+                masks[value][row] = True
+            elif value in masks:
+                masks[value][row] = False
+
+    def _filter_mask(
+        self,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]]
+    ) -> Optional[np.ndarray]:
+        """Boolean row mask for the filters, or None if unfiltered"""
+
+        mask = None
+        if where:
+            mask = self._where_mask(where)
+        if where_document:
+            document_mask = self._document_mask(where_document)
+            mask = document_mask if mask is None else mask & document_mask
+        return mask
+
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Evaluate a ChromaDB-style metadata filter"""
+
+        n = self._count
+        mask = np.ones(n, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self._where_mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for clause in condition:
+                    any_mask |= self._where_mask(clause)
+                mask &= any_mask
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for operator, operand in condition.items():
+                    mask &= self._field_mask(key, operator, operand)
+        return mask
+
+    def _field_mask(self, field: str, operator: str, operand: Any) -> np.ndarray:
+        """Mask for one field condition, from the precomputed masks when possible"""
+
+        n = self._count
+
+        if field in self._field_masks and operator in ("$eq", "$ne", "$in", "$nin"):
+            masks = self._field_masks[field]
+            values = operand if operator in ("$in", "$nin") else [operand]
+            matched = np.zeros(n, dtype=bool)
+            for value in values:
+                if value in masks:
+                    matched |= masks[value][:n]
+            if operator in ("$eq", "$in"):
+                return matched
+            has_field = np.zeros(n, dtype=bool)
+            for value_mask in masks.values():
+                has_field |= value_mask[:n]
+            return has_field & ~matched
+
+        return np.fromiter(
+            (_matches(metadata, field, operator, operand) for metadata in self._metadatas[:n]),
+            dtype=bool,
+            count=n
+        )
+
+    def _document_mask(self, where_document: Dict[str, Any]) -> np.ndarray:
+        """Evaluate a ChromaDB-style document filter"""
+
+        n = self._count
+        mask = np.ones(n, dtype=bool)
+        for operator, operand in where_document.items():
+            if operator == "$and":
+                for clause in operand:
+                    mask &= self._document_mask(clause)
+            elif operator == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for clause in operand:
+                    any_mask |= self._document_mask(clause)
+                mask &= any_mask
+            elif operator in ("$contains", "$not_contains"):
+                contains = np.fromiter(
+                    (operand in (document or "") for document in self._documents[:n]),
+                    dtype=bool,
+                    count=n
+                )
+                mask &= contains if operator == "$contains" else ~contains
+            else:
+                raise ValueError(f"Unsupported document operator: {operator}")
+        return mask
+
+    def _search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray]
+    ) -> List[Tuple[List[int], np.ndarray]]:
+        """Top-k rows and cosine similarities for each query"""
+
+        n = self._count
+
+        if self._centroids is None and self.quantization is None:
+            # Exact search: score every query in one blocked matrix product
+            rows = np.flatnonzero(mask) if mask is not None else None
+            scores = self._scores(rows, queries)
+            candidate_rows = rows if rows is not None else np.arange(n)
+            return [self._top_k(candidate_rows, scores[:, j], k) for j in range(len(queries))]
+
+        results = []
+        for query in queries:
+            rows = self._candidate_rows(query, k, mask)
+
+            if self.quantization is None:
+                scores = self._scores(rows, query[None, :])[:, 0]
+                results.append(self._top_k(rows if rows is not None else np.arange(n), scores, k))
+                continue
+
+            # Two-stage: approximate scores on the quantized codes, exact rerank of the shortlist
+            approximate = self._approximate_scores(rows, query)
+            shortlist, _ = self._top_k(rows if rows is not None else np.arange(n), approximate, k * self.rerank_factor)
+            shortlist = np.asarray(shortlist, dtype=np.int64)
+            results.append(self._top_k(shortlist, self._scores(shortlist, query[None, :])[:, 0], k))
+
+        return results
+
+    def _candidate_rows(self, query: np.ndarray, k: int, mask: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Rows eligible for a query (None means every row)"""
+
+        n = self._count
+        if self._centroids is None:
+            return np.flatnonzero(mask) if mask is not None else None
+
+        # IVF: only rows in the closest lists
+        nprobe = min(self.nprobe, len(self._centroids))
+        centroid_scores = self._centroids @ query
+        probed = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        candidates = np.isin(self._assignments[:n], probed)
+        if mask is not None:
+            candidates &= mask
+        rows = np.flatnonzero(candidates)
+        if len(rows) < k:
+            # Selective filters can leave the probed lists short; search all matches exactly
+            return np.flatnonzero(mask) if mask is not None else None
+        return rows
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Quantize unit vectors to int8 codes with per-row scales, or packed sign bits"""
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+
+        if self.quantization == "binary":
+            return np.packbits(vectors > 0, axis=1), np.ones(len(vectors), dtype=np.float32)
+
+        scales = np.abs(vectors).max(axis=1)
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None] * 127).astype(np.int8)
+        return codes, (scales / 127).astype(np.float32)
+
+    def _set_codes(self, row: int, vector: np.ndarray) -> None:
+        """Refresh the quantized copy of one row"""
+        if self.quantization is None:
+            return
+        codes, scales = self._quantize(vector)
+        self._codes[row] = codes[0]
+        self._scales[row] = scales[0]
+
+    def _approximate_scores(self, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+        """First-pass scores from the quantized codes (higher is better)"""
+
+        n = self._count
+        codes = self._codes[:n] if rows is None else self._codes[rows]
+
+        if self.quantization == "binary":
+            query_bits = np.packbits(query > 0)
+            differing = np.bitwise_xor(codes, query_bits)
+            # np.bitwise_count (NumPy 2.x) is much faster than the lookup table
+            bit_counts = np.bitwise_count(differing) if hasattr(np, "bitwise_count") else _POPCOUNT[differing]
+            hamming = bit_counts.sum(axis=1, dtype=np.int32)
+            return -hamming.astype(np.float32)
+
+        scales = self._scales[:n] if rows is None else self._scales[rows]
+        scores = np.empty(len(codes), dtype=np.float32)
+        # Small blocks keep the float32 conversion cache-resident
+        for start in range(0, len(codes), 4096):
+            end = min(len(codes), start + 4096)
+            scores[start:end] = (codes[start:end].astype(np.float32) @ query) * scales[start:end]
+        return scores
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Sizes of the stored vectors and search structures"""
+
+        full_bytes = (self._dimension or 0) * self.dtype.itemsize
+        if self.quantization == "int8":
+            first_pass_bytes = (self._dimension or 0) + 4
+        elif self.quantization == "binary":
+            first_pass_bytes = ((self._dimension or 0) + 7) // 8
+        else:
+            first_pass_bytes = full_bytes
+
+        return {
+            "count": self._count,
+            "dimension": self._dimension,
+            "dtype": str(self.dtype),
+            "quantization": self.quantization,
+            "rerank_factor": self.rerank_factor if self.quantization else None,
+            "full_precision_bytes_per_vector": full_bytes,
+            "first_pass_bytes_per_vector": first_pass_bytes,
+            "memory_mapped": isinstance(self._embeddings, np.memmap),
+            "ivf_lists": len(self._centroids) if self._centroids is not None else 0
+        }
+
+    def _scores(self, rows: Optional[np.ndarray], queries: np.ndarray) -> np.ndarray:
+        """Cosine similarities (rows x queries), computed in float32 blocks"""
+
+        n = self._count
+        total = n if rows is None else len(rows)
+        scores = np.empty((total, len(queries)), dtype=np.float32)
+        for start in range(0, total, 65536):
+            end = min(total, start + 65536)
+            block = self._embeddings[start:end] if rows is None else self._embeddings[rows[start:end]]
+            scores[start:end] = block.astype(np.float32, copy=False) @ queries.T
+        return scores
+
+    @staticmethod
+    def _top_k(rows: np.ndarray, scores: np.ndarray, k: int) -> Tuple[List[int], np.ndarray]:
+        """Select the k best-scoring rows, best first"""
+
+        k = min(k, len(rows))
+        if k <= 0:
+            return [], np.zeros(0, dtype=np.float32)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [int(rows[i]) for i in best], scores[best]
+
+    def _records(self, rows: Iterable[int], include: Sequence[str]) -> Dict[str, Any]:
+        """Build a ChromaDB-style get() result for rows"""
+
+        rows = list(rows)
+        result = {
+            "ids": [self._ids[row] for row in rows],
+            "documents": [self._documents[row] for row in rows],
+            "metadatas": [self._metadatas[row] for row in rows],
+            "embeddings": (
+                self._embeddings[rows].astype(np.float32)
+                if rows else np.zeros((0, self._dimension or 0), dtype=np.float32)
+            ) if "embeddings" in include else None
+        }
+        return self._select_keys(result, include, nested=False)
+
+    @staticmethod
+    def _select_keys(result: Dict[str, Any], include: Sequence[str], nested: bool) -> Dict[str, Any]:
+        """Null out fields that were not requested, as ChromaDB does"""
+        selected = {"ids": result["ids"], "included": list(include)}
+        for key in ("documents", "metadatas", "distances", "embeddings"):
+            if key == "distances" and not nested:
+                continue
+            selected[key] = result[key] if key in include else None
+        return selected
+
+
+def _encode_vectors(vectors: np.ndarray) -> Dict[str, Any]:
+    """Compact JSON form of a float32 matrix for the write log"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return {"shape": list(vectors.shape), "data": base64.b64encode(vectors.tobytes()).decode("ascii")}
+
+
+def _decode_vectors(encoded: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+    if encoded is None:
+        return None
+    return np.frombuffer(base64.b64decode(encoded["data"]), dtype=np.float32).reshape(encoded["shape"])
+
+
+# Set bits per byte value, for Hamming distances over packed sign bits
+_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _matches(metadata: Optional[Dict[str, Any]], field: str, operator: str, operand: Any) -> bool:
+    """Evaluate one metadata condition; records without the field never match"""
+
+    if not metadata or field not in metadata:
+        return False
+    value = metadata[field]
+    try:
+        if operator == "$eq":
+            return value == operand
+        if operator == "$ne":
+            return value != operand
+        if operator == "$in":
+            return value in operand
+        if operator == "$nin":
+            return value not in operand
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported metadata operator: {operator}")
+
+
+class NumpyClient:
+    """
+    Client managing NumpyCollections, mirroring the ChromaDB client calls
+    FreeVectorStore makes (get/create/delete collection, max batch size)
+
+    Persisted collections log every write as it happens (see NumpyCollection)
+    and are compacted into their base files at interpreter exit.
+    """
+
+    def __init__(self, path: Optional[str] = None, **collection_options: Any):
+        """
+        Initialize the client
+
+        Args:
+            path: Directory collections are persisted under (in-memory if None)
+            **collection_options: Options passed to every NumpyCollection
+        """
+
+        self.path = path
+        self.collection_options = collection_options
+        self._collections: Dict[str, NumpyCollection] = {}
+        self._lock = threading.Lock()
+
+        if path:
+            os.makedirs(path, exist_ok=True)
+            atexit.register(self.persist)
+
+    def _collection_path(self, name: str) -> Optional[str]:
+        return os.path.join(self.path, name) if self.path else None
+
+    def _exists_on_disk(self, name: str) -> bool:
+        path = self._collection_path(name)
+        # A collection that crashed before its first persist only has a write log
+        return bool(path) and any(
+            os.path.exists(os.path.join(path, file_name)) for file_name in ("records.jsonl", "wal.jsonl")
+        )
+
+    def get_collection(self, name: str) -> NumpyCollection:
+        """Get an existing collection (raises ValueError if it does not exist)"""
+        with self._lock:
+            if name not in self._collections:
+                if not self._exists_on_disk(name):
+                    raise ValueError(f"Collection {name} does not exist.")
+                self._collections[name] = NumpyCollection(name, self._collection_path(name), **self.collection_options)
+            return self._collections[name]
+
+    def create_collection(self, name: str) -> NumpyCollection:
+        """Create a new collection (raises ValueError if it already exists)"""
+        with self._lock:
+            if name in self._collections or self._exists_on_disk(name):
+                raise ValueError(f"Collection {name} already exists.")
+            collection = NumpyCollection(name, self._collection_path(name), **self.collection_options)
+            self._collections[name] = collection
+            return collection
+
+    def get_or_create_collection(self, name: str) -> NumpyCollection:
+        """Get a collection, creating it if needed"""
+        try:
+            return self.get_collection(name)
+        except ValueError:
+            return self.create_collection(name)
+
+    def delete_collection(self, name: str) -> None:
+        """Delete a collection and its persisted files"""
+        with self._lock:
+            existed = self._collections.pop(name, None) is not None or self._exists_on_disk(name)
+            path = self._collection_path(name)
+            if path and os.path.exists(path):
+                shutil.rmtree(path)
+            if not existed:
+                raise ValueError(f"Collection {name} does not exist.")
+
+    def rename_collection(self, name: str, new_name: str) -> NumpyCollection:
+        """Rename a collection (and its persisted directory); raises ValueError on conflicts"""
+        collection = self.get_collection(name)
+        with self._lock:
+            if new_name in self._collections or self._exists_on_disk(new_name):
+                raise ValueError(f"Collection {new_name} already exists.")
+
+            with collection._lock:
+                collection.persist()
+                old_path, new_path = self._collection_path(name), self._collection_path(new_name)
+                if old_path and os.path.exists(old_path):
+                    os.replace(old_path, new_path)
+                collection.name = new_name
+                collection.path = new_path
+
+            del self._collections[name]
+            self._collections[new_name] = collection
+            return collection
+
+    def list_collections(self) -> List[str]:
+        """Names of loaded and persisted collections"""
+        names: Set[str] = set(self._collections)
+        if self.path and os.path.isdir(self.path):
+            names.update(name for name in os.listdir(self.path) if self._exists_on_disk(name))
+        return sorted(names)
+
+    def get_max_batch_size(self) -> int:
+        """Largest write accepted in one call (no backend limit)"""
+        return 1_000_000
+
+    def persist(self) -> None:
+        """Persist every loaded collection"""
+        for collection in list(self._collections.values()):
+            collection.persist()
@@ -0,0 +1,231 @@
+"""
+ONNX Embedder - Sentence embeddings on ONNX Runtime for CPU-only nodes
+Runs the sentence transformer graph with optional dynamic int8 quantization instead of eager PyTorch
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "agent", "onnx")
+
+
+def _hub_repo_id(model_name: str) -> str:
+    """Hugging Face repo for a model name (bare names live under sentence-transformers/)"""
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def prepare_onnx_model(model_name: str, model_dir: str, quantize: bool = True) -> str:
+    """
+    Make sure an ONNX export (and its int8 variant) of a model exists in a directory
+
+    Missing files are fetched from the model's Hugging Face repo, which ships
+    an ONNX export and ``tokenizer.json``. The int8 model is produced locally
+    with ONNX Runtime's dynamic quantization (weights to int8, activations
+    quantized on the fly), which needs the ``onnx`` package.
+
+    Args:
+        model_name: Sentence transformer model name (e.g. "all-MiniLM-L6-v2")
+        model_dir: Directory holding model.onnx, model_int8.onnx and tokenizer.json
+        quantize: Whether the int8 model is needed
+
+    Returns:
+        Path of the model file to load
+    """
+
+    os.makedirs(model_dir, exist_ok=True)
+    float_model = os.path.join(model_dir, "model.onnx")
+    int8_model = os.path.join(model_dir, "model_int8.onnx")
+    tokenizer_file = os.path.join(model_dir, "tokenizer.json")
+
+    target = int8_model if quantize else float_model
+    if os.path.exists(target) and os.path.exists(tokenizer_file):
+        return target
+
+    if not os.path.exists(float_model) or not os.path.exists(tokenizer_file):
+        try:
+            from huggingface_hub import hf_hub_download
+        except ImportError:
+            raise ImportError(
+                f"No ONNX export of {model_name} in {model_dir}. Install huggingface_hub to download it, "
+                "or place model.onnx and tokenizer.json there."
+            )
+
+        repo_id = _hub_repo_id(model_name)
+        if not os.path.exists(float_model):
+            _copy_file(hf_hub_download(repo_id, "onnx/model.onnx"), float_model)
+        if not os.path.exists(tokenizer_file):
+            _copy_file(hf_hub_download(repo_id, "tokenizer.json"), tokenizer_file)
+
+    if quantize and not os.path.exists(int8_model):
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            raise ImportError("Dynamic int8 quantization needs the onnx package (pip install onnx)")
+
+        start_time = time.perf_counter()
+        quantize_dynamic(float_model, int8_model + ".tmp", weight_type=QuantType.QInt8)
+        os.replace(int8_model + ".tmp", int8_model)
+        logger.info(f"Quantized {model_name} to int8 in {time.perf_counter() - start_time:.2f}s")
+
+    return target
+
+
+def _copy_file(source: str, destination: str) -> None:
+    """Copy a file into place atomically"""
+    with open(source, "rb") as src, open(destination + ".tmp", "wb") as dst:
+        while True:
+            chunk = src.read(1 << 20)
+            if not chunk:
+                break
+            dst.write(chunk)
+    os.replace(destination + ".tmp", destination)
+
+
+class OnnxEmbedder:
+    """
+    Sentence embedder running on ONNX Runtime's CPU execution provider
+
+    Mirrors the parts of ``SentenceTransformer`` the vector store uses
+    (``encode`` and ``get_sentence_embedding_dimension``) and reproduces the
+    MiniLM pipeline: WordPiece tokenization, transformer, attention-masked mean
+    pooling, L2 normalization.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        model_dir: Optional[str] = None,
+        quantize: bool = True,
+        intra_op_threads: Optional[int] = None,
+        inter_op_threads: int = 1,
+        max_seq_length: int = 256,
+        normalize_embeddings: bool = True,
+        warm_up: bool = True
+    ):
+        """
+        Initialize the embedder
+
+        Args:
+            model_name: Sentence transformer model name
+            model_dir: Directory with the ONNX files (~/.cache/agent/onnx/<model> if None)
+            quantize: Load the dynamically quantized int8 model instead of float32
+            intra_op_threads: Threads used inside one operator (ONNX Runtime picks if None)
+            inter_op_threads: Threads used to run independent operators in parallel
+            max_seq_length: Tokens per text; longer texts are truncated
+            normalize_embeddings: L2-normalize outputs (the MiniLM models do)
+            warm_up: Run one encode at load so the first real request is not slowed
+        """
+
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.model_dir = model_dir or os.path.join(DEFAULT_CACHE_DIR, model_name.replace("/", "__"))
+        self.quantize = quantize
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.max_seq_length = max_seq_length
+        self.normalize_embeddings = normalize_embeddings
+
+        model_path = prepare_onnx_model(model_name, self.model_dir, quantize=quantize)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads is not None:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        self._dimension: Optional[int] = None
+        self.warm_up_seconds = 0.0
+        if warm_up:
+            start_time = time.perf_counter()
+            self.encode(["warm up"])
+            self.warm_up_seconds = time.perf_counter() - start_time
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Run one padded batch through the model and pool it"""
+
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        mask = attention_mask[:, :, None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        if self.normalize_embeddings:
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+        return embeddings.astype(np.float32)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        **kwargs: Any
+    ) -> np.ndarray:
+        """
+        Embed texts
+
+        Texts are sorted by length before batching so each batch pads to a
+        similar length, then returned in input order.
+
+        Args:
+            sentences: A text or list of texts
+            batch_size: Texts per forward pass
+
+        Returns:
+            Embeddings as a float32 array (1D for a single string)
+        """
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        embeddings: Optional[np.ndarray] = None
+        for start in range(0, len(texts), batch_size):
+            positions = order[start:start + batch_size]
+            batch = self._embed_batch([texts[i] for i in positions])
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+                self._dimension = batch.shape[1]
+            embeddings[positions] = batch
+
+        return embeddings[0] if single else embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Embedding width (probed with one encode if not known yet)"""
+        if self._dimension is None:
+            self.encode(["dimension probe"])
+        return self._dimension
+
+    def get_config(self) -> Dict[str, Any]:
+        """Runtime configuration, for stats and logs"""
+        return {
+            "model_name": self.model_name,
+            "quantized": self.quantize,
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "max_seq_length": self.max_seq_length,
+            "warm_up_seconds": round(self.warm_up_seconds, 3)
+        }
@@ -0,0 +1,416 @@
+"""
+Partitioned Vector Store - One sub-collection per agent mode behind the FreeVectorStore API
+Mode lookups hit only their own partition; cross-mode lookups fan out concurrently and merge top-k
+"""
+
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from memory.embedding_cache import EmbeddingCache
+from memory.vector_store import FreeVectorStore, merge_fallback_results
+
+
+class PartitionedVectorStore:
+    """
+    Vector store that keeps each mode's examples in its own collection
+
+    Examples are routed by their ``partition_field`` metadata value (examples
+    without one go to ``default_partition``). A search whose ``where`` is
+    exactly ``{partition_field: value}`` is answered by that partition alone,
+    unfiltered; any other search is sent to every partition concurrently and
+    the per-partition top-k lists are merged by distance. All partitions share
+    one embedding cache and one embedder, and queries are encoded once.
+
+    Keyword and hybrid scores are only comparable within a partition, so
+    cross-partition keyword/hybrid results are merged by score as an
+    approximation.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "agent_examples",
+        partition_field: str = "mode",
+        default_partition: str = "general",
+        max_workers: int = 4,
+        **store_options: Any
+    ):
+        """
+        Initialize the partitioned store
+
+        Args:
+            collection_name: Prefix for the per-partition collection names
+            partition_field: Metadata field that selects the partition
+            default_partition: Partition for examples without the field
+            max_workers: Threads used to query partitions concurrently
+            **store_options: Passed to every partition's FreeVectorStore
+                (embedder_model, persist_directory, backend, backend_options, ...)
+        """
+
+        self.collection_name = collection_name
+        self.partition_field = partition_field
+        self.default_partition = default_partition
+
+        store_options.setdefault("embedding_cache", EmbeddingCache())
+        self.store_options = store_options
+
+        self.partitions: Dict[str, FreeVectorStore] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="partition-query")
+
+        # The default partition always exists; its client tells us which other partitions were persisted
+        default_store = self._partition(default_partition)
+        prefix = f"{collection_name}_"
+        for collection in default_store.chroma_client.list_collections():
+            name = collection if isinstance(collection, str) else collection.name
+            # Staging collections (``<collection>__<purpose>``) are not partitions
+            if name.startswith(prefix) and "__" not in name[len(prefix):]:
+                self._partition(name[len(prefix):])
+
+    @staticmethod
+    def _collection_suffix(partition: str) -> str:
+        """Partition key made safe for collection names (no ``__``, which marks staging collections)"""
+        return re.sub(r"__+", "_", re.sub(r"[^a-zA-Z0-9_-]", "-", partition))
+
+    def _partition(self, partition: str) -> FreeVectorStore:
+        """Get or create the store for a partition"""
+
+        partition = self._collection_suffix(str(partition))
+        store = self.partitions.get(partition)
+        if store is not None:
+            return store
+
+        with self._lock:
+            store = self.partitions.get(partition)
+            if store is None:
+                store = FreeVectorStore(collection_name=f"{self.collection_name}_{partition}", **self.store_options)
+                self.partitions[partition] = store
+        return store
+
+    def partition_for(self, metadata: Optional[Dict[str, Any]]) -> str:
+        """Partition an example with this metadata belongs to"""
+        value = (metadata or {}).get(self.partition_field)
+        return self._collection_suffix(str(value)) if value is not None else self.default_partition
+
+    def _route(self, where: Optional[Dict[str, Any]]) -> Tuple[Optional[List[str]], Optional[Dict[str, Any]]]:
+        """Partitions a filter touches (None means all) and the filter left to apply within them"""
+
+        if where and set(where) == {self.partition_field}:
+            value = where[self.partition_field]
+            if isinstance(value, dict) and set(value) == {"$eq"}:
+                value = value["$eq"]
+            if not isinstance(value, dict):
+                partition = self._collection_suffix(str(value))
+                return ([partition] if partition in self.partitions else []), None
+        return None, where
+
+    @property
+    def embedder(self):
+        """Shared embedder (all partitions use the same model)"""
+        return self.partitions[self.default_partition].embedder
+
+    @property
+    def embedder_model(self) -> str:
+        return self.partitions[self.default_partition].embedder_model
+
+    def _encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Embed texts through the shared embedding cache"""
+        return self.partitions[self.default_partition]._encode(texts, batch_size=batch_size)
+
+    def _fan_out(self, partitions: List[str], call: Any) -> List[Any]:
+        """Run ``call(store)`` on each partition concurrently"""
+        stores = [self.partitions[partition] for partition in partitions]
+        if len(stores) == 1:
+            return [call(stores[0])]
+        return list(self._executor.map(call, stores))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add_example(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        custom_id: Optional[str] = None
+    ) -> str:
+        """Add a text example to its partition"""
+        return self._partition(self.partition_for(metadata)).add_example(text, metadata, custom_id)
+
+    def add_examples(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+        ids: Optional[List[Optional[str]]] = None,
+        batch_size: int = 256
+    ) -> Dict[str, Any]:
+        """Add many text examples, one batched write per partition"""
+
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise ValueError("metadatas must have the same length as texts")
+        if ids is not None and len(ids) != len(texts):
+            raise ValueError("ids must have the same length as texts")
+
+        stored_ids = [
+            custom_id if custom_id is not None else str(uuid.uuid4())
+            for custom_id in (ids or [None] * len(texts))
+        ]
+
+        groups: Dict[str, List[int]] = {}
+        for i in range(len(texts)):
+            groups.setdefault(self.partition_for(metadatas[i] if metadatas else None), []).append(i)
+
+        added = 0
+        elapsed = 0.0
+        encode_time = 0.0
+        for partition, positions in groups.items():
+            result = self._partition(partition).add_examples(
+                [texts[i] for i in positions],
+                metadatas=[metadatas[i] for i in positions] if metadatas else None,
+                ids=[stored_ids[i] for i in positions],
+                batch_size=batch_size
+            )
+            added += result["added"]
+            elapsed += result["elapsed_seconds"]
+            encode_time += result["encode_seconds"]
+
+        return {
+            "ids": stored_ids,
+            "added": added,
+            "batch_size": batch_size,
+            "partitions": {partition: len(positions) for partition, positions in groups.items()},
+            "elapsed_seconds": round(elapsed, 3),
+            "encode_seconds": round(encode_time, 3),
+            "examples_per_second": round(added / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def _locate(self, example_id: str) -> Optional[str]:
+        """Partition holding an example ID (looked up in all partitions concurrently)"""
+        partitions = list(self.partitions)
+        found = self._fan_out(partitions, lambda store: example_id in store._existing_ids([example_id]))
+        for partition, present in zip(partitions, found):
+            if present:
+                return partition
+        return None
+
+    def get_example_by_id(self, example_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a specific example by ID"""
+        partition = self._locate(example_id)
+        return self.partitions[partition].get_example_by_id(example_id) if partition else None
+
+    def update_example(
+        self,
+        example_id: str,
+        text: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Update an existing example, moving it if its partition field changes"""
+
+        partition = self._locate(example_id)
+        if partition is None:
+            return False
+
+        store = self.partitions[partition]
+        if metadata is None or self.partition_field not in metadata or self.partition_for(metadata) == partition:
+            return store.update_example(example_id, text=text, metadata=metadata)
+
+        existing = store.get_example_by_id(example_id)
+        if existing is None:
+            return False
+        merged_metadata = dict(existing["metadata"] or {}, **metadata)
+        self._partition(self.partition_for(merged_metadata)).add_example(
+            text if text is not None else existing["text"], merged_metadata, example_id
+        )
+        return store.delete_example(example_id)
+
+    def update_metadata_many(self, updates: Dict[str, Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Merge metadata changes into many examples; changes to the partition field move examples"""
+
+        moves = {example_id: changes for example_id, changes in updates.items() if self.partition_field in changes}
+        in_place = {example_id: changes for example_id, changes in updates.items() if example_id not in moves}
+
+        updated = 0
+        if in_place:
+            updated += sum(self._fan_out(
+                list(self.partitions), lambda store: store.update_metadata_many(in_place, batch_size=batch_size)
+            ))
+        for example_id, changes in moves.items():
+            updated += self.update_example(example_id, metadata=dict(changes))
+        return updated
+
+    def delete_example(self, example_id: str) -> bool:
+        """Delete an example from whichever partition holds it"""
+        partition = self._locate(example_id)
+        return self.partitions[partition].delete_example(example_id) if partition else False
+
+    def delete_examples(self, example_ids: List[str]) -> int:
+        """Delete many examples (unknown IDs are ignored)"""
+        return sum(self._fan_out(list(self.partitions), lambda store: store.delete_examples(example_ids)))
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search_similar(
+        self,
+        query: str,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None,
+        mode: str = "vector"
+    ) -> List[Dict[str, Any]]:
+        """Search for semantically similar examples across the relevant partitions"""
+
+        if mode == "vector":
+            return self.search_many([query], n_results, where, where_document)[0]
+
+        partitions, where = self._route(where)
+        partition_results = self._fan_out(
+            partitions if partitions is not None else list(self.partitions),
+            lambda store: store.search_similar(query, n_results, where, where_document, mode=mode)
+        )
+        score_key = "fused_score" if mode == "hybrid" else "bm25_score"
+        merged = [result for results in partition_results for result in results]
+        return sorted(merged, key=lambda r: -r[score_key])[:n_results]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for many queries at once (encoded in one batch)"""
+        if not queries:
+            return []
+        return self.search_by_embeddings(self._encode(queries), n_results, where, where_document)
+
+    def search_by_embeddings(
+        self,
+        query_embeddings: Any,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search with precomputed embeddings, fanning out to partitions and merging top-k"""
+
+        if len(query_embeddings) == 0:
+            return []
+
+        partitions, where = self._route(where)
+        partition_results = self._fan_out(
+            partitions if partitions is not None else list(self.partitions),
+            lambda store: store.search_by_embeddings(query_embeddings, n_results, where, where_document)
+        )
+
+        merged = []
+        for i in range(len(query_embeddings)):
+            candidates = [result for results in partition_results for result in results[i]]
+            merged.append(sorted(candidates, key=lambda r: r["distance"])[:n_results])
+        return merged
+
+    def search_with_fallback(
+        self,
+        query: str,
+        mode: Optional[str],
+        n_results: int = 5,
+        min_mode_results: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Search one mode's partition, topping up from the other partitions if too few match
+
+        Every partition is queried concurrently in a single fan-out, so the
+        fallback costs no extra round-trip.
+
+        Args:
+            query: The search query text
+            mode: Partition to prefer (all partitions, merged, if None)
+            n_results: Maximum number of results
+            min_mode_results: Use fallback results when fewer mode results than this are found
+
+        Returns:
+            Mode results first, then the closest results from other partitions
+        """
+
+        query_embeddings = self._encode([query])
+        if mode is None:
+            return self.search_by_embeddings(query_embeddings, n_results=n_results)[0]
+
+        mode_partition = self._collection_suffix(str(mode))
+        partitions = list(self.partitions)
+        partition_results = self._fan_out(
+            partitions,
+            lambda store: store.search_by_embeddings(query_embeddings, n_results)[0]
+        )
+
+        primary: List[Dict[str, Any]] = []
+        fallback: List[Dict[str, Any]] = []
+        for partition, results in zip(partitions, partition_results):
+            if partition == mode_partition:
+                primary = results
+            else:
+                fallback.extend(results)
+
+        if len(primary) >= min_mode_results:
+            return primary
+        return merge_fallback_results(primary, fallback, n_results)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """Statistics aggregated over every partition"""
+
+        partition_stats = {partition: store.get_collection_stats() for partition, store in self.partitions.items()}
+
+        examples_by_mode: Dict[str, int] = {}
+        quality_sum = 0.0
+        quality_count = 0
+        for store in self.partitions.values():
+            quality_sum += store.stats.quality_sum
+            quality_count += store.stats.quality_count
+        for stats in partition_stats.values():
+            for mode, count in stats.get("examples_by_mode", {}).items():
+                examples_by_mode[mode] = examples_by_mode.get(mode, 0) + count
+
+        default_stats = partition_stats[self.default_partition]
+        return {
+            "collection_name": self.collection_name,
+            "backend": default_stats.get("backend"),
+            "total_examples": sum(stats.get("total_examples", 0) for stats in partition_stats.values()),
+            "embedder_model": default_stats.get("embedder_model"),
+            "embedding_dimension": default_stats.get("embedding_dimension"),
+            "examples_by_mode": examples_by_mode,
+            "average_quality_score": round(quality_sum / quality_count, 2) if quality_count else 0,
+            "partitions": {partition: stats.get("total_examples", 0) for partition, stats in partition_stats.items()},
+            "embedding_cache": default_stats.get("embedding_cache")
+        }
+
+    def reconcile_stats(self) -> Dict[str, Any]:
+        """Recount statistics in every partition"""
+        for store in self.partitions.values():
+            store.reconcile_stats()
+        return self.get_collection_stats()
+
+    def persist(self) -> None:
+        """Flush every partition to disk"""
+        for store in self.partitions.values():
+            store.persist()
+
+    def compact(self) -> Dict[str, Any]:
+        """Reclaim space in every partition"""
+        return {partition: store.compact() for partition, store in self.partitions.items()}
+
+    def clear_collection(self) -> None:
+        """Clear all examples from every partition"""
+        for store in self.partitions.values():
+            store.clear_collection()
+
+    def close(self) -> None:
+        """Shut down the fan-out thread pool"""
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,127 @@
+"""
+Query Result Cache - Write-versioned cache for vector store search results
+Entries are tagged with the collection generation at query time and dropped once a write bumps it
+"""
+
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class QueryResultCache:
+    """
+    Bounded LRU cache of search results with TTL and generation checks
+
+    Keys hash the query embedding together with the search parameters. Each
+    entry remembers the collection generation it was computed at; a lookup
+    made at a later generation (i.e. after any add/update/delete) treats the
+    entry as stale. All operations are thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300.0):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of cached result lists (0 disables caching)
+            ttl_seconds: Seconds an entry stays valid (no expiry if None)
+        """
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (generation, expires_at, results)
+        self._entries: "OrderedDict[str, Tuple[int, float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(namespace: str, query_embedding: Any, **params: Any) -> str:
+        """Hash a query embedding and search parameters into a cache key"""
+        digest = hashlib.sha256(namespace.encode("utf-8"))
+        digest.update(np.ascontiguousarray(query_embedding, dtype=np.float32).tobytes())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str, generation: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up cached results
+
+        Args:
+            key: Key from make_key
+            generation: Current collection generation
+
+        Returns:
+            A copy of the cached results, or None on a miss
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry_generation, expires_at, results = entry
+            if entry_generation != generation:
+                del self._entries[key]
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return copy.deepcopy(results)
+
+    def put(self, key: str, generation: int, results: List[Dict[str, Any]]) -> None:
+        """Store results computed at the given generation"""
+
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else float("inf")
+        results = copy.deepcopy(results)
+
+        with self._lock:
+            self._entries[key] = (generation, expires_at, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "expirations": self.expirations,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,448 @@
+"""
+Reindex Job - Background migration of a vector store to a new embedder model
+Re-embeds every document across worker processes into a shadow collection, then cuts over atomically
+"""
+
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+from memory.embedder_registry import EmbedderRegistry
+from memory.vector_store import FreeVectorStore
+
+logger = logging.getLogger(__name__)
+
+# Model loaded once per worker process by the pool initializer
+_worker_model: Any = None
+
+
+def _init_worker(model_name: str, onnx_options: Optional[Dict[str, Any]]) -> None:
+    """Load the target model in a worker process"""
+    global _worker_model
+    _worker_model = EmbedderRegistry(onnx_options=onnx_options).get(model_name)
+
+
+def _encode_in_worker(texts: List[str], batch_size: int) -> np.ndarray:
+    """Embed a chunk of texts in a worker process"""
+    return np.asarray(_worker_model.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+
+class ReindexJob:
+    """
+    Migrates a FreeVectorStore to a new embedder model without downtime
+
+    1. Documents are streamed from the live collection page by page and
+       embedded with the new model across a pool of worker processes (or
+       in-process with ``workers=0``); results are written to a shadow
+       collection named ``<collection>__reindex``.
+    2. Writes made to the store meanwhile are recorded and replayed into the
+       shadow, and once streaming ends the two ID sets are diffed so nothing
+       skipped by paging is lost.
+    3. Dual-read: a sample of live searches is replayed against the shadow
+       with the new model and the overlap of the top-k lists (over documents
+       already migrated) is reported, so cutover can be gated on agreement.
+    4. Cutover: with store writes blocked, the last changes are replayed, the
+       store switches to the shadow collection and the new model in one step,
+       then the old collection is dropped and the shadow takes its name.
+    """
+
+    def __init__(
+        self,
+        vector_store: FreeVectorStore,
+        new_model: str,
+        workers: Optional[int] = None,
+        page_size: int = 256,
+        encode_batch_size: int = 32,
+        dual_read_sample_rate: float = 0.1,
+        min_dual_read_agreement: Optional[float] = None,
+        auto_cutover: bool = True,
+        onnx_options: Optional[Dict[str, Any]] = None,
+        progress_interval: float = 10.0
+    ):
+        """
+        Initialize the reindex job
+
+        Args:
+            vector_store: Store to migrate
+            new_model: Embedder model to migrate to (any name the embedder registry accepts)
+            workers: Worker processes for embedding (CPU count if None, in-process if 0)
+            page_size: Documents read from the live collection and embedded per task
+            encode_batch_size: Batch size for each encoder call
+            dual_read_sample_rate: Fraction of live searches replayed against the shadow
+            min_dual_read_agreement: Refuse automatic cutover below this mean overlap (no gate if None)
+            auto_cutover: Cut over as soon as the shadow is complete
+            onnx_options: OnnxEmbedder options when new_model is an "onnx:" model
+            progress_interval: Seconds between progress log lines
+        """
+
+        self.vector_store = vector_store
+        self.new_model = new_model
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.page_size = page_size
+        self.encode_batch_size = encode_batch_size
+        self.dual_read_sample_rate = dual_read_sample_rate
+        self.min_dual_read_agreement = min_dual_read_agreement
+        self.auto_cutover = auto_cutover
+        self.onnx_options = onnx_options
+        self.progress_interval = progress_interval
+
+        self.old_model = vector_store.embedder_model
+        self.shadow_name = f"{vector_store.collection_name}__reindex"
+        self.shadow: Any = None
+
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.total = 0
+        self.processed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._migrated: Set[str] = set()
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._local_model: Any = None
+
+        # Dual-read bookkeeping
+        self._dual_read_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reindex-dual-read")
+        self.dual_reads = 0
+        self._dual_read_overlap = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "ReindexJob":
+        """Run the job in a background thread"""
+
+        if self._thread is not None:
+            raise RuntimeError("Reindex job already started")
+
+        self._thread = threading.Thread(target=self.run, name=f"reindex-{self.vector_store.collection_name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Block until the background job finishes; returns the final progress"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.progress()
+
+    def cancel(self) -> None:
+        """Stop the job and discard the shadow collection"""
+        self._cancel.set()
+        if self.state == "awaiting_cutover":
+            self.state = "cancelled"
+            self._drop_shadow()
+            self._detach()
+
+    def run(self) -> Dict[str, Any]:
+        """Run the whole migration in the calling thread"""
+
+        store = self.vector_store
+        self.started_at = time.perf_counter()
+        self.state = "running"
+        store.write_listeners.append(self._on_write)
+        store.read_listeners.append(self._on_read)
+
+        try:
+            self.shadow = store._create_staging_collection("reindex")
+            self.total = store.collection.count()
+            self._start_encoder()
+
+            self._stream()
+            self._reconcile_ids()
+            self._replay_dirty()
+
+            if self._cancel.is_set():
+                raise _Cancelled()
+
+            if self.auto_cutover:
+                agreement = self.dual_read_agreement()
+                if self.min_dual_read_agreement is not None and agreement is not None \
+                        and agreement < self.min_dual_read_agreement:
+                    self.state = "awaiting_cutover"
+                    logger.warning(
+                        f"Reindex of {store.collection_name} held: dual-read agreement {agreement:.3f} "
+                        f"is below {self.min_dual_read_agreement}"
+                    )
+                else:
+                    self.cutover()
+            else:
+                self.state = "awaiting_cutover"
+
+        except _Cancelled:
+            self.state = "cancelled"
+            self._drop_shadow()
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"Reindex of {store.collection_name} failed: {e}")
+            self._drop_shadow()
+        finally:
+            if self.state != "awaiting_cutover":
+                self._detach()
+            self.finished_at = time.perf_counter()
+
+        return self.progress()
+
+    def cutover(self) -> Dict[str, Any]:
+        """
+        Switch the store to the shadow collection and the new model
+
+        Store writes are blocked while the last recorded changes are replayed
+        and the collection/model pair is swapped, so no write is lost or
+        embedded with the wrong model.
+        """
+
+        store = self.vector_store
+        if self.shadow is None:
+            raise RuntimeError("Nothing to cut over to")
+
+        # Load the new model in this process first so the first query after cutover is not slow
+        store.embedder_registry.warm_up([self.new_model])
+
+        with store._write_lock:
+            self._replay_dirty()
+
+            # The shadow holds full-dimension vectors; a projection fitted on
+            # the old model's embedding space does not carry over. Model, projection
+            # and collection switch in one swap, so no query mixes the two models.
+            store._replace_collection(self.shadow, embedder_model=self.new_model, projection=None)
+            store._save_projection()
+            store._bump_generation()
+
+            store.reconcile_stats()
+            self.state = "completed"
+
+        self._detach()
+        logger.info(f"Reindex of {store.collection_name} cut over to {self.new_model}")
+        return self.progress()
+
+    def _detach(self) -> None:
+        """Stop listening to the store and release worker processes"""
+        store = self.vector_store
+        if self._on_write in store.write_listeners:
+            store.write_listeners.remove(self._on_write)
+        if self._on_read in store.read_listeners:
+            store.read_listeners.remove(self._on_read)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._dual_read_executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def _drop_shadow(self) -> None:
+        try:
+            self.vector_store.chroma_client.delete_collection(name=self.shadow_name)
+        except Exception:
+            pass
+        self.shadow = None
+
+    def _start_encoder(self) -> None:
+        """Start the worker pool (or load the model locally for workers=0)"""
+        if self.workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.new_model, self.onnx_options)
+            )
+        else:
+            self._local_model = self.vector_store.embedder_registry.get(self.new_model)
+
+    def _submit_encode(self, texts: List[str]) -> Future:
+        """Embed texts with the new model, in the pool or in-process"""
+        if self._pool is not None:
+            return self._pool.submit(_encode_in_worker, texts, self.encode_batch_size)
+        future: Future = Future()
+        future.set_result(np.asarray(self._local_model.encode(texts, batch_size=self.encode_batch_size), dtype=np.float32))
+        return future
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self._submit_encode(texts).result()
+
+    def _write_shadow(self, page: Dict[str, Any], embeddings: np.ndarray) -> None:
+        """Write re-embedded records to the shadow (replacing any stale copies)"""
+
+        ids = page["ids"]
+        metadatas = []
+        for metadata in page["metadatas"]:
+            metadata = dict(metadata or {})
+            metadata["embedder_model"] = self.new_model
+            metadata["reindexed_at"] = datetime.now().isoformat()
+            metadatas.append(metadata)
+
+        self.shadow.delete(ids=ids)
+        self.shadow.add(ids=ids, embeddings=embeddings, documents=page["documents"], metadatas=metadatas)
+        self._migrated.update(ids)
+
+    def _stream(self) -> None:
+        """Re-embed every live document into the shadow, keeping all workers busy"""
+
+        in_flight: List[tuple] = []
+        max_in_flight = max(2, 2 * self.workers)
+        last_log = time.perf_counter()
+
+        def drain(limit: int) -> None:
+            nonlocal last_log
+            while len(in_flight) > limit:
+                page, future = in_flight.pop(0)
+                self._write_shadow(page, future.result())
+                self.processed += len(page["ids"])
+                if time.perf_counter() - last_log >= self.progress_interval:
+                    last_log = time.perf_counter()
+                    progress = self.progress()
+                    logger.info(
+                        f"Reindex {progress['processed']}/{progress['total']} "
+                        f"({progress['docs_per_second']} docs/s, ETA {progress['eta_seconds']}s)"
+                    )
+
+        for page in self.vector_store._iter_pages(include=["documents", "metadatas"], page_size=self.page_size):
+            if self._cancel.is_set():
+                raise _Cancelled()
+            in_flight.append((page, self._submit_encode(page["documents"])))
+            drain(max_in_flight)
+        drain(0)
+
+    def _reconcile_ids(self) -> None:
+        """Queue IDs missing from (or left over in) the shadow after streaming"""
+
+        live_ids: Set[str] = set()
+        for page in self.vector_store._iter_pages(include=[], page_size=10000):
+            live_ids.update(page["ids"])
+
+        with self._dirty_lock:
+            self._dirty.update(live_ids - self._migrated)
+            self._dirty.update(self._migrated - live_ids)
+
+    def _replay_dirty(self) -> None:
+        """Bring changed IDs in the shadow up to date with the live collection"""
+
+        while True:
+            with self._dirty_lock:
+                if not self._dirty:
+                    return
+                ids = list(self._dirty)
+                self._dirty.clear()
+
+            for start in range(0, len(ids), self.page_size):
+                chunk = ids[start:start + self.page_size]
+                live = self.vector_store.collection.get(ids=chunk, include=["documents", "metadatas"])
+                gone = list(set(chunk) - set(live["ids"]))
+                if gone:
+                    self.shadow.delete(ids=gone)
+                    self._migrated.difference_update(gone)
+                if live["ids"]:
+                    self._write_shadow(live, self._encode(live["documents"]))
+
+    def _on_write(self, example_ids: Optional[List[str]]) -> None:
+        """Record IDs written to the live collection during migration"""
+        with self._dirty_lock:
+            if example_ids is None:
+                # Cleared: everything migrated so far must go
+                self._dirty.update(self._migrated)
+            else:
+                self._dirty.update(example_ids)
+
+    # ------------------------------------------------------------------
+    # Dual-read
+    # ------------------------------------------------------------------
+
+    def _on_read(
+        self,
+        queries: List[str],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]],
+        results: List[List[Dict[str, Any]]]
+    ) -> None:
+        """Sample live searches for comparison against the shadow (off the request path)"""
+        if self.state not in ("running", "awaiting_cutover") or self.shadow is None \
+                or random.random() >= self.dual_read_sample_rate:
+            return
+        try:
+            self._dual_read_executor.submit(self._compare, queries, n_results, where, where_document, results)
+        except RuntimeError:
+            pass  # Executor already shut down
+
+    def _compare(
+        self,
+        queries: List[str],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]],
+        results: List[List[Dict[str, Any]]]
+    ) -> None:
+        """Overlap of live and shadow top-k over documents already migrated"""
+
+        try:
+            embeddings = self._encode(queries)
+            shadow_results = self.shadow.query(
+                query_embeddings=embeddings,
+                n_results=n_results,
+                where=where,
+                where_document=where_document,
+                include=[]
+            )
+        except Exception:
+            return
+
+        for live, shadow_ids in zip(results, shadow_results["ids"]):
+            live_ids = {result["id"] for result in live if result["id"] in self._migrated}
+            if not live_ids:
+                continue
+            self._dual_read_overlap += len(live_ids & set(shadow_ids)) / len(live_ids)
+            self.dual_reads += 1
+
+    def dual_read_agreement(self) -> Optional[float]:
+        """Mean top-k overlap between live and shadow results (None before any comparison)"""
+        return self._dual_read_overlap / self.dual_reads if self.dual_reads else None
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def progress(self) -> Dict[str, Any]:
+        """Throughput, ETA and state of the migration"""
+
+        elapsed = 0.0
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        rate = self.processed / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, self.total - self.processed)
+        agreement = self.dual_read_agreement()
+
+        return {
+            "state": self.state,
+            "old_model": self.old_model,
+            "new_model": self.new_model,
+            "workers": self.workers,
+            "total": self.total,
+            "processed": self.processed,
+            "percent_complete": round(100.0 * self.processed / self.total, 1) if self.total else 100.0,
+            "elapsed_seconds": round(elapsed, 2),
+            "docs_per_second": round(rate, 1),
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+            "pending_changes": len(self._dirty),
+            "dual_reads": self.dual_reads,
+            "dual_read_agreement": round(agreement, 4) if agreement is not None else None,
+            "error": self.error
+        }
+
+
+class _Cancelled(Exception):
+    """Raised inside the job when cancel() was called"""
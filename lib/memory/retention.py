@@ -0,0 +1,210 @@
+"""
+Retention Manager - Quality- and age-aware eviction for vector store collections
+Caps examples per mode, drops low-quality or stale examples in batches and compacts afterwards
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from memory.vector_store import FreeVectorStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionPolicy:
+    """What a retention run keeps"""
+    max_examples_per_mode: Dict[str, int] = field(default_factory=dict)  # Per-mode caps
+    default_max_per_mode: Optional[int] = None  # Cap for modes not listed above (no cap if None)
+    min_quality_score: Optional[float] = None  # Evict scored examples below this
+    max_age_days: Optional[float] = None  # Evict examples not written for this long
+    unscored_quality: float = 0.0  # Quality assumed for unscored examples when ranking for caps
+    batch_size: int = 500  # Examples deleted per backend call
+    compact_after: bool = True  # Compact the collection after evicting
+
+    def cap_for(self, mode: str) -> Optional[int]:
+        """Size cap for a mode, if any"""
+        return self.max_examples_per_mode.get(mode, self.default_max_per_mode)
+
+
+@dataclass
+class RetentionReport:
+    """Outcome (or, for a dry run, preview) of one retention run"""
+    dry_run: bool
+    started_at: str
+    scanned: int = 0
+    evicted: int = 0
+    evicted_by_reason: Dict[str, int] = field(default_factory=dict)
+    evicted_by_mode: Dict[str, int] = field(default_factory=dict)
+    evicted_ids: List[str] = field(default_factory=list)
+    batches: int = 0
+    compaction: Optional[Dict[str, Any]] = None
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RetentionManager:
+    """
+    Applies a RetentionPolicy to a FreeVectorStore
+
+    An example is evicted when it is scored below ``min_quality_score``, when
+    neither its ``timestamp`` nor ``updated_at`` is within ``max_age_days``,
+    or when its mode is over its cap. Over a cap, the lowest-quality examples
+    go first (unscored ones ranked at ``unscored_quality``), oldest first
+    among equals. Planning reads metadata page by page; deletes go out in
+    batches of ``batch_size``.
+    """
+
+    def __init__(self, vector_store: FreeVectorStore, policy: Optional[RetentionPolicy] = None):
+        """
+        Initialize the retention manager
+
+        Args:
+            vector_store: Store to enforce the policy on
+            policy: Retention policy (keeps everything if None)
+        """
+
+        self.vector_store = vector_store
+        self.policy = policy or RetentionPolicy()
+
+        self.last_report: Optional[RetentionReport] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _last_written(metadata: Dict[str, Any]) -> Optional[datetime]:
+        """Most recent of the example's timestamp and updated_at"""
+        written = []
+        for key in ("timestamp", "updated_at"):
+            try:
+                written.append(datetime.fromisoformat(str(metadata[key])))
+            except (KeyError, ValueError):
+                continue
+        return max(written) if written else None
+
+    def plan(self, now: Optional[datetime] = None) -> List[Tuple[str, str, str]]:
+        """
+        Decide which examples the policy evicts, without deleting anything
+
+        Args:
+            now: Reference time for age checks (current time if None)
+
+        Returns:
+            (example_id, mode, reason) for every example to evict
+        """
+
+        policy = self.policy
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=policy.max_age_days) if policy.max_age_days is not None else None
+
+        evictions: List[Tuple[str, str, str]] = []
+        # mode -> [(quality, written, id)] of examples that survive the quality and age rules
+        survivors: Dict[str, List[Tuple[float, str, str]]] = {}
+
+        for page in self.vector_store._iter_pages(include=["metadatas"]):
+            for example_id, metadata in zip(page["ids"], page["metadatas"]):
+                metadata = metadata or {}
+                mode = str(metadata.get("mode", "unknown"))
+                quality = self.vector_store.stats._quality(metadata)
+                written = self._last_written(metadata)
+
+                if policy.min_quality_score is not None and quality is not None and quality < policy.min_quality_score:
+                    evictions.append((example_id, mode, "low_quality"))
+                elif cutoff is not None and written is not None and written < cutoff:
+                    evictions.append((example_id, mode, "stale"))
+                else:
+                    survivors.setdefault(mode, []).append((
+                        quality if quality is not None else policy.unscored_quality,
+                        written.isoformat() if written else "",
+                        example_id
+                    ))
+
+        for mode, examples in survivors.items():
+            cap = policy.cap_for(mode)
+            if cap is None or len(examples) <= cap:
+                continue
+            examples.sort()
+            for _, _, example_id in examples[:len(examples) - cap]:
+                evictions.append((example_id, mode, "over_capacity"))
+
+        return evictions
+
+    def run(self, dry_run: bool = False) -> RetentionReport:
+        """
+        Apply the policy once
+
+        Args:
+            dry_run: Only report what would be evicted
+
+        Returns:
+            Report of the evicted (or, for a dry run, evictable) examples
+        """
+
+        with self._run_lock:
+            start_time = time.perf_counter()
+            report = RetentionReport(dry_run=dry_run, started_at=datetime.now().isoformat())
+            report.scanned = self.vector_store.collection.count()
+
+            evictions = self.plan()
+            for example_id, mode, reason in evictions:
+                report.evicted_by_reason[reason] = report.evicted_by_reason.get(reason, 0) + 1
+                report.evicted_by_mode[mode] = report.evicted_by_mode.get(mode, 0) + 1
+                report.evicted_ids.append(example_id)
+
+            if dry_run:
+                report.evicted = len(evictions)
+            else:
+                batch_size = max(1, self.policy.batch_size)
+                for start in range(0, len(report.evicted_ids), batch_size):
+                    report.evicted += self.vector_store.delete_examples(report.evicted_ids[start:start + batch_size])
+                    report.batches += 1
+
+                if report.evicted and self.policy.compact_after:
+                    report.compaction = self.vector_store.compact()
+
+            report.elapsed_seconds = round(time.perf_counter() - start_time, 3)
+            self.last_report = report
+
+        if not dry_run and report.evicted:
+            logger.info(f"Retention evicted {report.evicted} examples: {report.evicted_by_reason}")
+        return report
+
+    def start(self, interval: float) -> None:
+        """
+        Run the policy in a background thread every ``interval`` seconds
+
+        Args:
+            interval: Seconds between runs
+        """
+
+        self.stop()
+        self._stop = threading.Event()
+
+        def _run(stop_event: threading.Event) -> None:
+            while not stop_event.wait(interval):
+                try:
+                    self.run()
+                except Exception as e:
+                    logger.warning(f"Retention run failed: {e}")
+
+        self._thread = threading.Thread(
+            target=_run,
+            args=(self._stop,),
+            name=f"retention-{self.vector_store.collection_name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background job if running"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -4,12 +4,71 @@ Provides semantic search capabilities for the AGENT LLM system
 """
 
 import chromadb
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator, Union, IO, Callable, Sequence
+import csv
+import io
 import uuid
+import itertools
 import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
 from datetime import datetime
 import json
+import logging
+
+from memory.embedding_cache import EmbeddingCache
+from memory.embedder_registry import EmbedderRegistry, get_embedder_registry
+from memory.collection_stats import CollectionStatistics
+from memory.lexical_index import LexicalIndex, document_matches
+from memory.query_cache import QueryResultCache
+from memory.chunking import TextChunker
+from memory.embedding_projection import EmbeddingProjection, projection_recall_report
+from memory.numpy_backend import NumpyClient
+
+logger = logging.getLogger(__name__)
+
+# Runs the unfiltered lookup of search_with_fallback alongside the mode lookup.
+# Shared by every store so short-lived stores do not each leave idle threads behind
+_fallback_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="fallback-query")
+
+
+def merge_fallback_results(
+    primary: List[Dict[str, Any]],
+    fallback: List[Dict[str, Any]],
+    n_results: int
+) -> List[Dict[str, Any]]:
+    """Primary results, then the closest fallback results not already included, up to n_results"""
+
+    seen = {result["id"] for result in primary}
+    merged = list(primary)
+    for result in sorted(fallback, key=lambda r: r["distance"]):
+        if len(merged) >= n_results:
+            break
+        if result["id"] not in seen:
+            seen.add(result["id"])
+            merged.append(result)
+    return merged
+
+
+@dataclass(frozen=True)
+class _StoreState:
+    """
+    Everything a search depends on, published as one value
+
+    A swap to a new collection version replaces the whole state in a single
+    assignment, so a search that took a snapshot encodes its queries with
+    the model and projection that match the collection it queries.
+    """
+    collection: Any
+    embedder_model: str
+    projection: Optional[EmbeddingProjection]
+    version: int = 0
 
 
 class FreeVectorStore:
@@ -18,38 +77,140 @@ class FreeVectorStore:
     Handles storage, retrieval, and semantic similarity search for agent examples
     """
 
+    # Document filters narrowed by the lexical index to at most this many
+    # candidates are scored in-process instead of scanned by the backend
+    LEXICAL_CANDIDATE_LIMIT = 10000
+
+    # Reciprocal rank fusion constant for hybrid search
+    RRF_K = 60
+
+    # Seconds a collection swap waits for searches still running on the old
+    # collection before dropping it
+    READ_DRAIN_TIMEOUT = 30.0
+
     def __init__(
         self,
         collection_name: str = "agent_examples",
         embedder_model: str = "all-MiniLM-L6-v2",
-        persist_directory: Optional[str] = None
+        persist_directory: Optional[str] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        embedder_registry: Optional[EmbedderRegistry] = None,
+        stats_reconcile_interval: Optional[float] = None,
+        backend: str = "chroma",
+        backend_options: Optional[Dict[str, Any]] = None,
+        query_cache: Optional[QueryResultCache] = None,
+        projection: Optional[EmbeddingProjection] = None,
+        client: Optional[Any] = None
     ):
         """
         Initialize the vector store
 
         Args:
             collection_name: Name of the ChromaDB collection
-            embedder_model: Sentence transformer model to use
+            embedder_model: Sentence transformer model to use ("onnx:<model>" for the ONNX Runtime CPU backend)
             persist_directory: Directory to persist ChromaDB data
+            embedding_cache: Shared embedding cache (a private in-memory cache if None)
+            embedder_registry: Registry the embedder is loaded from (process-wide if None)
+            stats_reconcile_interval: Seconds between background statistics recounts (disabled if None)
+            backend: Storage/search backend ("chroma" or the in-process "numpy")
+            backend_options: Extra options for the numpy backend (dtype, indexed_fields, ann_threshold, nprobe, fsync)
+            query_cache: Search result cache (a private one if None; max_entries=0 disables it)
+            projection: Dimensionality reduction for stored and query embeddings (the persisted one if None)
+            client: Existing backend client to share (one is created for the backend if None)
         """
 
-        # Initialize ChromaDB client
-        if persist_directory:
-            self.chroma_client = chromadb.PersistentClient(path=persist_directory)
+        # Initialize the backend client (the numpy backend mirrors the ChromaDB client API)
+        if client is not None:
+            self.chroma_client = client
+        elif backend == "numpy":
+            self.chroma_client = NumpyClient(path=persist_directory, **(backend_options or {}))
+        elif backend == "chroma":
+            if persist_directory:
+                self.chroma_client = chromadb.PersistentClient(path=persist_directory)
+            else:
+                self.chroma_client = chromadb.Client()
         else:
-            self.chroma_client = chromadb.Client()
+            raise ValueError(f"Unsupported vector store backend: {backend}")
+
+        self.backend = backend
+        self.persist_directory = persist_directory
 
         self.collection_name = collection_name
-        self.embedder_model = embedder_model
 
-        # Initialize sentence transformer
-        self.embedder = SentenceTransformer(embedder_model)
+        # Sentence transformer is loaded lazily and shared through the registry
+        self.embedder_registry = embedder_registry or get_embedder_registry()
+        self.embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache()
+
+        # Search results are cached per collection generation; every write bumps it
+        self.query_cache = query_cache if query_cache is not None else QueryResultCache()
+        self.generation = 0
+        self._generation_lock = threading.Lock()
         # Get or create collection
         try:
-            self.collection = self.chroma_client.get_collection(name=collection_name)
+            collection = self.chroma_client.get_collection(name=collection_name)
         except Exception:
             # Collection does not exist, create it
-            self.collection = self.chroma_client.create_collection(name=collection_name)
+            collection = self.chroma_client.create_collection(name=collection_name)
+
+        # Optional dimensionality reduction, saved next to a persistent collection
+        projection_file = self._projection_file()
+        if projection is None and projection_file and os.path.exists(projection_file):
+            projection = EmbeddingProjection.load(projection_file)
+        self._state = _StoreState(collection, embedder_model, projection)
+        if projection is not None:
+            self._save_projection()
+
+        # Statistics are kept up to date on writes; a full recount happens on
+        # first use and periodically if a reconcile interval is configured
+        self.stats = CollectionStatistics()
+        self._reconcile_stop = threading.Event()
+        self._reconcile_thread: Optional[threading.Thread] = None
+        if stats_reconcile_interval:
+            self.start_stats_reconciler(stats_reconcile_interval)
+
+        # Inverted index for keyword search and document filters, built from
+        # the collection on first use and kept current on writes
+        self.lexical_index = LexicalIndex()
+        self._lexical_index_built = False
+        self._lexical_index_lock = threading.Lock()
+
+        # Writes hold this lock around the backend call so a reindex cutover
+        # can swap the collection between writes; listeners hear about changed IDs
+        self._write_lock = threading.RLock()
+        self.write_listeners: List[Callable[[Optional[List[str]]], None]] = []
+        self.read_listeners: List[Callable[..., None]] = []
+
+        # Searches register the collection they run against, so a swap to a
+        # new collection version can drop the old one once they are done
+        self._read_condition = threading.Condition()
+        self._active_reads: Dict[int, int] = {}
+        # Old versions still being searched when a swap gave up waiting, by name
+        self._retired_collections: Dict[int, str] = {}
+
+    @property
+    def collection(self) -> Any:
+        """The live collection"""
+        return self._state.collection
+
+    @property
+    def embedder_model(self) -> str:
+        """Model the live collection's vectors were embedded with"""
+        return self._state.embedder_model
+
+    @property
+    def projection(self) -> Optional[EmbeddingProjection]:
+        """Projection applied to the live collection's vectors (None for full dimension)"""
+        return self._state.projection
+
+    def _publish(self, **changes: Any) -> None:
+        """Replace the collection, model and/or projection in one assignment (hold the write lock)"""
+        with self._read_condition:
+            self._state = replace(self._state, version=self._state.version + 1, **changes)
+
+    @property
+    def embedder(self):
+        """Shared sentence transformer for this store's model (loaded on first use)"""
+        return self.embedder_registry.get(self.embedder_model)
 
     def add_example(
         self,
@@ -70,13 +231,445 @@ class FreeVectorStore:
         """
 
         # Generate embedding
-        embedding = self.embedder.encode([text])[0]
+        encoding = self._encoding_state()
+        embedding = self._encode([text])[0]
 
         # Generate ID if not provided
         if custom_id is None:
             custom_id = str(uuid.uuid4())
 
-        # Prepare metadata
+        with self._write_lock:
+            # A reindex or projection change may have happened while we were encoding
+            if self._encoding_state() != encoding:
+                embedding = self._encode([text])[0]
+
+            # Prepare metadata
+            metadata = self._prepare_metadata(text, metadata)
+
+            # Chroma ignores adds for existing IDs, so only count new ones
+            existing_ids = self._existing_ids([custom_id])
+
+            # Add to collection
+            self.collection.add(
+                embeddings=[embedding.tolist()],
+                documents=[text],
+                metadatas=[metadata],
+                ids=[custom_id]
+            )
+
+            if custom_id not in existing_ids:
+                self.stats.record_add(metadata)
+                self.lexical_index.add(custom_id, text)
+                self._notify_write([custom_id])
+                self._bump_generation()
+
+        return custom_id
+
+    def add_examples(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+        ids: Optional[List[Optional[str]]] = None,
+        batch_size: int = 256
+    ) -> Dict[str, Any]:
+        """
+        Add many text examples to the vector store in batches
+
+        Texts are encoded in chunks of ``batch_size`` and each chunk is written
+        to the collection with a single ``collection.add`` call. IDs that
+        already exist are left unchanged and not counted as added.
+
+        Args:
+            texts: The text contents to embed and store
+            metadatas: Per-example metadata (same length as texts, entries may be None)
+            ids: Per-example IDs (same length as texts, None entries are auto-generated)
+            batch_size: Number of examples encoded and written per batch
+
+        Returns:
+            Dictionary with the stored IDs and throughput statistics
+        """
+
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise ValueError("metadatas must have the same length as texts")
+        if ids is not None and len(ids) != len(texts):
+            raise ValueError("ids must have the same length as texts")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        # Chroma rejects writes larger than its configured maximum batch size
+        try:
+            batch_size = min(batch_size, self.chroma_client.get_max_batch_size())
+        except Exception:
+            pass
+
+        stored_ids = [
+            custom_id if custom_id is not None else str(uuid.uuid4())
+            for custom_id in (ids or [None] * len(texts))
+        ]
+
+        start_time = time.perf_counter()
+        encode_time = 0.0
+        added = 0
+
+        for start in range(0, len(texts), batch_size):
+            batch_texts = texts[start:start + batch_size]
+            batch_metadatas = metadatas[start:start + batch_size] if metadatas else [None] * len(batch_texts)
+
+            encode_start = time.perf_counter()
+            encoding = self._encoding_state()
+            embeddings = self._encode(batch_texts, batch_size=batch_size)
+            encode_time += time.perf_counter() - encode_start
+
+            batch_ids = stored_ids[start:start + batch_size]
+
+            with self._write_lock:
+                if self._encoding_state() != encoding:
+                    embeddings = self._encode(batch_texts, batch_size=batch_size)
+
+                prepared_metadatas = [
+                    self._prepare_metadata(text, metadata)
+                    for text, metadata in zip(batch_texts, batch_metadatas)
+                ]
+                existing_ids = self._existing_ids(batch_ids)
+
+                self.collection.add(
+                    embeddings=[embedding.tolist() for embedding in embeddings],
+                    documents=batch_texts,
+                    metadatas=prepared_metadatas,
+                    ids=batch_ids
+                )
+
+                # The backend skips IDs that already exist; only new ones count
+                for example_id, text, metadata in zip(batch_ids, batch_texts, prepared_metadatas):
+                    if example_id not in existing_ids:
+                        self.stats.record_add(metadata)
+                        self.lexical_index.add(example_id, text)
+                        added += 1
+                self._notify_write([example_id for example_id in batch_ids if example_id not in existing_ids])
+                self._bump_generation()
+
+        elapsed = time.perf_counter() - start_time
+
+        return {
+            "ids": stored_ids,
+            "added": added,
+            "batch_size": batch_size,
+            "elapsed_seconds": round(elapsed, 3),
+            "encode_seconds": round(encode_time, 3),
+            "examples_per_second": round(added / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def upsert_examples(
+        self,
+        texts: List[str],
+        ids: List[str],
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+        batch_size: int = 256
+    ) -> Dict[str, Any]:
+        """
+        Insert new examples and update existing ones in batches
+
+        Only new examples and examples whose text changed are embedded; for
+        the rest the metadata is merged in place. Each batch costs one read
+        to classify the IDs, at most one encode, and one add and one update
+        call.
+
+        Args:
+            texts: The text contents
+            ids: Example IDs (same length as texts)
+            metadatas: Per-example metadata (same length as texts, entries may be None)
+            batch_size: Number of examples classified and written per batch
+
+        Returns:
+            Dictionary with added/updated/re-embedded counts and timing
+        """
+
+        if len(ids) != len(texts):
+            raise ValueError("ids must have the same length as texts")
+        if metadatas is not None and len(metadatas) != len(texts):
+            raise ValueError("metadatas must have the same length as texts")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        start_time = time.perf_counter()
+        added = updated = reembedded = 0
+
+        for start in range(0, len(texts), batch_size):
+            batch_ids = ids[start:start + batch_size]
+            batch_texts = texts[start:start + batch_size]
+            batch_metadatas = metadatas[start:start + batch_size] if metadatas else [None] * len(batch_texts)
+
+            # Embed what looks new or changed outside the lock, then re-check under it
+            encoding = self._encoding_state()
+            stored_records = self._stored_records(batch_ids)
+            to_embed = [
+                i for i, doc_id in enumerate(batch_ids)
+                if doc_id not in stored_records or stored_records[doc_id][0] != batch_texts[i]
+            ]
+            embedding_for = dict(zip(to_embed, self._encode([batch_texts[i] for i in to_embed], batch_size=batch_size))) \
+                if to_embed else {}
+
+            with self._write_lock:
+                stored_records = self._stored_records(batch_ids)
+                new_rows = [i for i, doc_id in enumerate(batch_ids) if doc_id not in stored_records]
+                changed_rows = [
+                    i for i, doc_id in enumerate(batch_ids)
+                    if doc_id in stored_records and stored_records[doc_id][0] != batch_texts[i]
+                ]
+                changed = set(changed_rows)
+
+                missing = [i for i in new_rows + changed_rows if i not in embedding_for]
+                if self._encoding_state() != encoding:
+                    missing = new_rows + changed_rows
+                if missing:
+                    embedding_for.update(zip(missing, self._encode([batch_texts[i] for i in missing], batch_size=batch_size)))
+
+                if new_rows:
+                    new_metadatas = [self._prepare_metadata(batch_texts[i], batch_metadatas[i]) for i in new_rows]
+                    self.collection.add(
+                        ids=[batch_ids[i] for i in new_rows],
+                        embeddings=[embedding_for[i] for i in new_rows],
+                        documents=[batch_texts[i] for i in new_rows],
+                        metadatas=new_metadatas
+                    )
+                    for i, metadata in zip(new_rows, new_metadatas):
+                        self.stats.record_add(metadata)
+                        self.lexical_index.add(batch_ids[i], batch_texts[i])
+
+                # Metadata-only rows and re-embedded rows go out as one update call each
+                existing_rows = [i for i, doc_id in enumerate(batch_ids) if doc_id in stored_records]
+                merged_metadata: Dict[int, Dict[str, Any]] = {}
+                for i in existing_rows:
+                    changes = {key: value for key, value in (batch_metadatas[i] or {}).items() if value is not None}
+                    changes["updated_at"] = datetime.now().isoformat()
+                    if i in changed:
+                        changes["text_length"] = len(batch_texts[i])
+                    merged_metadata[i] = changes
+
+                for rows in ([i for i in existing_rows if i not in changed], changed_rows):
+                    if not rows:
+                        continue
+                    update_data: Dict[str, Any] = {"metadatas": [merged_metadata[i] for i in rows]}
+                    if rows is changed_rows:
+                        update_data["embeddings"] = [embedding_for[i] for i in rows]
+                        update_data["documents"] = [batch_texts[i] for i in rows]
+                    self.collection.update(ids=[batch_ids[i] for i in rows], **update_data)
+
+                for i in existing_rows:
+                    old_metadata = stored_records[batch_ids[i]][1]
+                    self.stats.record_update(old_metadata, dict(old_metadata, **merged_metadata[i]))
+                    if i in changed:
+                        self.lexical_index.add(batch_ids[i], batch_texts[i])
+
+                self._notify_write(batch_ids)
+                self._bump_generation()
+
+                added += len(new_rows)
+                updated += len(existing_rows)
+                reembedded += len(changed_rows)
+
+        elapsed = time.perf_counter() - start_time
+        return {
+            "added": added,
+            "updated": updated,
+            "reembedded": reembedded,
+            "elapsed_seconds": round(elapsed, 3),
+            "examples_per_second": round(len(texts) / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def _stored_records(self, ids: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        """Stored document and metadata for the given IDs that exist"""
+        stored = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        return {
+            doc_id: (document, metadata or {})
+            for doc_id, document, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+        }
+
+    def add_document(
+        self,
+        source: Union[str, IO[str], Iterable[str]],
+        metadata: Optional[Dict[str, Any]] = None,
+        document_id: Optional[str] = None,
+        chunker: Optional[TextChunker] = None,
+        batch_size: int = 64
+    ) -> Dict[str, Any]:
+        """
+        Add a long document as overlapping chunks that each fit the embedder's window
+
+        The document is streamed through the chunker and chunks are embedded
+        and written ``batch_size`` at a time, so memory use does not grow with
+        document length. Each chunk is stored as ``<document_id>#<index>``
+        with the document's metadata plus ``parent_id``, ``chunk_index`` and
+        its character span; re-adding a document ID replaces its old chunks.
+
+        Args:
+            source: Document text, a text file object or an iterable of text pieces
+            metadata: Metadata stored on every chunk
+            document_id: ID of the document (auto-generated if None)
+            chunker: Chunker to split with (TextChunker defaults counting the embedder's tokens if None)
+            batch_size: Chunks embedded and written per batch
+
+        Returns:
+            Dictionary with the document ID, chunk count and throughput statistics
+        """
+
+        chunker = chunker or TextChunker(tokenizer=getattr(self.embedder, "tokenizer", None))
+        if document_id is None:
+            document_id = str(uuid.uuid4())
+
+        start_time = time.perf_counter()
+        replaced = self.delete_document(document_id)
+
+        chunks = 0
+        tokens = 0
+        characters = 0
+        batch: List[Any] = []
+        for chunk in itertools.chain(chunker.chunk(source), [None]):
+            if chunk is not None:
+                batch.append(chunk)
+            if batch and (chunk is None or len(batch) >= batch_size):
+                self.add_examples(
+                    [item.text for item in batch],
+                    metadatas=[
+                        dict(
+                            metadata or {},
+                            parent_id=document_id,
+                            chunk_index=item.index,
+                            chunk_start=item.start,
+                            chunk_end=item.end
+                        )
+                        for item in batch
+                    ],
+                    ids=[f"{document_id}#{item.index}" for item in batch],
+                    batch_size=batch_size
+                )
+                chunks += len(batch)
+                tokens += sum(item.tokens for item in batch)
+                characters = batch[-1].end
+                batch = []
+
+        elapsed = time.perf_counter() - start_time
+        return {
+            "document_id": document_id,
+            "chunks": chunks,
+            "tokens": tokens,
+            "characters": characters,
+            "replaced_chunks": replaced,
+            "elapsed_seconds": round(elapsed, 3),
+            "chunks_per_second": round(chunks / elapsed, 2) if elapsed > 0 else 0.0
+        }
+
+    def delete_document(self, document_id: str) -> int:
+        """
+        Delete every chunk of a document added with add_document
+
+        Args:
+            document_id: ID of the document
+
+        Returns:
+            Number of chunks deleted
+        """
+
+        chunk_ids = self.collection.get(where={"parent_id": document_id}, include=[])["ids"]
+        return self.delete_examples(chunk_ids) if chunk_ids else 0
+
+    def search_documents(
+        self,
+        query: str,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None,
+        mode: str = "vector",
+        chunks_per_document: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Search chunks and group the hits back into their parent documents
+
+        Documents are ranked by their best-matching chunk. Examples that were
+        not added through add_document form a group of their own.
+
+        Args:
+            query: The search query text
+            n_results: Number of documents to return
+            where: Metadata filters
+            where_document: Document content filters
+            mode: "vector", "keyword" or "hybrid" (as in search_similar)
+            chunks_per_document: Maximum matching chunks returned per document
+
+        Returns:
+            List of documents with their ID, best distance, metadata and
+            matching chunks (best first)
+        """
+
+        total = self.collection.count()
+        if total == 0:
+            return []
+
+        n_chunks = n_results * chunks_per_document
+        while True:
+            hits = self.search_similar(
+                query,
+                n_results=min(n_chunks, total),
+                where=where,
+                where_document=where_document,
+                mode=mode
+            )
+
+            documents: Dict[str, Dict[str, Any]] = {}
+            for hit in hits:
+                metadata = hit["metadata"] or {}
+                parent_id = metadata.get("parent_id", hit["id"])
+                document = documents.get(parent_id)
+                if document is None:
+                    document = documents[parent_id] = {
+                        "document_id": parent_id,
+                        "distance": hit["distance"],
+                        "metadata": {
+                            key: value for key, value in metadata.items()
+                            if key not in ("chunk_index", "chunk_start", "chunk_end")
+                        },
+                        "chunks": []
+                    }
+                if len(document["chunks"]) < chunks_per_document:
+                    document["chunks"].append(hit)
+
+            # A few long documents can take every hit; widen the search until
+            # enough documents show up or the collection is exhausted
+            if len(documents) >= n_results or len(hits) < n_chunks or n_chunks >= total:
+                return list(documents.values())[:n_results]
+            n_chunks *= 4
+
+    def _encode(self, texts: List[str], batch_size: int = 32, state: Optional[_StoreState] = None) -> np.ndarray:
+        """
+        Embed texts through the embedding cache, encoding only cache misses
+
+        Args:
+            texts: Texts to embed
+            batch_size: Encoder batch size
+            state: Store state whose model and projection to use (the current one if None)
+        """
+
+        state = state or self._state
+        embeddings = self._encode_full(texts, batch_size=batch_size, embedder_model=state.embedder_model)
+        return state.projection.transform(embeddings) if state.projection is not None else embeddings
+
+    def _encode_full(self, texts: List[str], batch_size: int = 32, embedder_model: Optional[str] = None) -> np.ndarray:
+        """Full-dimension model embeddings (the cache holds these, before any projection)"""
+        embedder_model = embedder_model or self.embedder_model
+        return self.embedding_cache.encode(
+            embedder_model,
+            texts,
+            lambda misses: self.embedder_registry.get(embedder_model).encode(misses, batch_size=batch_size)
+        )
+
+    def _encoding_state(self) -> Tuple[str, Optional[EmbeddingProjection]]:
+        """What stored embeddings depend on; writers re-encode if it changes while they encode"""
+        state = self._state
+        return state.embedder_model, state.projection
+
+    def _prepare_metadata(self, text: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Attach the standard bookkeeping fields to an example's metadata"""
+
         if metadata is None:
             metadata = {}
 
@@ -87,22 +680,39 @@ class FreeVectorStore:
             "embedder_model": self.embedder_model
         })
 
-        # Add to collection
-        self.collection.add(
-            embeddings=[embedding.tolist()],
-            documents=[text],
-            metadatas=[metadata],
-            ids=[custom_id]
-        )
+        # Chroma rejects None metadata values; an absent key means the same thing
+        return {key: value for key, value in metadata.items() if value is not None}
 
-        return custom_id
+    def _existing_ids(self, ids: List[str]) -> set:
+        """Subset of the given IDs that are already stored"""
+        return set(self.collection.get(ids=ids, include=[])["ids"])
+
+    def _get_metadata(self, example_id: str) -> Optional[Dict[str, Any]]:
+        """Stored metadata for an ID, or None if the ID does not exist"""
+        result = self.collection.get(ids=[example_id], include=["metadatas"])
+        if not result["ids"]:
+            return None
+        return result["metadatas"][0] or {}
+
+    def _iter_pages(self, include: List[str], page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Page through the whole collection with bounded memory"""
+        offset = 0
+        while True:
+            page = self.collection.get(include=include, limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            yield page
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
 
     def search_similar(
         self,
         query: str,
         n_results: int = 5,
         where: Optional[Dict[str, Any]] = None,
-        where_document: Optional[Dict[str, str]] = None
+        where_document: Optional[Dict[str, str]] = None,
+        mode: str = "vector"
     ) -> List[Dict[str, Any]]:
         """
         Search for semantically similar examples
@@ -112,33 +722,201 @@ class FreeVectorStore:
             n_results: Number of results to return
             where: Metadata filters
             where_document: Document content filters
+            mode: "vector" (embedding similarity), "keyword" (BM25 over the
+                lexical index) or "hybrid" (both, fused by reciprocal rank)
 
         Returns:
             List of similar examples with scores and metadata
         """
 
-        # Generate query embedding
-        query_embedding = self.embedder.encode([query])[0]
+        if mode in ("keyword", "hybrid"):
+            return self._search_lexical(query, n_results, where, where_document, hybrid=(mode == "hybrid"))
+        if mode != "vector":
+            raise ValueError(f"Unsupported search mode: {mode}")
+
+        return self.search_many(
+            [query],
+            n_results=n_results,
+            where=where,
+            where_document=where_document
+        )[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for semantically similar examples for many queries at once
+
+        All queries are encoded in one batched forward pass and sent to the
+        backend as a single multi-embedding query.
+
+        Args:
+            queries: The search query texts
+            n_results: Number of results to return per query
+            where: Metadata filters (applied to every query)
+            where_document: Document content filters (applied to every query)
+
+        Returns:
+            One list of results per query, each in the search_similar format
+        """
+
+        if not queries:
+            return []
+
+        # Queries are encoded for the same state (model, projection) they are searched in
+        with self._reading() as state:
+            query_embeddings = self._encode(queries, state=state)
+            results = self.search_by_embeddings(
+                query_embeddings,
+                n_results=n_results,
+                where=where,
+                where_document=where_document,
+                state=state
+            )
+        if self.read_listeners:
+            self._notify_read(queries, n_results, where, where_document, results)
+        return results
+
+    def search_with_fallback(
+        self,
+        query: str,
+        mode: Optional[str],
+        n_results: int = 5,
+        min_mode_results: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Search one mode's examples, topping up with examples from any mode if too few match
+
+        The query is encoded once and both lookups run concurrently, so the
+        fallback costs no extra round trip. Fallback results never repeat an
+        example already returned for the mode.
+
+        Args:
+            query: The search query text
+            mode: Agent mode to prefer (no mode filter if None)
+            n_results: Maximum number of results
+            min_mode_results: Fall back when fewer mode results than this are found
+
+        Returns:
+            Mode results first, then fallback results, in the search_similar format
+        """
+
+        with self._reading() as state:
+            query_embeddings = self._encode([query], state=state)
+            if mode is None:
+                return self.search_by_embeddings(query_embeddings, n_results=n_results, state=state)[0]
+
+            general = _fallback_executor.submit(
+                self.search_by_embeddings, query_embeddings, n_results, None, None, state
+            )
+            results = self.search_by_embeddings(
+                query_embeddings, n_results=n_results, where={"mode": mode}, state=state
+            )[0]
+            if len(results) >= min_mode_results:
+                # Not needed: skip it if it has not started yet
+                general.cancel()
+                return results
+
+            return merge_fallback_results(results, general.result()[0], n_results)
+
+    def search_by_embeddings(
+        self,
+        query_embeddings: Any,
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, str]] = None,
+        state: Optional[_StoreState] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search with precomputed query embeddings in a single backend query
+
+        Args:
+            query_embeddings: 2D array (or list of vectors) of query embeddings
+            n_results: Number of results to return per query
+            where: Metadata filters (applied to every query)
+            where_document: Document content filters (applied to every query)
+            state: State the embeddings were encoded for, from an enclosing
+                _reading() (the current state if None)
+
+        Returns:
+            One list of results per query embedding
+        """
+
+        if len(query_embeddings) == 0:
+            return []
+
+        with self._reading(state) as state:
+            # Serve repeated searches from the cache; only misses go to the backend.
+            # Keys include the state version, so results never outlive a swap.
+            generation = self.generation
+            keys = [
+                QueryResultCache.make_key(
+                    f"{self.backend}:{self.collection_name}:{state.version}", embedding,
+                    n_results=n_results, where=where, where_document=where_document
+                )
+                for embedding in query_embeddings
+            ]
+            all_results: List[Optional[List[Dict[str, Any]]]] = [
+                self.query_cache.get(key, generation) for key in keys
+            ]
+            misses = [i for i, cached in enumerate(all_results) if cached is None]
+            if not misses:
+                return all_results
+
+            miss_embeddings = [query_embeddings[i] for i in misses]
+            miss_results = self._query_backend(state.collection, miss_embeddings, n_results, where, where_document)
+
+        for i, results in zip(misses, miss_results):
+            all_results[i] = results
+            self.query_cache.put(keys[i], generation, results)
+
+        return all_results
+
+    def _query_backend(
+        self,
+        collection: Any,
+        query_embeddings: List[Any],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, str]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Run an uncached search against the index or the given collection version"""
+
+        # Substring filters the lexical index can narrow are scored in-process
+        if where_document:
+            candidate_ids = self._lexical_candidates(where_document)
+            if candidate_ids is not None and len(candidate_ids) <= self.LEXICAL_CANDIDATE_LIMIT:
+                return self._search_candidates(
+                    collection, query_embeddings, candidate_ids, n_results, where, where_document
+                )
 
         # Perform search
-        results = self.collection.query(
-            query_embeddings=[query_embedding.tolist()],
+        results = collection.query(
+            query_embeddings=[np.asarray(embedding).tolist() for embedding in query_embeddings],
             n_results=n_results,
             where=where,
             where_document=where_document,
             include=["documents", "metadatas", "distances"]
         )
 
-        # Format results
+        return [self._format_query_results(results, i) for i in range(len(query_embeddings))]
+
+    def _format_query_results(self, results: Dict[str, Any], query_index: int) -> List[Dict[str, Any]]:
+        """Format one query's results from a backend query response"""
+
         formatted_results = []
-        if results["documents"] and len(results["documents"][0]) > 0:
+        if results["documents"] and len(results["documents"][query_index]) > 0:
             for i, (doc, metadata, distance) in enumerate(zip(
-                results["documents"][0],
-                results["metadatas"][0],
-                results["distances"][0]
+                results["documents"][query_index],
+                results["metadatas"][query_index],
+                results["distances"][query_index]
             )):
                 formatted_results.append({
-                    "id": results["ids"][0][i],
+                    "id": results["ids"][query_index][i],
                     "text": doc,
                     "metadata": metadata,
                     "similarity_score": 1.0 - distance,  # Convert distance to similarity
@@ -147,6 +925,229 @@ class FreeVectorStore:
 
         return formatted_results
 
+    def _notify_write(self, example_ids: Optional[List[str]]) -> None:
+        """Tell write listeners which IDs changed (None means the whole collection)"""
+        for listener in list(self.write_listeners):
+            listener(example_ids)
+
+    def _notify_read(
+        self,
+        queries: List[str],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]],
+        results: List[List[Dict[str, Any]]]
+    ) -> None:
+        """Hand completed searches to read listeners (e.g. a reindex job's dual-read)"""
+        for listener in list(self.read_listeners):
+            listener(queries, n_results, where, where_document, results)
+
+    def _bump_generation(self) -> None:
+        """Mark cached search results as stale after a write"""
+        with self._generation_lock:
+            self.generation += 1
+
+    def _ensure_lexical_index(self) -> LexicalIndex:
+        """Build the lexical index from the stored documents on first use"""
+
+        if not self._lexical_index_built:
+            with self._lexical_index_lock:
+                if not self._lexical_index_built:
+                    for page in self._iter_pages(include=["documents"]):
+                        self.lexical_index.add_many(zip(page["ids"], page["documents"]))
+                    self._lexical_index_built = True
+
+        return self.lexical_index
+
+    def rebuild_lexical_index(self) -> Dict[str, Any]:
+        """
+        Rebuild the lexical index from the stored documents
+
+        Needed only if the collection was written to outside this store.
+
+        Returns:
+            The lexical index statistics
+        """
+
+        with self._lexical_index_lock:
+            self._lexical_index_built = False
+            self.lexical_index.clear()
+        self._ensure_lexical_index()
+        return self.lexical_index.get_stats()
+
+    def _lexical_candidates(self, where_document: Dict[str, Any]) -> Optional[set]:
+        """IDs that can match a document filter, or None if the index cannot narrow it"""
+        return self._ensure_lexical_index().candidates(where_document)
+
+    def _fetch_candidates(
+        self,
+        collection: Any,
+        candidate_ids: List[str],
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]]
+    ) -> Tuple[List[str], List[str], List[Dict[str, Any]], np.ndarray]:
+        """Load candidate records, keeping those that pass the filters"""
+
+        if not candidate_ids:
+            return [], [], [], np.zeros((0, 0), dtype=np.float32)
+
+        records = collection.get(
+            ids=candidate_ids,
+            where=where,
+            include=["documents", "metadatas", "embeddings"]
+        )
+
+        keep = [
+            i for i, document in enumerate(records["documents"])
+            if where_document is None or document_matches(document, where_document)
+        ]
+        if not keep:
+            return [], [], [], np.zeros((0, 0), dtype=np.float32)
+
+        return (
+            [records["ids"][i] for i in keep],
+            [records["documents"][i] for i in keep],
+            [records["metadatas"][i] for i in keep],
+            np.asarray([records["embeddings"][i] for i in keep], dtype=np.float32)
+        )
+
+    def _distances(self, collection: Any, embeddings: np.ndarray, query_embeddings: np.ndarray) -> np.ndarray:
+        """Distances (candidates x queries) in the collection's own metric"""
+
+        if self.backend == "numpy":
+            space = "cosine"
+        else:
+            configuration = getattr(collection, "configuration", None) or {}
+            space = (configuration.get("hnsw") or {}).get("space") or \
+                (collection.metadata or {}).get("hnsw:space", "l2")
+
+        if space == "cosine":
+            embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            query_embeddings = query_embeddings / np.maximum(
+                np.linalg.norm(query_embeddings, axis=1, keepdims=True), 1e-12
+            )
+            return 1.0 - embeddings @ query_embeddings.T
+        if space == "ip":
+            return 1.0 - embeddings @ query_embeddings.T
+
+        # Squared L2, as ChromaDB reports it
+        return (
+            (embeddings ** 2).sum(axis=1)[:, None]
+            + (query_embeddings ** 2).sum(axis=1)[None, :]
+            - 2 * embeddings @ query_embeddings.T
+        )
+
+    def _search_candidates(
+        self,
+        collection: Any,
+        query_embeddings: Any,
+        candidate_ids: set,
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        where_document: Dict[str, Any]
+    ) -> List[List[Dict[str, Any]]]:
+        """Vector search restricted to the lexical index's candidates for a document filter"""
+
+        ids, documents, metadatas, embeddings = self._fetch_candidates(
+            collection, sorted(candidate_ids), where, where_document
+        )
+        if not ids:
+            return [[] for _ in query_embeddings]
+
+        query_matrix = np.asarray([np.asarray(embedding, dtype=np.float32) for embedding in query_embeddings])
+        distances = self._distances(collection, embeddings, query_matrix)
+
+        all_results = []
+        for j in range(len(query_matrix)):
+            order = np.argsort(distances[:, j], kind="stable")[:n_results]
+            all_results.append([
+                {
+                    "id": ids[i],
+                    "text": documents[i],
+                    "metadata": metadatas[i],
+                    "similarity_score": 1.0 - float(distances[i, j]),
+                    "distance": float(distances[i, j])
+                }
+                for i in order
+            ])
+        return all_results
+
+    def _search_lexical(
+        self,
+        query: str,
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        where_document: Optional[Dict[str, Any]],
+        hybrid: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyword (BM25) search, optionally fused with vector search
+
+        Both rankings draw ``4 * n_results`` candidates that pass the filters;
+        hybrid results are ordered by reciprocal rank fusion, so neither score
+        scale dominates.
+        """
+
+        index = self._ensure_lexical_index()
+        pool_size = n_results * 4
+
+        allowed_ids = index.candidates(where_document) if where_document else None
+        # One state snapshot: the query is encoded for the collection it is ranked against
+        with self._reading() as state:
+            query_embedding = self._encode([query], state=state)
+
+            # Filters are applied when loading the keyword hits. A selective filter
+            # can reject most of them, so the BM25 ranking is widened until enough
+            # hits pass or every matching document has been ranked.
+            records: Dict[str, Dict[str, Any]] = {}
+            bm25_scores: Dict[str, float] = {}
+            keyword_hits: List[Tuple[str, float]] = []
+            k = pool_size
+            while True:
+                loaded = len(keyword_hits)
+                keyword_hits = index.search(query, k=k, doc_ids=allowed_ids)
+                bm25_scores.update(keyword_hits)
+                ids, documents, metadatas, embeddings = self._fetch_candidates(
+                    state.collection, [doc_id for doc_id, _ in keyword_hits[loaded:]], where, where_document
+                )
+                if ids:
+                    distances = self._distances(state.collection, embeddings, query_embedding)[:, 0]
+                    for doc_id, document, metadata, distance in zip(ids, documents, metadatas, distances):
+                        records[doc_id] = {
+                            "id": doc_id,
+                            "text": document,
+                            "metadata": metadata,
+                            "similarity_score": 1.0 - float(distance),
+                            "distance": float(distance)
+                        }
+                if len(records) >= pool_size or len(keyword_hits) < k:
+                    break
+                k *= 4
+
+            keyword_ranking = sorted(records, key=lambda doc_id: (-bm25_scores[doc_id], doc_id))
+
+            vector_ranking: List[str] = []
+            if hybrid:
+                hits = self.search_by_embeddings(query_embedding, pool_size, where, where_document, state=state)[0]
+                for result in hits:
+                    records.setdefault(result["id"], result)
+                    vector_ranking.append(result["id"])
+
+        fused: Dict[str, float] = {}
+        for ranking in (keyword_ranking, vector_ranking):
+            for rank, doc_id in enumerate(ranking):
+                fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (self.RRF_K + rank + 1)
+
+        ranked_ids = sorted(fused, key=lambda doc_id: (-fused[doc_id], doc_id))[:n_results]
+        results = []
+        for doc_id in ranked_ids:
+            result = dict(records[doc_id])
+            result["bm25_score"] = round(bm25_scores.get(doc_id, 0.0), 4)
+            if hybrid:
+                result["fused_score"] = round(fused[doc_id], 6)
+            results.append(result)
+        return results
+
     def get_example_by_id(self, example_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a specific example by ID
@@ -193,28 +1194,102 @@ class FreeVectorStore:
             # Prepare update data
             update_data = {}
 
+            encoding = self._encoding_state()
+            if text is not None and text == self._stored_records([example_id]).get(example_id, (None,))[0]:
+                # Unchanged text needs no new embedding
+                text = None
             if text is not None:
                 # Re-embed the text
-                embedding = self.embedder.encode([text])[0]
+                embedding = self._encode([text])[0]
                 update_data["embeddings"] = [embedding.tolist()]
                 update_data["documents"] = [text]
 
-            if metadata is not None:
-                # Update timestamp
-                metadata["updated_at"] = datetime.now().isoformat()
-                update_data["metadatas"] = [metadata]
+            with self._write_lock:
+                if text is not None and self._encoding_state() != encoding:
+                    update_data["embeddings"] = [self._encode([text])[0].tolist()]
 
-            if update_data:
-                self.collection.update(
-                    ids=[example_id],
-                    **update_data
-                )
+                old_metadata = None
+                if metadata is not None:
+                    # Update timestamp
+                    metadata["updated_at"] = datetime.now().isoformat()
+                    update_data["metadatas"] = [metadata]
+                    old_metadata = self._get_metadata(example_id)
+
+                if update_data:
+                    self.collection.update(
+                        ids=[example_id],
+                        **update_data
+                    )
+
+                if text is not None:
+                    self.lexical_index.add(example_id, text)
+                if update_data:
+                    self._notify_write([example_id])
+                    self._bump_generation()
+
+                # Chroma merges metadata on update, so read back the stored result
+                if old_metadata is not None:
+                    self.stats.record_update(old_metadata, self._get_metadata(example_id))
 
             return True
 
         except Exception:
             return False
 
+    def update_metadata_many(self, updates: Dict[str, Dict[str, Any]], batch_size: int = 1000) -> int:
+        """
+        Merge metadata changes into many examples without re-embedding
+
+        Each batch is one read (for statistics) and one update call, so this
+        is cheap enough to run on every feedback event. Unknown IDs are
+        skipped and None values are dropped.
+
+        Args:
+            updates: Mapping of example ID to the metadata fields to set
+            batch_size: Number of examples updated per backend call
+
+        Returns:
+            Number of examples updated
+        """
+
+        items = list(updates.items())
+        updated = 0
+
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+            updated_at = datetime.now().isoformat()
+
+            with self._write_lock:
+                existing = self.collection.get(ids=[example_id for example_id, _ in batch], include=["metadatas"])
+                old_metadatas = {
+                    example_id: metadata or {}
+                    for example_id, metadata in zip(existing["ids"], existing["metadatas"])
+                }
+
+                ids = []
+                metadatas = []
+                for example_id, changes in batch:
+                    if example_id not in old_metadatas:
+                        continue
+                    ids.append(example_id)
+                    metadatas.append(dict(
+                        {key: value for key, value in changes.items() if value is not None},
+                        updated_at=updated_at
+                    ))
+                if not ids:
+                    continue
+
+                self.collection.update(ids=ids, metadatas=metadatas)
+                for example_id, metadata in zip(ids, metadatas):
+                    old_metadata = old_metadatas[example_id]
+                    self.stats.record_update(old_metadata, dict(old_metadata, **metadata))
+
+                self._notify_write(ids)
+                self._bump_generation()
+                updated += len(ids)
+
+        return updated
+
     def delete_example(self, example_id: str) -> bool:
         """
         Delete an example from the vector store
@@ -227,71 +1302,517 @@ class FreeVectorStore:
         """
 
         try:
-            self.collection.delete(ids=[example_id])
+            with self._write_lock:
+                old_metadata = self._get_metadata(example_id)
+                self.collection.delete(ids=[example_id])
+                if old_metadata is not None:
+                    self.stats.record_delete(old_metadata)
+                self.lexical_index.remove(example_id)
+                self._notify_write([example_id])
+                self._bump_generation()
             return True
         except Exception:
             return False
 
-    def get_collection_stats(self) -> Dict[str, Any]:
+    def delete_examples(self, example_ids: List[str]) -> int:
         """
-        Get statistics about the vector store collection
+        Delete many examples with a single backend call
+
+        Args:
+            example_ids: IDs of the examples to delete (unknown IDs are ignored)
 
         Returns:
-            Dictionary with collection statistics
+            Number of examples deleted
         """
 
+        if not example_ids:
+            return 0
+
+        with self._write_lock:
+            existing = self.collection.get(ids=list(example_ids), include=["metadatas"])
+            if not existing["ids"]:
+                return 0
+
+            self.collection.delete(ids=existing["ids"])
+            for example_id, metadata in zip(existing["ids"], existing["metadatas"]):
+                self.stats.record_delete(metadata or {})
+                self.lexical_index.remove(example_id)
+            self._notify_write(existing["ids"])
+            self._bump_generation()
+
+        return len(existing["ids"])
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Reclaim space left behind by deleted examples
+
+        The numpy backend shrinks its matrix and rewrites its files. For a
+        persistent ChromaDB store the SQLite database is vacuumed (ChromaDB
+        rebuilds its vector segments on its own schedule).
+
+        Returns:
+            Dictionary describing what was compacted
+        """
+
+        if hasattr(self.collection, "compact"):
+            return dict(self.collection.compact(), backend=self.backend)
+
+        database = os.path.join(self.persist_directory, "chroma.sqlite3") if self.persist_directory else None
+        if not database or not os.path.exists(database):
+            return {"backend": self.backend, "compacted": False, "reason": "in-memory collection"}
+
+        bytes_before = os.path.getsize(database)
+        connection = sqlite3.connect(database, timeout=30)
         try:
-            # Get all items to count
-            all_items = self.collection.get(include=["metadatas"])
+            connection.execute("VACUUM")
+        finally:
+            connection.close()
 
-            total_examples = len(all_items["ids"]) if all_items["ids"] else 0
+        return {
+            "backend": self.backend,
+            "compacted": True,
+            "bytes_before": bytes_before,
+            "bytes_after": os.path.getsize(database)
+        }
 
-            # Count by agent mode if metadata available
-            mode_counts = {}
-            quality_scores = []
+    def _projection_file(self) -> Optional[str]:
+        """Where a persistent collection's projection is saved (None for in-memory stores)"""
+        if not self.persist_directory:
+            return None
+        return os.path.join(self.persist_directory, f"{self.collection_name}.projection.npz")
 
-            if all_items["metadatas"]:
-                for metadata in all_items["metadatas"]:
-                    if metadata and "mode" in metadata:
-                        mode = metadata["mode"]
-                        mode_counts[mode] = mode_counts.get(mode, 0) + 1
+    def _save_projection(self) -> None:
+        """Persist the current projection, or remove a stale one"""
+        projection_file = self._projection_file()
+        if not projection_file:
+            return
+        if self.projection is not None:
+            os.makedirs(self.persist_directory, exist_ok=True)
+            self.projection.save(projection_file)
+        elif os.path.exists(projection_file):
+            os.remove(projection_file)
 
-                    if metadata and "quality_score" in metadata:
-                        try:
-                            quality_scores.append(float(metadata["quality_score"]))
-                        except (ValueError, TypeError):
-                            pass
+    def _full_dimension_sample(self, sample_size: int, seed: int = 0, page_size: int = 1000) -> np.ndarray:
+        """
+        Full-dimension embeddings of a random sample of stored examples
 
-            avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
+        Without a projection the stored vectors are used as they are; once
+        vectors are projected the sampled documents are re-encoded.
+        """
 
-            return {
+        total = self.collection.count()
+        rng = np.random.default_rng(seed)
+        rows = set(rng.choice(total, size=min(sample_size, total), replace=False).tolist()) if total else set()
+
+        include = ["embeddings"] if self.projection is None else ["documents"]
+        embeddings: List[np.ndarray] = []
+        documents: List[str] = []
+        offset = 0
+        for page in self._iter_pages(include=include, page_size=page_size):
+            picked = [i for i in range(len(page["ids"])) if offset + i in rows]
+            if picked and self.projection is None:
+                embeddings.append(np.asarray(page["embeddings"], dtype=np.float32)[picked])
+            elif picked:
+                documents.extend(page["documents"][i] for i in picked)
+            offset += len(page["ids"])
+
+        if documents:
+            return self._encode_full(documents, batch_size=64)
+        if embeddings:
+            return np.concatenate(embeddings)
+        return np.zeros((0, self.embedder.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    def evaluate_projection(
+        self,
+        dimensions: Sequence[int] = (32, 64, 128, 192, 256),
+        k: int = 10,
+        n_queries: int = 200,
+        method: str = "pca",
+        sample_size: int = 20000,
+        seed: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Report recall@k against output dimension for a projection of this collection
+
+        Stored examples double as queries: each sampled example's exact
+        full-dimension neighbours are compared with its neighbours after
+        projection. Use the report to pick the smallest dimension that keeps
+        retrieval quality, then pass it to fit_projection().
+
+        Args:
+            dimensions: Output dimensions to evaluate
+            k: Neighbours compared per query
+            n_queries: Number of sampled examples used as queries
+            method: "pca" or "truncate" (Matryoshka-trained models only)
+            sample_size: Maximum number of stored examples fitted and searched
+            seed: Random seed for sampling
+
+        Returns:
+            One row per dimension with recall@k, bytes per vector and search time
+        """
+
+        sample = self._full_dimension_sample(sample_size, seed=seed)
+        return projection_recall_report(sample, dimensions, k=k, n_queries=n_queries, method=method, seed=seed)
+
+    def fit_projection(
+        self,
+        dimension: int,
+        method: str = "pca",
+        sample_size: int = 20000,
+        seed: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Fit a projection on the collection and switch the store to it
+
+        Args:
+            dimension: Output dimension
+            method: "pca" or "truncate" (Matryoshka-trained models only)
+            sample_size: Maximum number of stored examples the projection is fitted on
+            seed: Random seed for sampling
+
+        Returns:
+            Dictionary with the projection settings and rewrite statistics
+        """
+
+        sample = self._full_dimension_sample(sample_size, seed=seed)
+        if not len(sample):
+            raise ValueError("Cannot fit a projection on an empty collection")
+        projection = EmbeddingProjection.fit(sample, dimension, method=method)
+        return dict(self.set_projection(projection), fitted_on=len(sample))
+
+    def set_projection(self, projection: Optional[EmbeddingProjection], page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Rewrite every stored vector with a new projection (None restores full dimension)
+
+        Vectors are written to a staging collection that then replaces the
+        live one, with writes blocked throughout. Stored full-dimension vectors
+        are projected directly; already projected ones are re-encoded from
+        their documents.
+
+        Args:
+            projection: Projection to apply from now on, or None
+            page_size: Examples rewritten per batch
+
+        Returns:
+            Dictionary with the projection settings and rewrite statistics
+        """
+
+        start_time = time.perf_counter()
+
+        with self._write_lock:
+            staging = self._create_staging_collection("projection")
+
+            old_projection = self.projection
+            rewritten = 0
+            include = ["documents", "metadatas"] + (["embeddings"] if old_projection is None else [])
+            for page in self._iter_pages(include=include, page_size=page_size):
+                if old_projection is None:
+                    embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+                else:
+                    embeddings = self._encode_full(page["documents"], batch_size=64)
+                if projection is not None:
+                    embeddings = projection.transform(embeddings)
+
+                staging.add(
+                    ids=page["ids"],
+                    embeddings=embeddings,
+                    documents=page["documents"],
+                    metadatas=[metadata or None for metadata in page["metadatas"]]
+                )
+                rewritten += len(page["ids"])
+
+            # Queries switch to the new projection in the same swap as the vectors
+            self._replace_collection(staging, projection=projection)
+            self._save_projection()
+            self._bump_generation()
+
+        return {
+            "projection": projection.get_config() if projection is not None else None,
+            "rewritten": rewritten,
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3)
+        }
+
+    @contextmanager
+    def bulk_write(self, replace: bool = False, page_size: int = 1000) -> Iterator["FreeVectorStore"]:
+        """
+        Build the next version of the collection off to the side and publish it atomically
+
+        Yields a store bound to a staging collection; all bulk writes go
+        through it. Searches on this store keep serving the last committed
+        version meanwhile, and on exit the staging collection replaces it in
+        one swap (with statistics and lexical index carried over). If the
+        block raises, the staging collection is dropped and nothing changes.
+        Other writers wait until the bulk write is committed or abandoned.
+
+            with store.bulk_write(replace=True) as staging:
+                staging.add_examples(texts, metadatas=metadatas)
+
+        Args:
+            replace: Start from an empty collection instead of a copy of the current one
+            page_size: Examples copied per batch when starting from a copy
+
+        Yields:
+            The staging store to write through
+        """
+
+        with self._write_lock:
+            staging_collection = self._create_staging_collection("bulk")
+            try:
+                if not replace:
+                    # Copy the stored vectors; nothing is re-embedded
+                    for page in self._iter_pages(include=["documents", "metadatas", "embeddings"], page_size=page_size):
+                        staging_collection.add(
+                            ids=page["ids"],
+                            embeddings=page["embeddings"],
+                            documents=page["documents"],
+                            metadatas=[metadata or None for metadata in page["metadatas"]]
+                        )
+
+                staging = FreeVectorStore(
+                    collection_name=staging_collection.name,
+                    embedder_model=self.embedder_model,
+                    embedding_cache=self.embedding_cache,
+                    embedder_registry=self.embedder_registry,
+                    backend=self.backend,
+                    query_cache=QueryResultCache(max_entries=0),
+                    projection=self.projection,
+                    client=self.chroma_client
+                )
+                yield staging
+
+                # Derived state is completed before the swap so it matches the new version
+                staging.reconcile_stats()
+                lexical_index = staging._ensure_lexical_index() if self._lexical_index_built else None
+            except BaseException:
+                try:
+                    self.chroma_client.delete_collection(name=staging_collection.name)
+                except Exception:
+                    pass
+                raise
+
+            self._replace_collection(staging.collection)
+            self.stats = staging.stats
+            if lexical_index is not None:
+                self.lexical_index = lexical_index
+            self._notify_write(None)
+            self._bump_generation()
+
+    @contextmanager
+    def _reading(self, state: Optional[_StoreState] = None) -> Iterator[_StoreState]:
+        """
+        Register a search against a store state until it finishes
+
+        Yields the current state, or the given one (which must already be
+        registered by an enclosing _reading()), so the collection it names is
+        not dropped while the search runs.
+        """
+        with self._read_condition:
+            state = state or self._state
+            collection = state.collection
+            self._active_reads[id(collection)] = self._active_reads.get(id(collection), 0) + 1
+        try:
+            yield state
+        finally:
+            retired_name = None
+            with self._read_condition:
+                remaining = self._active_reads[id(collection)] - 1
+                if remaining:
+                    self._active_reads[id(collection)] = remaining
+                else:
+                    del self._active_reads[id(collection)]
+                    retired_name = self._retired_collections.pop(id(collection), None)
+                    self._read_condition.notify_all()
+            # The last search on a retired version drops it
+            if retired_name is not None:
+                self._drop_collection(retired_name)
+
+    def _create_staging_collection(self, purpose: str) -> Any:
+        """Create an empty collection to build the next version in (replacing a leftover one)"""
+        staging_name = f"{self.collection_name}__{purpose}"
+        try:
+            self.chroma_client.delete_collection(name=staging_name)
+        except Exception:
+            pass
+        return self.chroma_client.create_collection(name=staging_name)
+
+    def _replace_collection(self, replacement: Any, **changes: Any) -> None:
+        """
+        Make a fully written staging collection the live one, under this store's name (hold the write lock)
+
+        The swap is a single assignment of the whole store state: searches
+        see either the old collection with its model and projection or the new
+        one with its own (passed as ``embedder_model``/``projection`` changes),
+        never a mix. The old collection is dropped only after searches already
+        running on it have finished; if they outlast ``READ_DRAIN_TIMEOUT``,
+        it is renamed out of the way and the last of them drops it.
+        """
+
+        with self._read_condition:
+            previous = self.collection
+            self._publish(collection=replacement, **changes)
+            drained = self._read_condition.wait_for(
+                lambda: id(previous) not in self._active_reads, self.READ_DRAIN_TIMEOUT
+            )
+
+        if drained:
+            self.chroma_client.delete_collection(name=self.collection_name)
+        else:
+            retired_name = f"{self.collection_name}__retired_{uuid.uuid4().hex[:8]}"
+            logger.warning(
+                f"Searches on the previous version of {self.collection_name} outlasted "
+                f"{self.READ_DRAIN_TIMEOUT}s; dropping it as {retired_name} once they finish"
+            )
+            self._rename_collection(previous, retired_name)
+            with self._read_condition:
+                if id(previous) in self._active_reads:
+                    self._retired_collections[id(previous)] = retired_name
+                    retired_name = None
+            if retired_name is not None:
+                self._drop_collection(retired_name)
+
+        renamed = self._rename_collection(replacement, self.collection_name)
+        if renamed is not replacement:
+            self._publish(collection=renamed)
+
+    def _rename_collection(self, collection: Any, new_name: str) -> Any:
+        """Rename a collection, returning the renamed collection"""
+        if hasattr(self.chroma_client, "rename_collection"):
+            return self.chroma_client.rename_collection(collection.name, new_name)
+        collection.modify(name=new_name)
+        return collection
+
+    def _drop_collection(self, name: str) -> None:
+        """Delete a collection that is no longer served, logging failures"""
+        try:
+            self.chroma_client.delete_collection(name=name)
+        except Exception as e:
+            logger.warning(f"Could not drop collection {name}: {str(e)}")
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the vector store collection
+
+        Served from incrementally maintained counters, so the cost does not
+        depend on collection size (after the first call, which recounts).
+
+        Returns:
+            Dictionary with collection statistics
+        """
+
+        try:
+            if self.stats.last_reconciled is None:
+                self.reconcile_stats()
+
+            stats = self.stats.snapshot()
+
+            result = {
                 "collection_name": self.collection_name,
-                "total_examples": total_examples,
+                "backend": self.backend,
+                "total_examples": stats["total_examples"],
                 "embedder_model": self.embedder_model,
-                "embedding_dimension": self.embedder.get_sentence_embedding_dimension(),
-                "examples_by_mode": mode_counts,
-                "average_quality_score": round(avg_quality, 2),
+                "embedding_dimension": (
+                    self.projection.dimension if self.projection is not None
+                    else self.embedder.get_sentence_embedding_dimension()
+                ),
+                "projection": self.projection.get_config() if self.projection is not None else None,
+                "examples_by_mode": stats["examples_by_mode"],
+                "average_quality_score": stats["average_quality_score"],
+                "embedding_cache": self.embedding_cache.get_stats(),
+                "query_cache": dict(self.query_cache.get_stats(), generation=self.generation),
+                "lexical_index": dict(self.lexical_index.get_stats(), built=self._lexical_index_built),
+                "stats_last_reconciled": stats["stats_last_reconciled"],
                 "last_updated": datetime.now().isoformat()
             }
 
+            if hasattr(self.collection, "get_index_stats"):
+                result["index"] = self.collection.get_index_stats()
+
+            return result
+
         except Exception as e:
             return {
                 "error": str(e),
                 "collection_name": self.collection_name
             }
 
+    def reconcile_stats(self) -> Dict[str, Any]:
+        """
+        Recount collection statistics from stored metadata
+
+        Corrects any drift in the incrementally maintained counters (e.g. from
+        writes made to the collection outside this store).
+
+        Returns:
+            The reconciled statistics
+        """
+
+        self.stats.rebuild(
+            metadata
+            for page in self._iter_pages(include=["metadatas"])
+            for metadata in page["metadatas"]
+        )
+        return self.stats.snapshot()
+
+    def start_stats_reconciler(self, interval: float) -> None:
+        """
+        Start a background thread that reconciles statistics periodically
+
+        Args:
+            interval: Seconds between reconciles
+        """
+
+        self.stop_stats_reconciler()
+        self._reconcile_stop = threading.Event()
+
+        def _run(stop_event: threading.Event) -> None:
+            while not stop_event.wait(interval):
+                try:
+                    self.reconcile_stats()
+                except Exception:
+                    pass  # Try again on the next interval
+
+        self._reconcile_thread = threading.Thread(
+            target=_run,
+            args=(self._reconcile_stop,),
+            name=f"stats-reconciler-{self.collection_name}",
+            daemon=True
+        )
+        self._reconcile_thread.start()
+
+    def stop_stats_reconciler(self) -> None:
+        """Stop the background statistics reconciler if running"""
+        self._reconcile_stop.set()
+        if self._reconcile_thread is not None:
+            self._reconcile_thread.join()
+            self._reconcile_thread = None
+
+    def persist(self) -> None:
+        """Flush the collection to disk (ChromaDB persists on every write already)"""
+        if hasattr(self.collection, "persist"):
+            self.collection.persist()
+
     def clear_collection(self):
         """Clear all examples from the collection"""
-        try:
-            # Delete the collection and recreate it
-            self.chroma_client.delete_collection(name=self.collection_name)
-            self.collection = self.chroma_client.create_collection(name=self.collection_name)
-        except Exception:
-            # If deletion fails, try to recreate
+        with self._write_lock:
             try:
-                self.collection = self.chroma_client.create_collection(name=self.collection_name)
+                # Swap in an empty collection, so concurrent searches see the
+                # old contents until the swap and never a missing collection
+                self._replace_collection(self._create_staging_collection("clear"))
+                self.stats.rebuild([])
+                self.lexical_index = LexicalIndex()
+                self._lexical_index_built = True
             except Exception:
-                pass  # Collection might already exist
+                # If deletion fails, try to recreate
+                try:
+                    self._publish(collection=self.chroma_client.create_collection(name=self.collection_name))
+                except Exception:
+                    pass  # Collection might already exist
+                # Contents are unknown here; recount on the next stats request
+                self.stats.last_reconciled = None
+                self.lexical_index.clear()
+                self._lexical_index_built = False
+            self._notify_write(None)
+            self._bump_generation()
 
     def export_examples(self, format: str = "json") -> str:
         """
@@ -318,15 +1839,306 @@ class FreeVectorStore:
                 return json.dumps(export_data, indent=2, default=str)
 
             elif format.lower() == "csv":
-                lines = ["id,text,metadata"]
-                for i, doc_id in enumerate(all_data["ids"]):
-                    metadata_str = json.dumps(all_data["metadatas"][i]) if all_data["metadatas"][i] else ""
-                    text = all_data["documents"][i].replace('"', '""')  # Escape quotes
-                    lines.append(f'"{doc_id}","{text}","{metadata_str}"')
-                return "\n".join(lines)
+                buffer = io.StringIO()
+                self.export_to_file(buffer, format="csv")
+                return buffer.getvalue()
 
             else:
                 raise ValueError(f"Unsupported export format: {format}")
 
         except Exception as e:
             return f"Export failed: {str(e)}"
+
+    def export_to_file(
+        self,
+        destination: Union[str, os.PathLike, IO[str]],
+        format: str = "jsonl",
+        page_size: int = 1000,
+        include_embeddings: bool = False,
+        embeddings_path: Optional[Union[str, os.PathLike]] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream all examples to a file, one page of the collection at a time
+
+        Memory use is bounded by ``page_size`` regardless of collection size.
+        With ``include_embeddings``, vectors are appended as raw float32 rows
+        to a binary sidecar (load with ``np.fromfile(path, dtype=np.float32)
+        .reshape(-1, embedding_dimension)``) and every record carries its
+        ``embedding_row`` index into it.
+
+        Args:
+            destination: Output path or writable text file-like object
+            format: Export format ("jsonl" or "csv")
+            page_size: Number of examples fetched from the collection per page
+            include_embeddings: Whether to write embeddings to a binary sidecar
+            embeddings_path: Sidecar path (defaults to "<destination>.embeddings.f32")
+
+        Returns:
+            Dictionary with export statistics
+        """
+
+        format = format.lower()
+        if format not in ("jsonl", "csv"):
+            raise ValueError(f"Unsupported export format: {format}")
+
+        destination_is_path = isinstance(destination, (str, os.PathLike))
+        if include_embeddings and embeddings_path is None:
+            if not destination_is_path:
+                raise ValueError("embeddings_path is required when exporting embeddings to a file object")
+            embeddings_path = f"{os.fspath(destination)}.embeddings.f32"
+
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+
+        start_time = time.perf_counter()
+        exported = 0
+        pages = 0
+        embedding_dimension = None
+
+        output = open(destination, "w", newline="", encoding="utf-8") if destination_is_path else destination
+        sidecar = open(embeddings_path, "wb") if include_embeddings else None
+
+        try:
+            writer = None
+            if format == "csv":
+                writer = csv.writer(output, quoting=csv.QUOTE_ALL)
+                writer.writerow(["id", "text", "metadata"] + (["embedding_row"] if include_embeddings else []))
+
+            for page in self._iter_pages(include=include, page_size=page_size):
+                pages += 1
+
+                if include_embeddings:
+                    embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+                    embedding_dimension = embeddings.shape[1] if embeddings.ndim == 2 else embedding_dimension
+                    sidecar.write(embeddings.tobytes())
+
+                for i, doc_id in enumerate(page["ids"]):
+                    metadata = page["metadatas"][i]
+
+                    if format == "jsonl":
+                        record = {"id": doc_id, "text": page["documents"][i], "metadata": metadata}
+                        if include_embeddings:
+                            record["embedding_row"] = exported
+                        output.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+                    else:
+                        row = [doc_id, page["documents"][i], json.dumps(metadata, default=str) if metadata else ""]
+                        if include_embeddings:
+                            row.append(exported)
+                        writer.writerow(row)
+
+                    exported += 1
+
+        finally:
+            if destination_is_path:
+                output.close()
+            if sidecar is not None:
+                sidecar.close()
+
+        elapsed = time.perf_counter() - start_time
+
+        return {
+            "exported": exported,
+            "format": format,
+            "pages": pages,
+            "embeddings_path": os.fspath(embeddings_path) if include_embeddings else None,
+            "embedding_dimension": embedding_dimension,
+            "elapsed_seconds": round(elapsed, 3)
+        }
+
+    def snapshot(self, path: Union[str, os.PathLike], page_size: int = 1000) -> Dict[str, Any]:
+        """
+        Write the whole collection to a directory in a memory-mappable layout
+
+        The directory gets ``embeddings.npy`` (a float32 matrix, loadable with
+        ``np.load(..., mmap_mode="r")``), ``records.jsonl`` (id, document and
+        metadata per matrix row) and ``manifest.json``. This is the same layout
+        the numpy backend persists, so a numpy-backed store restores it by
+        memory-mapping the matrix directly. The collection is streamed one page
+        at a time, so memory use is bounded by ``page_size``. Writes wait
+        until the snapshot is taken, and an earlier snapshot in the same
+        directory stops counting as complete as soon as it is being replaced.
+
+        Args:
+            path: Snapshot directory (created if missing; existing files are replaced)
+            page_size: Number of examples fetched from the collection per page
+
+        Returns:
+            The snapshot manifest plus timing
+        """
+
+        start_time = time.perf_counter()
+        path = os.fspath(path)
+        os.makedirs(path, exist_ok=True)
+
+        embeddings_file = os.path.join(path, "embeddings.npy")
+        records_file = os.path.join(path, "records.jsonl")
+        raw_file = embeddings_file + ".raw"
+
+        # Without a manifest the directory never looks complete while it is rewritten
+        manifest_file = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_file):
+            os.remove(manifest_file)
+
+        # Writers wait, so the pages, model and projection all describe one version
+        with self._write_lock:
+            state = self._state
+            count = 0
+            dimension = 0
+            with open(raw_file, "wb") as raw, open(records_file + ".tmp", "w", encoding="utf-8") as records:
+                for page in self._iter_pages(include=["documents", "metadatas", "embeddings"], page_size=page_size):
+                    embeddings = np.ascontiguousarray(page["embeddings"], dtype=np.float32)
+                    dimension = embeddings.shape[1]
+                    raw.write(embeddings.tobytes())
+                    for doc_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                        records.write(json.dumps(
+                            {"id": doc_id, "document": document, "metadata": metadata},
+                            default=str,
+                            ensure_ascii=False
+                        ) + "\n")
+                    count += len(page["ids"])
+
+            # The row count is only known now, so prefix the streamed rows with an .npy header
+            with open(embeddings_file + ".tmp", "wb") as out, open(raw_file, "rb") as raw:
+                np.lib.format.write_array_header_1_0(out, {
+                    "descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                    "fortran_order": False,
+                    "shape": (count, dimension)
+                })
+                shutil.copyfileobj(raw, out, 1 << 20)
+            os.remove(raw_file)
+            os.replace(embeddings_file + ".tmp", embeddings_file)
+            os.replace(records_file + ".tmp", records_file)
+
+            projection_file = os.path.join(path, "projection.npz")
+            if state.projection is not None:
+                state.projection.save(projection_file)
+            elif os.path.exists(projection_file):
+                os.remove(projection_file)
+
+        manifest = {
+            "format_version": 1,
+            "collection_name": self.collection_name,
+            "backend": self.backend,
+            "embedder_model": state.embedder_model,
+            "count": count,
+            "embedding_dimension": dimension,
+            "projection": state.projection.get_config() if state.projection is not None else None,
+            "dtype": "float32",
+            "created_at": datetime.now().isoformat()
+        }
+        # The manifest is written last: its presence marks a complete snapshot
+        with open(manifest_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_file + ".tmp", manifest_file)
+
+        return dict(manifest, elapsed_seconds=round(time.perf_counter() - start_time, 3))
+
+    def restore(self, path: Union[str, os.PathLike], batch_size: int = 5000) -> Dict[str, Any]:
+        """
+        Replace the collection's contents with a snapshot, without re-embedding
+
+        The numpy backend memory-maps the snapshot's matrix (copy-on-write), so
+        restore time does not depend on the number of vectors. ChromaDB is
+        bulk-loaded from the memory-mapped matrix in batches of ``batch_size``.
+        The snapshot is loaded into a staging collection that replaces the live
+        one in a single swap, so searches keep serving the old contents until
+        then and a failed restore changes nothing.
+
+        Args:
+            path: Directory written by snapshot()
+            batch_size: Records per ChromaDB add call
+
+        Returns:
+            Dictionary with restore statistics
+        """
+
+        start_time = time.perf_counter()
+        path = os.fspath(path)
+
+        manifest_file = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_file):
+            raise ValueError(f"No complete snapshot at {path}")
+        with open(manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        # Vectors from another model live in a different embedding space
+        if manifest["embedder_model"] != self.embedder_model:
+            raise ValueError(
+                f"Snapshot was embedded with {manifest['embedder_model']}, this store uses {self.embedder_model}"
+            )
+
+        # Queries must be projected the same way as the snapshot's vectors
+        projection = EmbeddingProjection.load(os.path.join(path, "projection.npz")) \
+            if manifest.get("projection") else None
+
+        with self._write_lock:
+            staging_collection = self._create_staging_collection("restore")
+            memory_mapped = hasattr(staging_collection, "load_files")
+            try:
+                if memory_mapped:
+                    restored = staging_collection.load_files(path)
+                else:
+                    restored = self._load_snapshot_records(staging_collection, path, batch_size)
+
+                # Derived state is rebuilt from the restored records before the swap
+                staging = FreeVectorStore(
+                    collection_name=staging_collection.name,
+                    embedder_model=self.embedder_model,
+                    embedding_cache=self.embedding_cache,
+                    embedder_registry=self.embedder_registry,
+                    backend=self.backend,
+                    query_cache=QueryResultCache(max_entries=0),
+                    projection=projection,
+                    client=self.chroma_client
+                )
+                staging.reconcile_stats()
+                lexical_index = staging._ensure_lexical_index() if self._lexical_index_built else None
+            except BaseException:
+                try:
+                    self.chroma_client.delete_collection(name=staging_collection.name)
+                except Exception:
+                    pass
+                raise
+
+            # Queries switch to the snapshot's projection in the same swap as its vectors
+            self._replace_collection(staging.collection, projection=projection)
+            self._save_projection()
+            self.stats = staging.stats
+            if lexical_index is not None:
+                self.lexical_index = lexical_index
+            self._notify_write(None)
+            self._bump_generation()
+
+        return {
+            "restored": restored,
+            "backend": self.backend,
+            "snapshot_created_at": manifest.get("created_at"),
+            "memory_mapped": memory_mapped,
+            "elapsed_seconds": round(time.perf_counter() - start_time, 3)
+        }
+
+    def _load_snapshot_records(self, collection: Any, path: str, batch_size: int) -> int:
+        """Bulk-load a snapshot's records into an empty collection from the memory-mapped matrix"""
+
+        try:
+            batch_size = min(batch_size, self.chroma_client.get_max_batch_size())
+        except Exception:
+            pass
+
+        embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        restored = 0
+        with open(os.path.join(path, "records.jsonl"), encoding="utf-8") as f:
+            batch: List[Dict[str, Any]] = []
+            for line in itertools.chain(f, [None]):
+                if line is not None:
+                    batch.append(json.loads(line))
+                if batch and (line is None or len(batch) >= batch_size):
+                    collection.add(
+                        ids=[record["id"] for record in batch],
+                        embeddings=embeddings[restored:restored + len(batch)],
+                        documents=[record["document"] for record in batch],
+                        metadatas=[record["metadata"] or None for record in batch]
+                    )
+                    restored += len(batch)
+                    batch = []
+
+        return restored
@@ -6,12 +6,14 @@ Implements Retrieval-Augmented Inference Synthesis Engine for AGENT LLM
 import asyncio
 import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+from contextlib import aclosing
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from collections import defaultdict
 
 from memory.vector_store import FreeVectorStore
+from memory.async_vector_store import get_async_vector_store
 from llm.base_wrapper import FreeLLMWrapper
 from agents.modes import FreeAgentModes, AgentMode
 
@@ -144,6 +146,7 @@ class FreeRAISEController:
         """
         
         self.vector_store = vector_store
+        self.async_vector_store = get_async_vector_store(vector_store)
         self.llm_wrapper = llm_wrapper
         self.agent_modes = agent_modes
         
@@ -181,6 +184,44 @@ class FreeRAISEController:
         Returns:
             Dictionary containing response and metadata
         """
+
+        final_response: Dict[str, Any] = {}
+        async for event in self.stream_user_input(
+            user_input, conversation_id, user_id, suggested_mode, context_metadata
+        ):
+            if event["type"] == "done":
+                final_response = event["response"]
+        return final_response
+
+    async def stream_user_input(
+        self,
+        user_input: str,
+        conversation_id: str,
+        user_id: Optional[str] = None,
+        suggested_mode: Optional[str] = None,
+        context_metadata: Optional[Dict[str, Any]] = None,
+        cancel_event: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process user input using RAISE framework, streaming tokens as they are generated
+
+        Yields the LLM wrapper's stream events (``examples``, ``reasoning``,
+        ``action``, ``answer``) and finally a ``done`` event whose ``response``
+        is what process_user_input returns. A cancelled stream (consumer gone
+        or ``cancel_event`` set) ends without a ``done`` event and records no
+        response in the conversation.
+
+        Args:
+            user_input: User's input text
+            conversation_id: Unique conversation identifier
+            user_id: Optional user identifier
+            suggested_mode: Suggested agent mode override
+            context_metadata: Additional context information
+            cancel_event: Event that stops generation when set
+
+        Yields:
+            Stream events
+        """
         
         start_time = datetime.now()
         logger.info(f"Processing user input for conversation: {conversation_id}")
@@ -200,13 +241,24 @@ class FreeRAISEController:
             examples = await self._retrieve_relevant_examples(user_input, agent_mode, context)
             context.retrieved_examples = examples
             
-            # Generate response using ReAct + RAISE
-            response_result = await self.llm_wrapper.generate_with_react(
+            # Generate response using ReAct + RAISE, passing tokens through
+            response_result = None
+            events = self.llm_wrapper.stream_with_react(
                 user_input=user_input,
                 agent_mode=agent_mode,
                 max_iterations=5,
-                use_examples=True
+                use_examples=True,
+                cancel_event=cancel_event
             )
+            async with aclosing(events):
+                async for event in events:
+                    if event["type"] == "done":
+                        response_result = event["result"]
+                    else:
+                        yield event
+            if response_result is None:
+                logger.info(f"Generation cancelled for conversation: {conversation_id}")
+                return
             
             # Update conversation context with response
             context.add_message("assistant", response_result["response"], {
@@ -249,7 +301,8 @@ class FreeRAISEController:
                     "tools_used": len(response_result["tool_usage"]),
                     "examples_retrieved": response_result["examples_used"],
                     "working_memory_size": len(context.working_memory),
-                    "conversation_length": len(context.message_history)
+                    "conversation_length": len(context.message_history),
+                    "timing": response_result.get("timing")
                 },
                 "reasoning_trace": response_result["reasoning_trace"],
                 "tool_usage": response_result["tool_usage"],
@@ -257,7 +310,7 @@ class FreeRAISEController:
             }
             
             logger.info(f"Successfully processed user input for conversation: {conversation_id}")
-            return final_response
+            yield {"type": "done", "response": final_response}
             
         except Exception as e:
             logger.error(f"Error processing user input: {str(e)}")
@@ -266,7 +319,7 @@ class FreeRAISEController:
             if suggested_mode and suggested_mode in self.performance_metrics:
                 self.performance_metrics[suggested_mode].error_count += 1
             
-            return {
+            yield {"type": "done", "response": {
                 "response": "I apologize, but I encountered an error while processing your request. Please try again.",
                 "conversation_id": conversation_id,
                 "agent_mode": "error_fallback",
@@ -275,7 +328,7 @@ class FreeRAISEController:
                     "response_time": (datetime.now() - start_time).total_seconds()
                 },
                 "timestamp": datetime.now().isoformat()
-            }
+            }}
 
     def _get_or_create_conversation(self, conversation_id: str, user_id: Optional[str]) -> ConversationContext:
         """Get existing conversation or create new one"""
@@ -388,21 +441,15 @@ class FreeRAISEController:
         """Retrieve relevant examples from vector store"""
         
         try:
-            # Search for examples in the specified mode
-            examples = self.vector_store.search_similar(
+            # Search for examples in the specified mode, topped up with general
+            # ones when fewer than 3 match (both lookups run in one call)
+            examples = await self.async_vector_store.search_with_fallback(
                 query=user_input,
+                mode=agent_mode if agent_mode != "smart_assistant" else None,
                 n_results=max_examples,
-                where={"mode": agent_mode} if agent_mode != "smart_assistant" else None
+                min_mode_results=3
             )
             
-            # If we don't have enough mode-specific examples, get general ones
-            if len(examples) < 3 and agent_mode != "smart_assistant":
-                general_examples = self.vector_store.search_similar(
-                    query=user_input,
-                    n_results=max_examples - len(examples)
-                )
-                examples.extend(general_examples)
-            
             logger.info(f"Retrieved {len(examples)} relevant examples for mode: {agent_mode}")
             return examples
             
@@ -0,0 +1,157 @@
+"""
+Shared fake providers for the LLM wrapper tests
+Scripted Ollama and Groq clients stand in for the real ones, so no Ollama server or Groq key is needed
+"""
+
+import asyncio
+import sys
+sys.path.append('lib')
+
+import pytest
+
+from memory.vector_store import FreeVectorStore
+from llm.base_wrapper import FreeLLMWrapper
+
+
+class FakeOllamaClient:
+    """
+    Ollama stand-in replying with scripted words
+
+    A reply starts after ``delay`` seconds and each word takes ``token_delay``
+    seconds, streamed or not. Counts generations, cancelled non-streaming
+    generations and closed streams; ``delay`` and ``fail`` can be changed
+    between calls.
+    """
+
+    def __init__(
+        self,
+        words=("one", " two", " three", " four", " five"),
+        delay: float = 0.0,
+        token_delay: float = 0.0,
+        fail: bool = False,
+        fail_after: int = None
+    ):
+        """
+        Initialize the fake client
+
+        Args:
+            words: Reply words, or a function of the generation number returning them
+            delay: Seconds before the reply (or its first token) starts
+            token_delay: Seconds per word
+            fail: Raise ConnectionError instead of generating
+            fail_after: Break the stream with ConnectionError after this many words
+        """
+
+        self.words = words
+        self.delay = delay
+        self.token_delay = token_delay
+        self.fail = fail
+        self.fail_after = fail_after
+        self.calls = 0
+        self.cancelled = 0
+        self.closed = 0
+
+    async def generate(self, model, prompt, options=None, stream=False):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("ollama is down")
+        words = list(self.words(self.calls) if callable(self.words) else self.words)
+        delay, token_delay = self.delay, self.token_delay
+
+        if not stream:
+            try:
+                await asyncio.sleep(delay + token_delay * len(words))
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            return {"response": "".join(words)}
+
+        async def parts():
+            try:
+                await asyncio.sleep(delay)
+                for position, word in enumerate(words):
+                    if position == self.fail_after:
+                        raise ConnectionError("connection reset mid-stream")
+                    await asyncio.sleep(token_delay)
+                    yield {"response": word, "done": False}
+                yield {"response": "", "done": True}
+            finally:
+                self.closed += 1
+
+        return parts()
+
+
+class FakeGroqStream:
+    """Streamed Groq completion that records whether it was closed"""
+
+    def __init__(self, words, token_delay: float = 0.0):
+        self.words = words
+        self.token_delay = token_delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        for word in self.words:
+            await asyncio.sleep(self.token_delay)
+            delta = type("Delta", (), {"content": word})()
+            yield type("Chunk", (), {"choices": [type("Choice", (), {"delta": delta})()]})()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeGroqClient:
+    """Groq stand-in answering after ``delay`` seconds; keeps every stream it opened"""
+
+    def __init__(self, words=("from", " groq"), delay: float = 0.0, token_delay: float = 0.0):
+        self.words = list(words)
+        self.delay = delay
+        self.token_delay = token_delay
+        self.calls = 0
+        self.streams = []
+        self.chat = type("Chat", (), {"completions": self})()
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if not kwargs.get("stream"):
+            message = type("Message", (), {"content": "".join(self.words)})()
+            return type("Response", (), {"choices": [type("Choice", (), {"message": message})()]})()
+        stream = FakeGroqStream(self.words, self.token_delay)
+        self.streams.append(stream)
+        return stream
+
+
+def build_wrapper(vector_store=None, ollama_client=None, groq_client=None, **options) -> FreeLLMWrapper:
+    """
+    FreeLLMWrapper talking to fake providers
+
+    Args:
+        vector_store: Store for examples (a fresh in-memory NumPy store if None)
+        ollama_client: Ollama stand-in (a FakeOllamaClient if None)
+        groq_client: Groq stand-in (no Groq fallback if None)
+        **options: FreeLLMWrapper options (retry_delay defaults to 0)
+
+    Returns:
+        The wrapper
+    """
+
+    if vector_store is None:
+        vector_store = FreeVectorStore(collection_name='llm_wrapper_test', backend="numpy")
+    options.setdefault("retry_delay", 0.0)
+    wrapper = FreeLLMWrapper(
+        vector_store=vector_store,
+        groq_api_key="test-key",
+        **options
+    )
+    wrapper.ollama_async_client = ollama_client if ollama_client is not None else FakeOllamaClient()
+    wrapper.groq_async_client = groq_client
+    return wrapper
+
+
+@pytest.fixture
+def make_wrapper():
+    """Factory for wrappers with fake providers (see build_wrapper)"""
+    return build_wrapper
@@ -82,6 +82,12 @@ def test_data_collector():
         )
         print(f"✅ Added feedback to interaction 2: {feedback_added_2}")
         
+        # Feedback is pushed to the stored example without re-embedding
+        stored_example = vector_store.get_example_by_id(interaction_id_1)
+        assert stored_example["metadata"]["quality_score"] == 4.2
+        assert stored_example["metadata"]["high_quality"] is True
+        print(f"✅ Feedback propagated to vector store: {stored_example['metadata']['user_feedback_score']}")
+        
         # Test training dataset creation
         print("4. Testing training dataset creation...")
         dataset_id = data_collector.create_training_dataset(
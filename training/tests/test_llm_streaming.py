@@ -0,0 +1,139 @@
+"""
+Test token streaming through FreeLLMWrapper.stream_with_react
+Provider clients are replaced with scripted fakes, so no Ollama server or Groq key is needed
+"""
+
+import asyncio
+import sys
+import time
+sys.path.append('lib')
+
+from memory.vector_store import FreeVectorStore
+from llm.base_wrapper import ResponseTruncatedError
+from conftest import FakeGroqClient, FakeOllamaClient, build_wrapper
+
+TOKEN_DELAY = 0.02
+
+
+def streaming_ollama(**options):
+    """Ollama stand-in streaming a short answer one word per TOKEN_DELAY"""
+    return FakeOllamaClient(words=["Final", " answer", " about", " Python", " functions", "."] * 3,
+                            token_delay=TOKEN_DELAY, **options)
+
+
+async def run_llm_streaming_tests(make_wrapper):
+    print("🧪 Testing LLM token streaming...")
+
+    vector_store = FreeVectorStore(collection_name='llm_streaming_test', backend="numpy")
+
+    print("1. Streaming reasoning and answer tokens...")
+    ollama_client = streaming_ollama()
+    wrapper = make_wrapper(vector_store, ollama_client)
+    start = time.perf_counter()
+    first_event_seconds = None
+    events = []
+    async for event in wrapper.stream_with_react("How do I write a function?", use_examples=False):
+        if first_event_seconds is None:
+            first_event_seconds = time.perf_counter() - start
+        events.append(event)
+
+    types = [event["type"] for event in events]
+    assert types[0] == "reasoning" and types[-1] == "done"
+    assert "answer" in types and types.index("answer") > types.index("reasoning")
+    result = events[-1]["result"]
+    assert result["response"] == "".join(event["text"] for event in events if event["type"] == "answer")
+    # First token after one token delay, not after two full generations
+    assert first_event_seconds < 10 * TOKEN_DELAY
+    assert result["timing"]["first_token_seconds"] < result["timing"]["first_answer_token_seconds"]
+    assert ollama_client.closed == ollama_client.calls == 2
+    print(f"✅ First token after {first_event_seconds * 1000:.0f}ms, full run {result['timing']['total_seconds']}s")
+
+    print("2. Checking generate_with_react returns the streamed result...")
+    collected = await wrapper.generate_with_react("How do I write a function?", use_examples=False)
+    assert collected["response"] == result["response"] and collected["iterations"] == 1
+    print("✅ Non-streaming call matches the stream")
+
+    print("3. Falling back to Groq before the first token...")
+    groq_client = FakeGroqClient(words=["Groq", " says", " hi"], token_delay=TOKEN_DELAY)
+    fallback_wrapper = make_wrapper(vector_store, streaming_ollama(fail=True), groq_client)
+    collected = await fallback_wrapper.generate_with_react("Hello", use_examples=False)
+    assert collected["response"] == "Groq says hi"
+    # Ollama's breaker opens after the first generation's retries, so the second goes straight to Groq
+    assert fallback_wrapper.ollama_async_client.calls == fallback_wrapper.max_retries
+    assert groq_client.streams and all(stream.closed for stream in groq_client.streams)
+    print("✅ Groq fallback streamed after Ollama retries")
+
+    print("4. Honoring cancellation...")
+    # Consumer stops iterating
+    ollama_client = streaming_ollama()
+    wrapper = make_wrapper(vector_store, ollama_client)
+    stream = wrapper.stream_with_react("Hello", use_examples=False)
+    for _ in range(3):
+        await stream.__anext__()
+    await stream.aclose()
+    assert ollama_client.calls == 1 and ollama_client.closed == 1
+
+    # Consuming task is cancelled (client disconnected)
+    ollama_client = streaming_ollama()
+    wrapper = make_wrapper(vector_store, ollama_client)
+
+    async def consume():
+        async for _ in wrapper.stream_with_react("Hello", use_examples=False):
+            pass
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(4 * TOKEN_DELAY)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    assert ollama_client.calls == 1 and ollama_client.closed == 1
+
+    # Cancel event set by the caller
+    ollama_client = streaming_ollama()
+    wrapper = make_wrapper(vector_store, ollama_client)
+    cancel_event = asyncio.Event()
+    received = []
+    async for event in wrapper.stream_with_react("Hello", use_examples=False, cancel_event=cancel_event):
+        received.append(event)
+        if len(received) == 2:
+            cancel_event.set()
+    assert len(received) == 2 and all(event["type"] != "done" for event in received)
+    assert ollama_client.calls == 1 and ollama_client.closed == 1
+
+    # The cancel event also interrupts a provider that has not produced its first token yet
+    ollama_client = streaming_ollama(delay=5.0)
+    wrapper = make_wrapper(vector_store, ollama_client)
+    cancel_event = asyncio.Event()
+    asyncio.get_running_loop().call_later(2 * TOKEN_DELAY, cancel_event.set)
+    start = time.perf_counter()
+    received = [event async for event in wrapper.stream_with_react("Hello", use_examples=False, cancel_event=cancel_event)]
+    cancel_seconds = time.perf_counter() - start
+    await asyncio.sleep(0)
+    assert received == [] and cancel_seconds < 1.0
+    assert ollama_client.calls == 1 and ollama_client.closed == 1
+    print(f"✅ Upstream streams closed on aclose, task cancellation and cancel event ({cancel_seconds * 1000:.0f}ms)")
+
+    print("5. Reporting a stream that fails mid-response...")
+    wrapper = make_wrapper(vector_store, streaming_ollama(fail_after=3), FakeGroqClient())
+    received = []
+    try:
+        async for token in wrapper._stream_with_fallback("Hello"):
+            received.append(token)
+        assert False, "A truncated stream should not end as if complete"
+    except ResponseTruncatedError:
+        pass
+    # The partial text came from Ollama alone; Groq does not replay a second answer after it
+    assert "".join(received) == "Final answer about" and not wrapper.groq_async_client.streams
+    print("✅ Mid-stream failure raised after the partial text")
+
+    print("\n🎉 LLM streaming tests passed!")
+
+
+def test_llm_streaming(make_wrapper):
+    asyncio.run(run_llm_streaming_tests(make_wrapper))
+
+
+if __name__ == '__main__':
+    test_llm_streaming(build_wrapper)
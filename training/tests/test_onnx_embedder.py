@@ -0,0 +1,90 @@
+"""
+Test the ONNX Runtime embedder against the reference SentenceTransformer
+Bounds the cosine drift introduced by ONNX export and int8 quantization
+"""
+
+import sys
+import time
+sys.path.append('lib')
+
+import numpy as np
+import pytest
+
+from memory.embedder_registry import EmbedderRegistry
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Minimum cosine similarity between reference and ONNX embeddings of the same text
+FLOAT32_MIN_COSINE = 0.9999
+INT8_MIN_COSINE = 0.98
+
+SENTENCES = [
+    "How do I sort a list of numbers in Python?",
+    "TypeError: 'NoneType' object is not subscriptable",
+    "The indemnification clause survives termination of this agreement.",
+    "Write a short poem about the ocean at night.",
+    "What is the capital of France?",
+    "Explain the difference between a process and a thread.",
+    "ConnectionRefusedError: [Errno 111] Connection refused",
+    "Summarize the key obligations of the licensee under section 4.2.",
+    "Refactor this function to avoid the nested loops.",
+    "ok",
+    " ".join(["A very long input that will be truncated by the tokenizer."] * 60)
+]
+
+
+def _min_cosine(reference: np.ndarray, candidate: np.ndarray) -> float:
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    candidate = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    return float((reference * candidate).sum(axis=1).min())
+
+
+def test_onnx_embedder():
+    print("🧪 Testing ONNX embedder parity...")
+
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("sentence_transformers")
+
+    print("1. Encoding with the reference SentenceTransformer...")
+    reference_registry = EmbedderRegistry()
+    reference_model = reference_registry.get(MODEL_NAME)
+    start = time.perf_counter()
+    reference = reference_model.encode(SENTENCES, batch_size=8)
+    reference_seconds = time.perf_counter() - start
+    print(f"✅ Reference embeddings in {reference_seconds * 1000:.1f}ms")
+
+    print("2. Checking float32 ONNX parity...")
+    float_registry = EmbedderRegistry(onnx_options={"quantize": False, "intra_op_threads": 2})
+    float_model = float_registry.get(f"onnx:{MODEL_NAME}")
+    assert float_model.get_sentence_embedding_dimension() == reference.shape[1]
+    float_cosine = _min_cosine(reference, float_model.encode(SENTENCES, batch_size=8))
+    assert float_cosine >= FLOAT32_MIN_COSINE, f"float32 drift too large: {float_cosine}"
+    print(f"✅ float32 minimum cosine {float_cosine:.6f}")
+
+    print("3. Checking int8 ONNX parity...")
+    int8_registry = EmbedderRegistry(onnx_options={"quantize": True, "intra_op_threads": 2})
+    int8_model = int8_registry.get(f"onnx:{MODEL_NAME}")
+    start = time.perf_counter()
+    int8_embeddings = int8_model.encode(SENTENCES, batch_size=8)
+    int8_seconds = time.perf_counter() - start
+    int8_cosine = _min_cosine(reference, int8_embeddings)
+    assert int8_cosine >= INT8_MIN_COSINE, f"int8 drift too large: {int8_cosine}"
+    print(f"✅ int8 minimum cosine {int8_cosine:.6f} ({int8_seconds * 1000:.1f}ms)")
+
+    print("4. Checking input order, single-string encode and warm-up...")
+    single = int8_model.encode(SENTENCES[3])
+    assert single.ndim == 1
+    assert np.allclose(single, int8_embeddings[3], atol=1e-5)
+    config = int8_registry.get_stats()["runtime_configs"][f"onnx:{MODEL_NAME}"]
+    assert config["quantized"] and config["intra_op_threads"] == 2
+    assert config["warm_up_seconds"] > 0
+    print(f"✅ Runtime config: {config}")
+
+    print("\n🎉 ONNX embedder tests passed!")
+
+
+if __name__ == '__main__':
+    try:
+        test_onnx_embedder()
+    except pytest.skip.Exception as e:
+        print(f"⚠️ Skipping ONNX parity test: {e}")
@@ -0,0 +1,104 @@
+"""
+Test provider circuit breakers and hedged requests in FreeLLMWrapper
+Provider clients are replaced with scripted fakes, so no Ollama server or Groq key is needed
+"""
+
+import asyncio
+import sys
+import time
+sys.path.append('lib')
+
+from memory.vector_store import FreeVectorStore
+from llm.provider_health import ProviderHealth
+from conftest import FakeGroqClient, FakeOllamaClient, build_wrapper
+
+
+def scripted_ollama(delay: float = 0.02, fail: bool = False):
+    """Ollama stand-in whose delay and availability can be changed between calls"""
+    return FakeOllamaClient(words=["from", " ollama"], delay=delay, fail=fail)
+
+
+def health_wrapper(make_wrapper, vector_store, ollama_client, provider_health=None, hedge_requests=False):
+    return make_wrapper(
+        vector_store,
+        ollama_client,
+        FakeGroqClient(delay=0.05),
+        retry_delay=0.1,
+        provider_health=provider_health,
+        hedge_requests=hedge_requests
+    )
+
+
+async def run_provider_health_tests(make_wrapper):
+    print("🧪 Testing provider circuit breakers and hedging...")
+
+    vector_store = FreeVectorStore(collection_name='provider_health_test', backend="numpy")
+
+    print("1. Skipping a failing provider once its breaker opens...")
+    ollama_client = scripted_ollama(fail=True)
+    wrapper = health_wrapper(make_wrapper, vector_store, ollama_client, ProviderHealth(reset_timeout=0.3))
+    start = time.perf_counter()
+    assert await wrapper._generate_with_fallback("first") == "from groq"
+    first_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    assert await wrapper._generate_with_fallback("second") == "from groq"
+    second_seconds = time.perf_counter() - start
+    assert ollama_client.calls == wrapper.max_retries
+    assert second_seconds < first_seconds / 2, (first_seconds, second_seconds)
+    breaker = wrapper.get_system_stats()["llm_wrapper"]["provider_health"]["ollama/llama3.1:8b"]["breaker"]
+    assert breaker["state"] == "open" and breaker["rejected"] == 1
+    print(f"✅ Fallback took {first_seconds:.2f}s with retries, {second_seconds:.2f}s with the breaker open")
+
+    print("2. Closing the breaker after a successful probe...")
+    ollama_client.fail = False
+    await asyncio.sleep(0.35)
+    assert await wrapper._generate_with_fallback("third") == "from ollama"
+    assert wrapper.provider_health.breaker("ollama", "llama3.1:8b").state == "closed"
+    print("✅ Probe succeeded and closed the breaker")
+
+    print("3. Hedging a slow non-streaming request...")
+    ollama_client = scripted_ollama(delay=0.02)
+    health = ProviderHealth(hedge_min_samples=5)
+    wrapper = health_wrapper(make_wrapper, vector_store, ollama_client, health, hedge_requests=True)
+    for i in range(5):
+        assert await wrapper._generate_with_fallback(f"warm-up {i}") == "from ollama"
+    assert wrapper.groq_async_client.calls == 0
+
+    ollama_client.delay = 2.0
+    start = time.perf_counter()
+    response = await wrapper._generate_with_fallback("slow one")
+    elapsed = time.perf_counter() - start
+    assert response == "from groq" and elapsed < 0.5, elapsed
+    assert ollama_client.cancelled == 1
+    hedges = health.get_stats()["ollama/llama3.1:8b"]["hedges"]
+    assert hedges["fired"] == 1 and hedges["hedge_wins"] == 1 and hedges["hedge_win_rate"] == 1.0
+    # The cancelled primary still counts, with the time it ran, so the budget does not shrink
+    latency = health.get_stats()["ollama/llama3.1:8b"]["response_latency"]
+    assert latency["samples"] == 6 and latency["p95_ms"] > 20
+    print(f"✅ Hedged answer in {elapsed:.2f}s instead of 2s; slow request cancelled")
+
+    print("4. Hedging a stream that is slow to its first token...")
+    ollama_client = scripted_ollama(delay=0.02)
+    wrapper = health_wrapper(make_wrapper, vector_store, ollama_client, ProviderHealth(hedge_min_samples=5), hedge_requests=True)
+    for i in range(5):
+        assert "".join([token async for token in wrapper._stream_with_fallback(f"warm-up {i}")]) == "from ollama"
+
+    ollama_client.delay = 2.0
+    start = time.perf_counter()
+    text = "".join([token async for token in wrapper._stream_with_fallback("slow stream")])
+    elapsed = time.perf_counter() - start
+    assert text == "from groq" and elapsed < 0.5, elapsed
+    assert ollama_client.closed == ollama_client.calls == 6
+    stats = wrapper.provider_health.get_stats()["ollama/llama3.1:8b"]
+    assert stats["hedges"]["hedge_wins"] == 1 and stats["first_token_latency"]["samples"] == 6
+    print(f"✅ Groq served the stream after {elapsed:.2f}s; slow Ollama stream closed")
+
+    print("\n🎉 Provider health tests passed!")
+
+
+def test_provider_health(make_wrapper):
+    asyncio.run(run_provider_health_tests(make_wrapper))
+
+
+if __name__ == '__main__':
+    test_provider_health(build_wrapper)
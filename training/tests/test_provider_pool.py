@@ -0,0 +1,152 @@
+"""
+Test pooled async provider clients in FreeLLMWrapper
+Uses a local stand-in Ollama HTTP server and scripted clients, so no model server is needed
+"""
+
+import asyncio
+import json
+import sys
+import time
+sys.path.append('lib')
+
+from memory.vector_store import FreeVectorStore
+from llm.base_wrapper import FreeLLMWrapper
+from llm.provider_pool import ProviderClientPool, ProviderLimits
+from conftest import FakeGroqClient
+
+GENERATION_SECONDS = 0.2
+
+
+async def serve_fake_ollama(connections: list):
+    """Minimal HTTP/1.1 server answering /api/generate with keep-alive, counting TCP connections"""
+
+    async def handle(reader, writer):
+        connections.append(writer.get_extra_info("peername"))
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.decode().split("\r\n"):
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                request = json.loads(await reader.readexactly(length))
+                await asyncio.sleep(GENERATION_SECONDS)
+                body = json.dumps({
+                    "model": request["model"],
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "response": f"echo: {request['prompt']}",
+                    "done": True
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+async def run_provider_pool_tests():
+    print("🧪 Testing pooled provider clients...")
+
+    connections = []
+    server = await serve_fake_ollama(connections)
+    port = server.sockets[0].getsockname()[1]
+    vector_store = FreeVectorStore(collection_name='provider_pool_test', backend="numpy")
+    wrapper = FreeLLMWrapper(
+        vector_store=vector_store,
+        ollama_host=f"http://127.0.0.1:{port}",
+        groq_api_key="",
+        retry_delay=0.0,
+        ollama_limits=ProviderLimits(max_concurrency=4)
+    )
+
+    print("1. Reusing connections across sequential calls...")
+    for i in range(3):
+        response = await wrapper._generate_with_fallback(f"hello {i}")
+        assert response == f"echo: hello {i}", response
+    assert len(connections) == 1, connections
+    print("✅ 3 requests over 1 pooled connection")
+
+    print("2. Overlapping concurrent calls without blocking the loop...")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(wrapper._generate_with_fallback(f"q{i}") for i in range(8)))
+    elapsed = time.perf_counter() - start
+    ticker_task.cancel()
+
+    assert responses == [f"echo: q{i}" for i in range(8)]
+    # 8 calls, 4 at a time: two waves rather than eight sequential generations
+    assert 2 * GENERATION_SECONDS <= elapsed < 4 * GENERATION_SECONDS, elapsed
+    assert ticks >= elapsed / 0.01 * 0.5, ticks
+    stats = wrapper.get_system_stats()["llm_wrapper"]["providers"]["ollama"]
+    assert stats["requests"] == 11 and stats["in_flight"] == 0 and stats["avg_queue_wait_ms"] > 0
+    assert len(connections) <= 4
+    print(f"✅ 8 calls in {elapsed:.2f}s with concurrency 4, loop ticked {ticks} times")
+
+    print("3. Timing out slow providers...")
+    wrapper.provider_pool.limits("ollama").request_timeout = GENERATION_SECONDS / 4
+    wrapper.provider_pool.limits("groq").request_timeout = GENERATION_SECONDS / 4
+    # Groq stand-in that never answers within the timeout
+    wrapper.groq_async_client = FakeGroqClient(delay=10)
+    start = time.perf_counter()
+    response = await wrapper._generate_with_fallback("too slow")
+    elapsed = time.perf_counter() - start
+    assert response.startswith("I apologize"), response
+    assert elapsed < wrapper.max_retries * GENERATION_SECONDS, elapsed
+    stats = wrapper.provider_pool.get_stats()
+    assert stats["ollama"]["timeouts"] == wrapper.max_retries and stats["groq"]["timeouts"] == 1
+    print(f"✅ Timed out both providers in {elapsed:.2f}s")
+
+    await wrapper.aclose()
+    server.close()
+    await server.wait_closed()
+
+    print("\n🎉 Provider pool tests passed!")
+
+
+async def contend_for_slots(pool: ProviderClientPool):
+    """Queue three callers on a one-slot provider and return this loop's clients"""
+
+    async def hold():
+        async with pool.slot("ollama"):
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(hold() for _ in range(3)))
+    assert pool.ollama_client is pool.ollama_client
+    clients = (pool.ollama_client, pool.groq_client)
+    await pool.aclose()
+    return clients
+
+
+def test_provider_pool():
+    asyncio.run(run_provider_pool_tests())
+
+
+def test_provider_pool_across_event_loops():
+    print("4. Sharing one pool between event loops...")
+    pool = ProviderClientPool(groq_api_key="test-key", ollama_limits=ProviderLimits(max_concurrency=1))
+    # Semaphores and connections bound to the first loop would fail on the second
+    first = asyncio.run(contend_for_slots(pool))
+    second = asyncio.run(contend_for_slots(pool))
+    assert first[0] is not second[0] and first[1] is not second[1]
+    stats = pool.get_stats()
+    assert stats["ollama"]["requests"] == 6 and stats["ollama"]["in_flight"] == 0 and stats["groq"]["available"]
+    print("✅ Each event loop got its own clients and semaphores")
+
+
+if __name__ == '__main__':
+    test_provider_pool()
+    test_provider_pool_across_event_loops()
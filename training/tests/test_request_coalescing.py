@@ -0,0 +1,127 @@
+"""
+Test single-flight coalescing of identical in-flight LLM requests
+Provider clients are replaced with scripted fakes, so no Ollama server or Groq key is needed
+"""
+
+import asyncio
+import sys
+sys.path.append('lib')
+
+from memory.vector_store import FreeVectorStore
+from llm.single_flight import SingleFlight
+from conftest import FakeOllamaClient, build_wrapper
+
+TOKEN_DELAY = 0.02
+
+
+def counting_wrapper(make_wrapper, vector_store):
+    """Wrapper whose Ollama stand-in takes TOKEN_DELAY per word, streamed or not"""
+    return make_wrapper(vector_store, FakeOllamaClient(token_delay=TOKEN_DELAY))
+
+
+async def collect(stream) -> str:
+    return "".join([token async for token in stream])
+
+
+async def run_request_coalescing_tests(make_wrapper):
+    print("🧪 Testing LLM request coalescing...")
+
+    vector_store = FreeVectorStore(collection_name='request_coalescing_test', backend="numpy")
+
+    print("1. Coalescing concurrent identical generations...")
+    wrapper = counting_wrapper(make_wrapper, vector_store)
+    results = await asyncio.gather(
+        *(wrapper._generate_with_fallback("Popular question") for _ in range(10)),
+        wrapper._generate_with_fallback("Other question")
+    )
+    assert set(results) == {"one two three four five"}
+    assert wrapper.ollama_async_client.calls == 2
+    stats = wrapper.get_system_stats()["llm_wrapper"]["single_flight"]
+    assert stats["executions"] == 2 and stats["coalesced"] == 9 and stats["in_flight"] == 0
+    print(f"✅ 11 requests, 2 generations (coalesced rate {stats['coalesced_rate']})")
+
+    print("2. Sharing one stream, including with late joiners...")
+    wrapper = counting_wrapper(make_wrapper, vector_store)
+
+    async def late_joiner():
+        await asyncio.sleep(TOKEN_DELAY * 2.5)
+        return await collect(wrapper._stream_with_fallback("Streamed question"))
+
+    texts = await asyncio.gather(
+        *(collect(wrapper._stream_with_fallback("Streamed question")) for _ in range(4)),
+        late_joiner()
+    )
+    assert set(texts) == {"one two three four five"}
+    assert wrapper.ollama_async_client.calls == wrapper.ollama_async_client.closed == 1
+    print("✅ 5 subscribers (one joining mid-stream) got the full text from 1 stream")
+
+    print("3. Detaching callers without disturbing the others...")
+    wrapper = counting_wrapper(make_wrapper, vector_store)
+    quitter = wrapper._stream_with_fallback("Shared stream")
+    stayer = asyncio.create_task(collect(wrapper._stream_with_fallback("Shared stream")))
+    await quitter.__anext__()
+    await quitter.aclose()
+    assert await stayer == "one two three four five"
+    assert wrapper.ollama_async_client.closed == 1
+
+    alone = wrapper._stream_with_fallback("Abandoned stream")
+    await alone.__anext__()
+    await alone.aclose()
+    assert wrapper.ollama_async_client.calls == wrapper.ollama_async_client.closed == 2
+
+    # A new identical stream arriving while the abandoned one shuts down starts its own generation
+    single_flight = SingleFlight()
+
+    async def words():
+        for word in ["one", " two", " three"]:
+            await asyncio.sleep(TOKEN_DELAY)
+            yield word
+
+    dying = single_flight.stream("key", words)
+    await dying.__anext__()
+    closing = asyncio.create_task(dying.aclose())
+    await asyncio.sleep(0)
+    assert await collect(single_flight.stream("key", words)) == "one two three"
+    await closing
+
+    first = asyncio.create_task(wrapper._generate_with_fallback("Shared call"))
+    second = asyncio.create_task(wrapper._generate_with_fallback("Shared call"))
+    await asyncio.sleep(TOKEN_DELAY)
+    first.cancel()
+    assert await second == "one two three four five" and wrapper.ollama_async_client.cancelled == 0
+
+    only = asyncio.create_task(wrapper._generate_with_fallback("Abandoned call"))
+    await asyncio.sleep(TOKEN_DELAY)
+    only.cancel()
+    await asyncio.gather(only, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert wrapper.ollama_async_client.cancelled == 1
+
+    # Likewise for a call whose only caller was just cancelled
+    dying = asyncio.create_task(wrapper._generate_with_fallback("Restarted call"))
+    await asyncio.sleep(TOKEN_DELAY)
+    dying.cancel()
+    await asyncio.sleep(0)
+    assert await wrapper._generate_with_fallback("Restarted call") == "one two three four five"
+    assert wrapper.single_flight.get_stats()["abandoned"] == 3
+    print("✅ Generations stop only when their last caller leaves")
+
+    print("4. Coalescing concurrent ReAct runs...")
+    wrapper = counting_wrapper(make_wrapper, vector_store)
+    results = await asyncio.gather(
+        *(wrapper.generate_with_react("What is Python?", use_examples=False) for _ in range(4))
+    )
+    assert len({result["response"] for result in results}) == 1
+    # One reasoning and one synthesis generation serve all four conversations
+    assert wrapper.ollama_async_client.calls == 2
+    print("✅ 4 concurrent conversations, 2 generations")
+
+    print("\n🎉 Request coalescing tests passed!")
+
+
+def test_request_coalescing(make_wrapper):
+    asyncio.run(run_request_coalescing_tests(make_wrapper))
+
+
+if __name__ == '__main__':
+    test_request_coalescing(build_wrapper)
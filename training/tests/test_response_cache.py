@@ -0,0 +1,150 @@
+"""
+Test the exact-match and semantic LLM response cache
+Provider clients are replaced with scripted fakes, so no Ollama server or Groq key is needed
+"""
+
+import asyncio
+import hashlib
+import re
+import sys
+import tempfile
+import time
+sys.path.append('lib')
+
+import numpy as np
+
+from memory.vector_store import FreeVectorStore
+from llm.response_cache import LLMResponseCache
+from conftest import FakeOllamaClient, build_wrapper
+
+GENERATION_SECONDS = 0.05
+
+
+def bag_of_words(texts):
+    """Embedding that only depends on the lowercase words, so rephrasings with the same words match"""
+    embeddings = np.zeros((len(texts), 64), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in re.findall(r"\w+", text.lower()):
+            embeddings[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % 64] += 1.0
+    return embeddings
+
+
+def answer_words(call):
+    """Each generation answers differently, so a cache hit is visible in the text"""
+    return ["answer", f" #{call}"]
+
+
+def counting_wrapper(make_wrapper, vector_store, response_cache=None):
+    ollama_client = FakeOllamaClient(words=answer_words, token_delay=GENERATION_SECONDS / 2)
+    return make_wrapper(vector_store, ollama_client, response_cache=response_cache)
+
+
+async def run_response_cache_tests(make_wrapper):
+    print("🧪 Testing LLM response cache...")
+
+    vector_store = FreeVectorStore(collection_name='response_cache_test', backend="numpy")
+
+    print("1. Serving exact repeats from the cache...")
+    # Caching is opt-in
+    wrapper = counting_wrapper(make_wrapper, vector_store)
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.0)
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.0)
+    assert wrapper.ollama_async_client.calls == 2
+
+    wrapper = counting_wrapper(make_wrapper, vector_store, LLMResponseCache())
+    first = await wrapper._generate_with_fallback("Explain closures", temperature=0.0)
+    start = time.perf_counter()
+    second = await wrapper._generate_with_fallback("Explain closures", temperature=0.0)
+    hit_seconds = time.perf_counter() - start
+    assert first == second == "answer #1" and wrapper.ollama_async_client.calls == 1
+    assert hit_seconds < GENERATION_SECONDS
+
+    # Sampled requests are regenerated every time, and a different mode is a different request
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.7)
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.7)
+    await wrapper._generate_with_fallback("Explain closures", agent_mode="code", temperature=0.0)
+    assert wrapper.ollama_async_client.calls == 4
+    stats = wrapper.get_system_stats()["llm_wrapper"]["response_cache"]
+    assert stats["exact_hits"] == 1 and stats["misses"] == 2 and stats["memory_entries"] == 2
+    assert stats["saved_seconds"] >= GENERATION_SECONDS
+
+    # Caching sampled requests too still keys on the sampling params
+    wrapper = counting_wrapper(make_wrapper, vector_store, LLMResponseCache(max_temperature=None))
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.3)
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.3)
+    await wrapper._generate_with_fallback("Explain closures", temperature=0.7)
+    assert wrapper.ollama_async_client.calls == 2
+    print(f"✅ Exact hit in {hit_seconds * 1000:.1f}ms, saved {stats['saved_seconds']}s")
+
+    print("2. Matching near-identical questions semantically...")
+    cache = LLMResponseCache(semantic_threshold=0.95, embedder=bag_of_words, max_temperature=None)
+    wrapper = counting_wrapper(make_wrapper, vector_store, cache)
+    template = "Examples: none\nQuestion: {}\nAnswer:"
+    await wrapper._generate_with_fallback(
+        template.format("How do I reverse a list in Python?"), question="How do I reverse a list in Python?"
+    )
+    rephrased = "how do I reverse a list in python"
+    reused = await wrapper._generate_with_fallback(template.format(rephrased), question=rephrased)
+    assert reused == "answer #1" and cache.semantic_hits == 1
+
+    # A different question, or the same question in a different prompt, is not reused
+    other = "What is the capital of France?"
+    await wrapper._generate_with_fallback(template.format(other), question=other)
+    await wrapper._generate_with_fallback(
+        "Examples: sorting\nQuestion: how do I reverse a list in python\nAnswer:", question=rephrased
+    )
+    assert wrapper.ollama_async_client.calls == 3 and cache.semantic_hits == 1
+    print("✅ Rephrased question reused the response; other questions and prompts did not")
+
+    print("3. Expiring entries and honoring per-mode opt-out...")
+    cache = LLMResponseCache(ttl_seconds=0.05, disabled_modes=["creative"], max_temperature=None)
+    wrapper = counting_wrapper(make_wrapper, vector_store, cache)
+    await wrapper._generate_with_fallback("Write a poem", agent_mode="creative")
+    await wrapper._generate_with_fallback("Write a poem", agent_mode="creative")
+    assert wrapper.ollama_async_client.calls == 2 and cache.get_stats()["memory_entries"] == 0
+    await wrapper._generate_with_fallback("Define recursion")
+    await asyncio.sleep(0.1)
+    await wrapper._generate_with_fallback("Define recursion")
+    assert wrapper.ollama_async_client.calls == 4 and cache.expirations == 1
+    print("✅ Expired and opted-out requests were regenerated")
+
+    print("4. Persisting responses to disk...")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir=cache_dir, semantic_threshold=0.95, embedder=bag_of_words, max_temperature=None)
+        wrapper = counting_wrapper(make_wrapper, vector_store, cache)
+        question = "What is a Python decorator?"
+        await wrapper._generate_with_fallback(template.format(question), question=question)
+        cache.close()
+
+        reopened = LLMResponseCache(
+            cache_dir=cache_dir, semantic_threshold=0.95, embedder=bag_of_words, max_temperature=None
+        )
+        wrapper = counting_wrapper(make_wrapper, vector_store, reopened)
+        assert await wrapper._generate_with_fallback(template.format(question), question=question) == "answer #1"
+        rephrased = "what is a python decorator"
+        assert await wrapper._generate_with_fallback(template.format(rephrased), question=rephrased) == "answer #1"
+        stats = reopened.get_stats()
+        assert wrapper.ollama_async_client.calls == 0 and stats["disk_entries"] == 1
+        assert stats["exact_hits"] == 1 and stats["semantic_hits"] == 1
+        reopened.close()
+    print("✅ Exact and semantic hits served after reopening the cache")
+
+    print("5. Replaying cached answers through the token stream...")
+    wrapper = counting_wrapper(make_wrapper, vector_store, LLMResponseCache())
+    first = [token async for token in wrapper._stream_with_fallback("Explain generators", temperature=0.0)]
+    start = time.perf_counter()
+    second = [token async for token in wrapper._stream_with_fallback("Explain generators", temperature=0.0)]
+    replay_seconds = time.perf_counter() - start
+    assert wrapper.ollama_async_client.calls == 1
+    assert second == ["".join(first)] and replay_seconds < GENERATION_SECONDS
+    print(f"✅ Cached stream replayed whole in {replay_seconds * 1000:.1f}ms")
+
+    print("\n🎉 Response cache tests passed!")
+
+
+def test_response_cache(make_wrapper):
+    asyncio.run(run_response_cache_tests(make_wrapper))
+
+
+if __name__ == '__main__':
+    test_response_cache(build_wrapper)
@@ -0,0 +1,866 @@
+"""
+Test script for FreeVectorStore
+Tests bulk ingestion, search, embedding caching, statistics, export, and backends
+"""
+
+import asyncio
+import csv
+import gc
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta
+sys.path.append('lib')
+
+import numpy as np
+
+from memory.vector_store import FreeVectorStore
+from memory.embedding_cache import EmbeddingCache
+from memory.embedder_registry import EmbedderRegistry
+from memory.async_vector_store import AsyncFreeVectorStore, get_async_vector_store
+from memory.retention import RetentionManager, RetentionPolicy
+from memory.partitioned_store import PartitionedVectorStore
+from memory.reindex import ReindexJob
+from memory.chunking import TextChunker
+from memory.query_cache import QueryResultCache
+from memory.embedding_projection import EmbeddingProjection
+
+
+texts = [f"Example {i}: how do I sort a list of {i} numbers in Python?" for i in range(50)]
+metadatas = [{"mode": "code_companion" if i % 2 else "smart_assistant"} for i in range(50)]
+
+
+def make_store(collection_name):
+    """Fresh store holding the 50 shared examples under the IDs ex_0 ... ex_49"""
+    store = FreeVectorStore(collection_name=collection_name)
+    store.clear_collection()
+    store.add_examples(texts, metadatas=metadatas, ids=[f"ex_{i}" for i in range(50)])
+    return store
+
+
+def test_bulk_ingestion():
+    print("1. Testing bulk ingestion...")
+    vector_store = FreeVectorStore(collection_name='vector_store_test')
+    vector_store.clear_collection()
+    custom_ids = [f"bulk_{i}" if i < 10 else None for i in range(50)]
+
+    result = vector_store.add_examples(texts, metadatas=metadatas, ids=custom_ids, batch_size=16)
+    assert result["added"] == 50
+    assert result["ids"][:10] == [f"bulk_{i}" for i in range(10)]
+    assert len(set(result["ids"])) == 50
+    # Re-adding existing IDs stores nothing new
+    assert vector_store.add_examples(texts[:3], ids=["bulk_0", "bulk_1", "bulk_2"])["added"] == 0
+    print(f"✅ Added {result['added']} examples ({result['examples_per_second']} examples/s)")
+
+    stored = vector_store.get_example_by_id("bulk_3")
+    assert stored is not None and stored["text"] == texts[3]
+    assert stored["metadata"]["embedder_model"] == vector_store.embedder_model
+    print("✅ Bulk examples retrievable by ID")
+
+
+def test_similarity_search():
+    print("2. Testing similarity search...")
+    vector_store = make_store('search_test')
+    results = vector_store.search_similar(texts[7], n_results=3, where={"mode": "code_companion"})
+    assert results and results[0]["id"] == "ex_7"
+    print(f"✅ Found {len(results)} similar examples")
+
+    batch_results = vector_store.search_many([texts[7], texts[8], texts[7]], n_results=3)
+    assert len(batch_results) == 3
+    assert batch_results[0][0]["id"] == "ex_7"
+    assert batch_results[1][0]["id"] == "ex_8"
+    assert [r["id"] for r in batch_results[0]] == [r["id"] for r in batch_results[2]]
+    print("✅ Batched multi-query search matches single-query search")
+
+
+def test_collection_stats():
+    print("3. Testing collection statistics...")
+    stats = make_store('stats_test').get_collection_stats()
+    assert stats["total_examples"] == 50
+    assert stats["examples_by_mode"] == {"code_companion": 25, "smart_assistant": 25}
+    print(f"✅ Collection stats: {stats['total_examples']} examples")
+
+
+def test_embedding_cache():
+    print("4. Testing embedding cache...")
+    vector_store = make_store('embedding_cache_test')
+    misses_before = vector_store.embedding_cache.misses
+    vector_store.search_similar("  how do I reverse a string?  ", n_results=1)
+    vector_store.search_similar("how do I reverse   a string?", n_results=1)
+    cache_stats = vector_store.embedding_cache.get_stats()
+    assert vector_store.embedding_cache.misses == misses_before + 1
+    assert cache_stats["memory_hits"] >= 1
+    print(f"✅ Embedding cache hit rate: {cache_stats['hit_rate']}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        disk_cache = EmbeddingCache(max_entries=2, cache_dir=cache_dir)
+        disk_cache.encode("model", ["a", "b", "c", "a"], vector_store.embedder.encode)
+        assert disk_cache.misses == 3
+        assert disk_cache.get_stats()["memory_entries"] == 2
+        disk_cache.close()
+
+        reopened = EmbeddingCache(cache_dir=cache_dir)
+        assert reopened.get("model", "a") is not None
+        assert reopened.disk_hits == 1
+        reopened.close()
+    print("✅ Persistent embedding cache survives restarts")
+
+
+def test_embedder_registry():
+    print("5. Testing shared embedder registry...")
+    registry = EmbedderRegistry()
+    store_a = FreeVectorStore(collection_name='registry_test_a', embedder_registry=registry)
+    store_b = FreeVectorStore(collection_name='registry_test_b', embedder_registry=registry)
+    assert not registry.is_loaded(store_a.embedder_model)
+    assert store_a.embedder is store_b.embedder
+    assert registry.unload() == [store_a.embedder_model]
+    assert registry.warm_up([store_a.embedder_model])[store_a.embedder_model] >= 0
+    print(f"✅ Embedder shared across stores: {registry.get_stats()['loaded_models']}")
+
+
+def test_incremental_stats():
+    print("6. Testing incremental collection statistics...")
+    vector_store = make_store('incremental_stats_test')
+    vector_store.add_example("Draft a licensing clause", metadata={"mode": "legal_assistant", "quality_score": 4.0})
+    vector_store.add_example("Draft a licensing clause", metadata={"mode": "legal_assistant"}, custom_id="ex_0")
+    vector_store.update_example("ex_1", metadata={"mode": "legal_assistant", "quality_score": 2.0})
+    vector_store.delete_example("ex_2")
+    vector_store.delete_example("missing_id")
+    incremental = vector_store.get_collection_stats()
+    reconciled = vector_store.reconcile_stats()
+    assert incremental["total_examples"] == reconciled["total_examples"] == 50
+    assert incremental["examples_by_mode"] == reconciled["examples_by_mode"]
+    assert incremental["average_quality_score"] == reconciled["average_quality_score"] == 3.0
+    print(f"✅ Incremental stats match full recount: {incremental['examples_by_mode']}")
+
+
+def test_streaming_export():
+    print("7. Testing streaming export...")
+    vector_store = make_store('export_test')
+    vector_store.add_example('Text with "quotes", commas\nand newlines', metadata={"mode": "creative_writer"})
+    with tempfile.TemporaryDirectory() as export_dir:
+        jsonl_path = os.path.join(export_dir, "examples.jsonl")
+        export = vector_store.export_to_file(jsonl_path, page_size=7, include_embeddings=True)
+        assert export["exported"] == 51 and export["pages"] == 8
+        with open(jsonl_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert [r["embedding_row"] for r in records] == list(range(51))
+
+        embeddings = np.fromfile(export["embeddings_path"], dtype=np.float32)
+        embeddings = embeddings.reshape(-1, export["embedding_dimension"])
+        assert embeddings.shape[0] == 51
+
+        csv_path = os.path.join(export_dir, "examples.csv")
+        vector_store.export_to_file(csv_path, format="csv", page_size=7)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 51
+        assert any(row["text"] == 'Text with "quotes", commas\nand newlines' for row in rows)
+    print(f"✅ Streamed {export['exported']} examples in {export['pages']} pages")
+
+
+def test_numpy_backend():
+    print("8. Testing NumPy backend...")
+    with tempfile.TemporaryDirectory() as backend_dir:
+        numpy_store = FreeVectorStore(
+            collection_name='numpy_backend_test',
+            persist_directory=backend_dir,
+            backend="numpy",
+            backend_options={"ann_threshold": 40, "nprobe": 4}
+        )
+        numpy_store.add_examples(texts, metadatas=metadatas)
+        numpy_results = numpy_store.search_similar(texts[5], n_results=3, where={"mode": "code_companion"})
+        assert numpy_results[0]["text"] == texts[5]
+        assert abs(numpy_results[0]["similarity_score"] - 1.0) < 1e-4
+        assert all(r["metadata"]["mode"] == "code_companion" for r in numpy_results)
+        numpy_store.persist()
+
+        reopened_store = FreeVectorStore(
+            collection_name='numpy_backend_test',
+            persist_directory=backend_dir,
+            backend="numpy",
+            backend_options={"quantization": "int8"}
+        )
+        reopened_stats = reopened_store.get_collection_stats()
+        assert reopened_stats["total_examples"] == 50
+        assert reopened_stats["index"]["quantization"] == "int8"
+        assert reopened_store.search_similar(texts[5], n_results=1)[0]["text"] == texts[5]
+
+        # Growing a mapped collection keeps the full-precision matrix on disk rather than in RAM
+        reopened_store.add_example("An example added after reopening", custom_id="np_new")
+        assert reopened_store.get_collection_stats()["index"]["memory_mapped"]
+        assert reopened_store.search_similar("An example added after reopening", n_results=1)[0]["id"] == "np_new"
+    print("✅ NumPy backend search, filters, quantized rerank and persistence working")
+
+
+def test_async_facade():
+    print("9. Testing async vector store facade...")
+    vector_store = make_store('async_test')
+
+    async def run_concurrent_searches():
+        async with AsyncFreeVectorStore(vector_store, batch_window=0.05) as async_store:
+            searches = [
+                async_store.search_similar(texts[i], n_results=2, where={"mode": "code_companion"} if i % 2 else None)
+                for i in range(10, 20)
+            ]
+            cancelled = asyncio.ensure_future(async_store.search_similar("cancel me"))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            results = await asyncio.gather(*searches)
+            return results, async_store.get_batching_stats()
+
+    async_results, batching_stats = asyncio.run(run_concurrent_searches())
+    assert [r[0]["id"] for r in async_results] == [f"ex_{i}" for i in range(10, 20)]
+    assert batching_stats["batches_flushed"] == 1 and batching_stats["searches_batched"] == 10
+    assert batching_stats["searches_cancelled"] == 1
+
+    # The shared facade batches per event loop and is freed along with its store
+    scratch_store = FreeVectorStore(collection_name='async_facade_test', backend="numpy")
+    scratch_store.add_examples(texts[:5], ids=[f"af_{i}" for i in range(5)])
+    shared = get_async_vector_store(scratch_store)
+    assert get_async_vector_store(scratch_store) is shared
+    for _ in range(2):
+        loop_results = asyncio.run(asyncio.wait_for(shared.search_similar(texts[3], n_results=1), timeout=5))
+        assert loop_results[0]["id"] == "af_3"
+    assert shared.get_batching_stats()["pending"] == 0
+    facade_ref = weakref.ref(shared)
+    del scratch_store, shared
+    gc.collect()
+    assert facade_ref() is None
+    print(f"✅ {batching_stats['searches_batched']} concurrent searches served in one batch")
+
+
+def test_keyword_and_hybrid_search():
+    print("10. Testing keyword and hybrid search...")
+    vector_store = make_store('keyword_test')
+    keyword_results = vector_store.search_similar("list of 17 numbers", n_results=3, mode="keyword")
+    assert keyword_results[0]["id"] == "ex_17"
+    assert keyword_results[0]["bm25_score"] > keyword_results[1]["bm25_score"]
+
+    hybrid_results = vector_store.search_similar(
+        texts[17], n_results=3, where={"mode": "code_companion"}, mode="hybrid"
+    )
+    assert hybrid_results[0]["id"] == "ex_17"
+    assert all(r["metadata"]["mode"] == "code_companion" for r in hybrid_results)
+
+    # A selective metadata filter still finds matches ranked far below the first BM25 hits
+    filtered_store = FreeVectorStore(collection_name='keyword_filter_test', backend="numpy")
+    filtered_store.add_examples(
+        [f"sort numbers in python, example {i}" for i in range(40)] + ["sort a legal contract"],
+        metadatas=[{"mode": "code_companion"}] * 40 + [{"mode": "legal_assistant"}],
+        ids=[f"kf_{i}" for i in range(41)]
+    )
+    for search_mode in ("keyword", "hybrid"):
+        filtered = filtered_store.search_similar(
+            "sort numbers", n_results=2, where={"mode": "legal_assistant"}, mode=search_mode
+        )
+        assert [r["id"] for r in filtered] == ["kf_40"], (search_mode, filtered)
+
+    # Document filters served from the index must match the backend's own evaluation
+    query_embedding = vector_store._encode([texts[21]])[0]
+    for where_document in ({"$contains": "of 2"}, {"$contains": "Example 3"}, {"$not_contains": "1"}):
+        indexed = vector_store.search_similar(texts[21], n_results=5, where_document=where_document)
+        scanned = vector_store.collection.query(
+            query_embeddings=[query_embedding.tolist()], n_results=5, where_document=where_document
+        )
+        assert [r["id"] for r in indexed] == scanned["ids"][0]
+    assert vector_store.get_collection_stats()["lexical_index"]["built"]
+    print("✅ Keyword, hybrid and indexed document-filter search working")
+
+
+def test_retention_policy():
+    print("11. Testing retention policy...")
+    with tempfile.TemporaryDirectory() as retention_dir:
+        retention_store = FreeVectorStore(
+            collection_name='retention_test',
+            persist_directory=retention_dir,
+            backend="numpy"
+        )
+        retention_store.add_examples(
+            texts[:30],
+            metadatas=[
+                {"mode": "code_companion" if i % 3 else "smart_assistant", "quality_score": 1.0 if i < 5 else None}
+                for i in range(30)
+            ],
+            ids=[f"keep_{i}" for i in range(30)]
+        )
+        manager = RetentionManager(retention_store, RetentionPolicy(
+            max_examples_per_mode={"code_companion": 10},
+            min_quality_score=2.0,
+            batch_size=4
+        ))
+
+        preview = manager.run(dry_run=True)
+        assert preview.evicted_by_reason == {"low_quality": 5, "over_capacity": 7}
+        assert retention_store.collection.count() == 30
+
+        applied = manager.run()
+        assert applied.evicted == 12 and applied.batches == 3
+        assert set(applied.evicted_ids) == set(preview.evicted_ids)
+        assert applied.compaction["capacity_after"] == 18
+        retention_stats = retention_store.get_collection_stats()
+        assert retention_stats["total_examples"] == 18
+        assert retention_stats["examples_by_mode"]["code_companion"] == 10
+        assert retention_store.get_example_by_id("keep_0") is None
+
+        stale = manager.plan(now=datetime.now() + timedelta(days=30))
+        assert not stale
+        manager.policy.max_age_days = 7
+        stale = manager.plan(now=datetime.now() + timedelta(days=30))
+        assert len(stale) == 18 and all(reason == "stale" for _, _, reason in stale)
+    print(f"✅ Retention evicted {applied.evicted} examples in {applied.batches} batches and compacted")
+
+
+def test_partitioned_store():
+    print("12. Testing partitioned vector store...")
+    partitioned_store = PartitionedVectorStore(collection_name='partition_test', backend="numpy")
+    partition_modes = ["code_companion" if i % 5 else "legal_assistant" for i in range(30)]
+    partitioned = partitioned_store.add_examples(
+        texts[:30],
+        metadatas=[{"mode": mode} for mode in partition_modes],
+        ids=[f"part_{i}" for i in range(30)]
+    )
+    assert partitioned["partitions"] == {"code_companion": 24, "legal_assistant": 6}
+    assert set(partitioned_store.partitions) == {"general", "code_companion", "legal_assistant"}
+
+    routed = partitioned_store.search_similar(texts[5], n_results=3, where={"mode": "legal_assistant"})
+    assert routed[0]["id"] == "part_5"
+    assert all(r["metadata"]["mode"] == "legal_assistant" for r in routed)
+    merged = partitioned_store.search_similar(texts[7], n_results=5)
+    assert merged[0]["id"] == "part_7"
+    assert [r["distance"] for r in merged] == sorted(r["distance"] for r in merged)
+
+    with_fallback = partitioned_store.search_with_fallback(texts[5], "legal_assistant", n_results=8, min_mode_results=7)
+    assert [r["metadata"]["mode"] for r in with_fallback[:6]] == ["legal_assistant"] * 6
+    assert len(with_fallback) == 8 and len({r["id"] for r in with_fallback}) == 8
+    assert partitioned_store.search_with_fallback(texts[5], "legal_assistant", n_results=8) == \
+        partitioned_store.search_similar(texts[5], n_results=8, where={"mode": "legal_assistant"})
+
+    assert partitioned_store.update_example("part_5", metadata={"mode": "code_companion"})
+    assert partitioned_store.get_collection_stats()["partitions"]["legal_assistant"] == 5
+    assert partitioned_store.get_example_by_id("part_5")["metadata"]["mode"] == "code_companion"
+    partition_count = len(partitioned_store.partitions)
+    partitioned_store.close()
+
+    # Leftover staging collections are not mistaken for partitions
+    with tempfile.TemporaryDirectory() as partition_dir:
+        persisted = PartitionedVectorStore(collection_name='discovery', backend="numpy", persist_directory=partition_dir)
+        persisted.add_example(texts[0], metadata={"mode": "code_companion"})
+        leftover = persisted.partitions["code_companion"]._create_staging_collection("bulk")
+        leftover.add(ids=["x"], embeddings=[[0.0] * 4], documents=["x"], metadatas=[None])
+        persisted.partitions["code_companion"].chroma_client.persist()
+        persisted.close()
+        reopened = PartitionedVectorStore(collection_name='discovery', backend="numpy", persist_directory=partition_dir)
+        assert set(reopened.partitions) == {"general", "code_companion"}
+        reopened.close()
+
+    # The unpartitioned store runs the mode and fallback lookups together
+    fallback_store = FreeVectorStore(collection_name='fallback_test', backend="numpy")
+    fallback_store.add_examples(
+        texts[:10],
+        metadatas=[{"mode": "legal_assistant" if i < 2 else "code_companion"} for i in range(10)],
+        ids=[f"fb_{i}" for i in range(10)]
+    )
+    topped_up = fallback_store.search_with_fallback(texts[5], "legal_assistant", n_results=5)
+    assert [r["metadata"]["mode"] for r in topped_up[:2]] == ["legal_assistant"] * 2
+    assert len(topped_up) == 5 and len({r["id"] for r in topped_up}) == 5
+    assert fallback_store.search_with_fallback(texts[5], "code_companion", n_results=5) == \
+        fallback_store.search_similar(texts[5], n_results=5, where={"mode": "code_companion"})
+    # Every store shares one small pool for the fallback lookups
+    pool_stores = [FreeVectorStore(collection_name=f'fallback_pool_{i}', backend="numpy") for i in range(10)]
+    for store in pool_stores:
+        store.search_with_fallback(texts[0], "unknown_mode")
+    assert sum(thread.name.startswith("fallback-query") for thread in threading.enumerate()) <= 4
+    print(f"✅ Partitioned search routed, fanned out and merged across {partition_count} partitions")
+
+
+def test_partitioned_merge_consistency():
+    print("12b. Testing partitioned merge against an unpartitioned store...")
+    modes = ["code_companion", "legal_assistant", "creative_writer"]
+    merge_metadatas = [{"mode": modes[i % 3], "quality_score": float(i % 5)} for i in range(45)]
+    merge_ids = [f"merge_{i}" for i in range(45)]
+    single = FreeVectorStore(collection_name='merge_single', backend="numpy")
+    single.clear_collection()
+    single.add_examples(texts[:45], metadatas=merge_metadatas, ids=merge_ids)
+    partitioned = PartitionedVectorStore(collection_name='merge_partitioned', backend="numpy")
+    partitioned.clear_collection()
+    partitioned.add_examples(texts[:45], metadatas=merge_metadatas, ids=merge_ids)
+    assert partitioned.get_collection_stats()["partitions"] == {
+        "general": 0, "code_companion": 15, "legal_assistant": 15, "creative_writer": 15
+    }
+
+    def ranking(results):
+        return [(r["id"], round(r["distance"], 5)) for r in results]
+
+    queries = [texts[3], texts[31], "How do I sort numbers?"]
+    for where in (None, {"quality_score": {"$gte": 2.0}}, {"mode": "legal_assistant"}):
+        # Fanned-out top-k lists merge to exactly the global top-k
+        expected = single.search_many(queries, n_results=10, where=where)
+        assert [ranking(r) for r in partitioned.search_many(queries, n_results=10, where=where)] == \
+            [ranking(r) for r in expected]
+    assert ranking(partitioned.search_with_fallback(texts[3], None, n_results=7)) == \
+        ranking(single.search_similar(texts[3], n_results=7))
+    # Asking for more results than one partition holds still returns the global top-k
+    assert ranking(partitioned.search_similar(texts[3], n_results=40)) == \
+        ranking(single.search_similar(texts[3], n_results=40))
+    partitioned.close()
+    print("✅ Cross-partition results match the unpartitioned store for every filter")
+
+
+def test_partition_moves():
+    print("12c. Testing moves between partitions...")
+    store = PartitionedVectorStore(collection_name='move_test', backend="numpy")
+    store.clear_collection()
+    store.add_examples(
+        texts[:6],
+        metadatas=[{"mode": "code_companion", "quality_score": 4.0} for _ in range(6)],
+        ids=[f"move_{i}" for i in range(6)]
+    )
+
+    # A mode change moves the example, keeping its other metadata and its text
+    assert store.update_example("move_0", metadata={"mode": "legal_assistant"})
+    moved = store.get_example_by_id("move_0")
+    assert moved["text"] == texts[0]
+    assert moved["metadata"]["mode"] == "legal_assistant" and moved["metadata"]["quality_score"] == 4.0
+    assert store.partitions["code_companion"].get_example_by_id("move_0") is None
+    assert store.search_similar(texts[0], n_results=1, where={"mode": "legal_assistant"})[0]["id"] == "move_0"
+    assert "move_0" not in [r["id"] for r in store.search_similar(texts[0], where={"mode": "code_companion"})]
+
+    # A text change together with a move re-embeds in the new partition
+    assert store.update_example("move_1", text="Drafting an indemnity clause", metadata={"mode": "creative_writer"})
+    assert store.search_similar("Drafting an indemnity clause", n_results=1)[0]["id"] == "move_1"
+    assert store.partitions["creative_writer"].get_example_by_id("move_1")["text"] == "Drafting an indemnity clause"
+
+    # Batched metadata updates move only the examples whose mode changes
+    assert store.update_metadata_many({
+        "move_2": {"mode": "legal_assistant"},
+        "move_3": {"quality_score": 1.0},
+        "move_4": {"mode": "code_companion", "quality_score": 2.0}
+    }) == 3
+    assert store.get_example_by_id("move_2")["metadata"]["mode"] == "legal_assistant"
+    assert store.get_example_by_id("move_4")["metadata"]["quality_score"] == 2.0
+    assert not store.update_example("missing", metadata={"mode": "legal_assistant"})
+
+    stats = store.get_collection_stats()
+    assert stats["partitions"] == {"general": 0, "code_companion": 3, "legal_assistant": 2, "creative_writer": 1}
+    assert stats["total_examples"] == 6
+    assert stats["examples_by_mode"] == store.reconcile_stats()["examples_by_mode"]
+    store.close()
+    print(f"✅ Moved examples kept their text and metadata: {stats['partitions']}")
+
+
+def test_query_result_cache():
+    print("13. Testing query result cache...")
+    vector_store = make_store('query_cache_test')
+    cache_before = vector_store.query_cache.get_stats()
+    first = vector_store.search_similar("how do I reverse a string", n_results=3)
+    second = vector_store.search_similar("how do I reverse a string", n_results=3)
+    assert first == second
+    second[0]["metadata"]["mutated"] = True
+    assert "mutated" not in vector_store.search_similar("how do I reverse a string", n_results=3)[0]["metadata"]
+    cache_after = vector_store.query_cache.get_stats()
+    assert cache_after["hits"] - cache_before["hits"] == 2
+
+    new_id = vector_store.add_example("how do I reverse a string", {"mode": "code_companion"})
+    refreshed = vector_store.search_similar("how do I reverse a string", n_results=3)
+    assert refreshed[0]["id"] == new_id
+    assert vector_store.query_cache.get_stats()["invalidations"] > cache_after["invalidations"]
+    print(f"✅ Query cache hit rate {vector_store.query_cache.get_stats()['hit_rate']}, invalidated on write")
+
+
+def test_snapshot_and_restore():
+    print("14. Testing snapshot and restore...")
+    vector_store = make_store('snapshot_test')
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        manifest = vector_store.snapshot(snapshot_dir, page_size=16)
+        total = vector_store.get_collection_stats()["total_examples"]
+        assert manifest["count"] == total
+        assert np.load(os.path.join(snapshot_dir, "embeddings.npy"), mmap_mode="r").shape == \
+            (total, manifest["embedding_dimension"])
+
+        expected = [r["id"] for r in vector_store.search_similar(texts[12], n_results=5)]
+        for backend in ("numpy", "chroma"):
+            restored_store = FreeVectorStore(collection_name=f'snapshot_restore_{backend}', backend=backend)
+            restored_store.add_example("stale example that restore replaces")
+
+            # A snapshot that fails to load leaves the live collection untouched
+            broken_dir = os.path.join(snapshot_dir, "broken")
+            shutil.copytree(snapshot_dir, broken_dir, ignore=shutil.ignore_patterns("broken"))
+            with open(os.path.join(broken_dir, "records.jsonl"), "a", encoding="utf-8") as f:
+                f.write("not json\n")
+            try:
+                restored_store.restore(broken_dir, batch_size=20)
+                assert False, "Restoring a broken snapshot should fail"
+            except ValueError:
+                pass
+            shutil.rmtree(broken_dir)
+            assert restored_store.get_collection_stats()["total_examples"] == 1
+            assert restored_store.search_similar("stale example", n_results=1)[0]["text"] == \
+                "stale example that restore replaces"
+
+            restore_stats = restored_store.restore(snapshot_dir, batch_size=20)
+            assert restore_stats["restored"] == total
+            assert restore_stats["memory_mapped"] == (backend == "numpy")
+            assert restored_store.get_collection_stats()["total_examples"] == total
+            assert [r["id"] for r in restored_store.search_similar(texts[12], n_results=5)] == expected
+            assert restored_store.search_similar("list of 17 numbers", n_results=1, mode="keyword")[0]["id"] == \
+                "ex_17"
+
+        # A re-snapshot that dies partway must not leave the old manifest vouching for half-written files
+        original_iter_pages = vector_store._iter_pages
+        def failing_pages(*args, **kwargs):
+            yield next(original_iter_pages(*args, **kwargs))
+            raise OSError("disk full")
+        vector_store._iter_pages = failing_pages
+        try:
+            vector_store.snapshot(snapshot_dir, page_size=16)
+            assert False, "Snapshot should surface the write failure"
+        except OSError:
+            pass
+        finally:
+            del vector_store._iter_pages
+        assert not os.path.exists(os.path.join(snapshot_dir, "manifest.json"))
+        try:
+            restored_store.restore(snapshot_dir)
+            assert False, "An incomplete snapshot should not restore"
+        except ValueError:
+            pass
+    print(f"✅ Snapshot of {manifest['count']} examples restored into numpy and chroma without re-embedding")
+
+
+def test_background_reindex():
+    print("15. Testing background reindex to a new embedder model...")
+    for backend in ("numpy", "chroma"):
+        reindex_store = FreeVectorStore(collection_name=f'reindex_test_{backend}', backend=backend)
+        reindex_store.clear_collection()
+        reindex_store.add_examples(texts[:20], metadatas=metadatas[:20], ids=[f"re_{i}" for i in range(20)])
+
+        job = ReindexJob(
+            reindex_store, "paraphrase-MiniLM-L3-v2", workers=2, page_size=8,
+            dual_read_sample_rate=1.0, auto_cutover=False
+        )
+        progress = job.run()
+        assert progress["state"] == "awaiting_cutover" and progress["processed"] == 20
+        assert reindex_store.embedder_model != "paraphrase-MiniLM-L3-v2"
+
+        # Writes between migration and cutover are replayed into the shadow
+        reindex_store.add_example(texts[30], metadata={"mode": "general"}, custom_id="re_late")
+        reindex_store.delete_example("re_0")
+        reindex_store.search_similar(texts[5], n_results=3)
+        for _ in range(50):
+            if job.dual_reads:
+                break
+            time.sleep(0.1)
+        # Two different models need not agree exactly, only substantially
+        assert job.dual_reads > 0 and job.dual_read_agreement() >= 0.5
+
+        # While the old version drains, the new collection is only ever paired with the new model
+        cutover = {}
+        reindex_store.READ_DRAIN_TIMEOUT = 2.0
+        with reindex_store._reading() as before:
+            cutover_thread = threading.Thread(target=lambda: cutover.update(job.cutover()))
+            cutover_thread.start()
+            while reindex_store.collection is before.collection:
+                time.sleep(0.01)
+            assert reindex_store.embedder_model == "paraphrase-MiniLM-L3-v2"
+        cutover_thread.join()
+        progress = cutover
+        assert progress["state"] == "completed"
+        assert reindex_store.embedder_model == "paraphrase-MiniLM-L3-v2"
+        assert reindex_store.collection.name == f'reindex_test_{backend}'
+        assert reindex_store.get_collection_stats()["total_examples"] == 20
+        top = reindex_store.search_similar(texts[30], n_results=1)[0]
+        assert top["id"] == "re_late" and top["metadata"]["embedder_model"] == "paraphrase-MiniLM-L3-v2"
+        assert not reindex_store.collection.get(ids=["re_0"])["ids"]
+        assert not reindex_store.write_listeners and not reindex_store.read_listeners
+    print(f"✅ Reindexed {progress['total']} examples at {progress['docs_per_second']} docs/s and cut over")
+
+
+def test_dimensionality_reduction():
+    print("16. Testing embedding dimensionality reduction...")
+    for backend in ("numpy", "chroma"):
+        with tempfile.TemporaryDirectory() as projection_dir:
+            projected_store = FreeVectorStore(
+                collection_name=f'projection_test_{backend}', backend=backend, persist_directory=projection_dir
+            )
+            projected_store.add_examples(texts, metadatas=metadatas, ids=[f"pr_{i}" for i in range(50)])
+
+            report = projected_store.evaluate_projection(dimensions=(16, 32), k=5, n_queries=20)
+            assert [row["dimension"] for row in report] == [384, 32, 16]
+            assert report[0]["recall_at_5"] == 1.0 and all(0 <= row["recall_at_5"] <= 1 for row in report)
+
+            # Searches while the old version drains already use the new vectors and projection
+            fitted = {}
+            projected_store.READ_DRAIN_TIMEOUT = 2.0
+            with projected_store._reading() as before:
+                rewrite = threading.Thread(target=lambda: fitted.update(projected_store.fit_projection(32)))
+                rewrite.start()
+                while projected_store.collection is before.collection:
+                    time.sleep(0.01)
+                assert projected_store.search_similar(texts[12], n_results=1)[0]["id"] == "pr_12"
+            rewrite.join()
+            fit_stats = fitted
+            assert fit_stats["rewritten"] == 50 and fit_stats["projection"]["dimension"] == 32
+            assert projected_store.get_collection_stats()["embedding_dimension"] == 32
+            assert projected_store.collection.name == f'projection_test_{backend}'
+            assert len(projected_store.collection.get(ids=["pr_12"], include=["embeddings"])["embeddings"][0]) == 32
+            assert projected_store.search_similar(texts[12], n_results=1)[0]["id"] == "pr_12"
+
+            projected_store.add_example(texts[12] + " (projected)", custom_id="pr_new")
+            assert projected_store.search_similar(texts[12] + " (projected)", n_results=1)[0]["id"] == "pr_new"
+
+            # The projection is persisted and picked up again on reopen
+            projected_store.persist()
+            reopened = FreeVectorStore(
+                collection_name=f'projection_test_{backend}', backend=backend, persist_directory=projection_dir
+            )
+            assert reopened.projection is not None and reopened.projection.dimension == 32
+            assert reopened.search_similar(texts[7], n_results=1)[0]["id"] == "pr_7"
+
+            restore_stats = projected_store.set_projection(None)
+            assert restore_stats["rewritten"] == 51 and restore_stats["projection"] is None
+            assert projected_store.get_collection_stats()["embedding_dimension"] == 384
+            assert projected_store.search_similar(texts[12], n_results=1)[0]["id"] == "pr_12"
+    print(f"✅ Recall@5 by dimension: {[(row['dimension'], row['recall_at_5']) for row in report]}")
+
+
+def test_chunked_ingestion():
+    print("17. Testing chunked document ingestion...")
+    chunk_store = FreeVectorStore(collection_name='chunking_test', backend="numpy")
+    clauses = [f"Clause {i}. The licensee shall pay fee number {i} within {i + 30} days." for i in range(60)]
+    contract = " ".join(clauses)
+    chunker = TextChunker(max_tokens=40, overlap_tokens=8, read_size=100)
+    chunks = list(chunker.chunk(io.StringIO(contract)))
+    assert all(chunk.tokens <= 40 and contract[chunk.start:chunk.end] == chunk.text for chunk in chunks)
+    assert chunks[0].start == 0 and chunks[-1].end == len(contract)
+    assert all(later.start < earlier.end for earlier, later in zip(chunks, chunks[1:]))
+
+    ingest = chunk_store.add_document(
+        io.StringIO(contract), metadata={"mode": "legal_assistant"}, document_id="contract", chunker=chunker,
+        batch_size=4
+    )
+    assert ingest["chunks"] == len(chunks) and ingest["characters"] == chunks[-1].end
+    chunk_store.add_document("A short note about sorting lists.", document_id="note", chunker=chunker)
+    chunk_store.add_example("Standalone example about fee schedules", custom_id="standalone")
+
+    hit = chunk_store.get_example_by_id("contract#3")
+    assert hit["metadata"]["parent_id"] == "contract" and hit["metadata"]["mode"] == "legal_assistant"
+    assert hit["text"] == chunks[3].text
+
+    grouped = chunk_store.search_documents(chunks[5].text, n_results=3, chunks_per_document=2)
+    assert grouped[0]["document_id"] == "contract" and grouped[0]["chunks"][0]["id"] == "contract#5"
+    assert len(grouped[0]["chunks"]) == 2 and "chunk_index" not in grouped[0]["metadata"]
+    assert {document["document_id"] for document in grouped} == {"contract", "note", "standalone"}
+    keyword_grouped = chunk_store.search_documents("fee number 42", n_results=1, mode="keyword")
+    assert keyword_grouped[0]["document_id"] == "contract"
+
+    # With the embedder's tokenizer the budget counts word pieces, not words
+    class WordPieceTokenizer:
+        def tokenize(self, text):
+            return [text[i:i + 3] for i in range(0, len(text), 3)]
+
+    tokenizer = WordPieceTokenizer()
+    pieced = list(TextChunker(max_tokens=40, overlap_tokens=8, read_size=100, tokenizer=tokenizer).chunk(contract))
+    for chunk in pieced:
+        word_pieces = sum(len(tokenizer.tokenize(word)) for word in chunker.token_pattern.findall(chunk.text))
+        assert chunk.tokens == word_pieces <= 40 and contract[chunk.start:chunk.end] == chunk.text
+    assert len(pieced) > len(chunks)
+    assert pieced[0].start == 0 and pieced[-1].end == len(contract)
+    assert all(later.start < earlier.end for earlier, later in zip(pieced, pieced[1:]))
+
+    # Re-adding a document replaces its chunks; delete_document removes them
+    readd = chunk_store.add_document(" ".join(clauses[:10]), document_id="contract", chunker=chunker)
+    assert readd["replaced_chunks"] == len(chunks)
+    assert chunk_store.get_collection_stats()["total_examples"] == readd["chunks"] + 2
+    assert chunk_store.delete_document("contract") == readd["chunks"]
+    assert chunk_store.get_collection_stats()["total_examples"] == 2
+    print(f"✅ {len(chunks)} overlapping chunks ingested and grouped back to their documents")
+
+
+def test_reader_snapshots_during_bulk_writes():
+    print("18. Testing reader snapshots during bulk writes...")
+    for backend in ("numpy", "chroma"):
+        live_store = FreeVectorStore(
+            collection_name=f'bulk_write_test_{backend}', backend=backend, query_cache=QueryResultCache(max_entries=0)
+        )
+        live_store.clear_collection()
+        live_store.add_examples(texts[:10], ids=[f"old_{i}" for i in range(10)])
+        live_store.search_similar("warm the lexical index", n_results=1, mode="keyword")
+
+        observed = []
+        reader_errors = []
+        stop_readers = threading.Event()
+
+        def read_continuously():
+            while not stop_readers.is_set():
+                try:
+                    results = live_store.search_similar(texts[3], n_results=5)
+                    observed.append(tuple(sorted(result["id"].split("_")[0] for result in results)))
+                except Exception as e:
+                    reader_errors.append(e)
+
+        readers = [threading.Thread(target=read_continuously) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+
+        with live_store.bulk_write(replace=True) as staging:
+            for start in range(0, 40, 10):
+                staging.add_examples(texts[start:start + 10], ids=[f"new_{i}" for i in range(start, start + 10)])
+                assert live_store.search_similar(texts[3], n_results=1)[0]["id"] == "old_3"
+        assert live_store.search_similar(texts[3], n_results=1)[0]["id"] == "new_3"
+        assert live_store.get_collection_stats()["total_examples"] == 40
+        assert live_store.search_similar("list of 27 numbers", n_results=1, mode="keyword")[0]["id"] == "new_27"
+
+        # Appending starts from a copy; an exception abandons the new version
+        with live_store.bulk_write() as staging:
+            staging.add_example(texts[45], custom_id="new_45")
+        assert live_store.get_collection_stats()["total_examples"] == 41
+        try:
+            with live_store.bulk_write() as staging:
+                staging.delete_examples([f"new_{i}" for i in range(40)])
+                raise RuntimeError("abort bulk write")
+        except RuntimeError:
+            pass
+        assert live_store.get_collection_stats()["total_examples"] == 41
+        assert f'bulk_write_test_{backend}__bulk' not in [
+            getattr(collection, "name", collection) for collection in live_store.chroma_client.list_collections()
+        ]
+
+        live_store.clear_collection()
+        stop_readers.set()
+        for reader in readers:
+            reader.join()
+
+        assert not reader_errors, reader_errors
+        # Every search saw exactly one committed version: all old, all new, or empty
+        assert all(len(set(ids)) <= 1 for ids in observed)
+        assert all(len(ids) == 5 for ids in observed if ids and ids[0] == "old")
+        assert live_store.search_similar(texts[3], n_results=1) == []
+
+        # A search outlasting the drain timeout keeps its version until it finishes
+        def retired_collections():
+            return [
+                name for name in (getattr(c, "name", c) for c in live_store.chroma_client.list_collections())
+                if name.startswith(f'bulk_write_test_{backend}__retired_')
+            ]
+
+        live_store.add_examples(texts[:3], ids=[f"slow_{i}" for i in range(3)])
+        live_store.READ_DRAIN_TIMEOUT = 0.05
+        with live_store._reading() as slow_read:
+            live_store.clear_collection()
+            assert live_store.get_collection_stats()["total_examples"] == 0
+            assert slow_read.collection.count() == 3 and len(retired_collections()) == 1
+        assert retired_collections() == []
+
+        # A search during a swap's drain window uses the new collection together with its projection
+        live_store.add_examples(texts[:20], ids=[f"proj_{i}" for i in range(20)])
+        projection = EmbeddingProjection.fit(live_store._encode_full(texts[:20]), 8)
+        page = live_store.collection.get(include=["documents", "embeddings"])
+        projected = live_store._create_staging_collection("projection")
+        projected.add(
+            ids=page["ids"],
+            embeddings=projection.transform(np.asarray(page["embeddings"], dtype=np.float32)),
+            documents=page["documents"]
+        )
+
+        def swap_in_projection():
+            with live_store._write_lock:
+                live_store._replace_collection(projected, projection=projection)
+
+        live_store.READ_DRAIN_TIMEOUT = 2.0
+        with live_store._reading():
+            swap = threading.Thread(target=swap_in_projection)
+            swap.start()
+            time.sleep(0.2)
+            assert live_store.projection is projection
+            assert live_store.search_similar(texts[3], n_results=1)[0]["id"] == "proj_3"
+        swap.join()
+    print(f"✅ {len(observed)} concurrent searches each saw a single committed version")
+
+
+def test_batched_upsert():
+    print("19. Testing batched upsert and metadata updates...")
+    upsert_store = FreeVectorStore(collection_name='upsert_test', backend="numpy")
+    upsert_store.clear_collection()
+    upsert_store.add_examples(texts[:10], metadatas=metadatas[:10], ids=[f"up_{i}" for i in range(10)])
+    encodes_before = upsert_store.embedding_cache.get_stats()["misses"]
+
+    upsert_texts = texts[:5] + ["Rewritten example about merging dictionaries"] + texts[20:24]
+    upsert_ids = [f"up_{i}" for i in range(6)] + [f"up_{i}" for i in range(20, 24)]
+    upsert_stats = upsert_store.upsert_examples(
+        upsert_texts, upsert_ids, metadatas=[{"quality_score": 4.5}] * 10, batch_size=4
+    )
+    assert (upsert_stats["added"], upsert_stats["updated"], upsert_stats["reembedded"]) == (4, 6, 1)
+    # Only the rewritten text and the four new ones were embedded
+    assert upsert_store.embedding_cache.get_stats()["misses"] - encodes_before == 5
+    assert upsert_store.get_collection_stats()["total_examples"] == 14
+    assert upsert_store.search_similar("Rewritten example about merging dictionaries", n_results=1)[0]["id"] == "up_5"
+    assert upsert_store.get_example_by_id("up_2")["metadata"]["mode"] == metadatas[2]["mode"]
+
+    updated = upsert_store.update_metadata_many(
+        {f"up_{i}": {"quality_score": 1.0, "high_quality": False} for i in range(10)} | {"missing": {"a": 1}},
+        batch_size=3
+    )
+    assert updated == 10
+    assert upsert_store.embedding_cache.get_stats()["misses"] - encodes_before == 5
+    example = upsert_store.get_example_by_id("up_7")
+    assert example["metadata"]["quality_score"] == 1.0 and "updated_at" in example["metadata"]
+    assert upsert_store.get_collection_stats()["average_quality_score"] == \
+        upsert_store.reconcile_stats()["average_quality_score"]
+    print(f"✅ Upsert embedded only changed texts; {updated} metadata updates applied without re-embedding")
+
+
+def test_numpy_write_log():
+    print("20. Testing NumPy write log recovery after a crash...")
+    crash_script = """
+import os, sys
+import numpy as np
+from memory.numpy_backend import NumpyClient
+
+collection = NumpyClient(path=sys.argv[1]).get_or_create_collection("crash_test")
+vectors = np.eye(4, dtype=np.float32)
+collection.add(ids=["a", "b", "c", "d"], embeddings=vectors,
+               documents=["alpha", "beta", "gamma", "delta"], metadatas=[{"n": i} for i in range(4)])
+collection.update(ids=["b"], documents=["beta v2"], metadatas=[{"edited": True}])
+collection.delete(ids=["c"])
+# Die without persisting: atexit handlers do not run
+os._exit(0)
+"""
+    with tempfile.TemporaryDirectory() as crash_dir:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(os.path.abspath(p) for p in sys.path if p))
+        subprocess.run([sys.executable, "-c", crash_script, crash_dir], env=env, check=True)
+        assert not os.path.exists(os.path.join(crash_dir, "crash_test", "records.jsonl"))
+
+        from memory.numpy_backend import NumpyClient
+        recovered = NumpyClient(path=crash_dir).get_collection("crash_test")
+        records = recovered.get(include=["documents", "metadatas"])
+        assert sorted(records["ids"]) == ["a", "b", "d"]
+        by_id = dict(zip(records["ids"], zip(records["documents"], records["metadatas"])))
+        assert by_id["b"] == ("beta v2", {"n": 1, "edited": True})
+        assert recovered.query(query_embeddings=[[0, 0, 0, 1]], n_results=1)["ids"][0] == ["d"]
+
+        # A torn final append is dropped; persisting folds the log into the base files
+        with open(os.path.join(crash_dir, "crash_test", "wal.jsonl"), "a") as f:
+            f.write('{"op": "delete", "ids": ["a"')
+        recovered = NumpyClient(path=crash_dir).get_collection("crash_test")
+        assert recovered.count() == 3
+        recovered.persist()
+        assert not os.path.exists(os.path.join(crash_dir, "crash_test", "wal.jsonl"))
+        assert NumpyClient(path=crash_dir).get_collection("crash_test").count() == 3
+    print("✅ Writes logged before a crash were replayed on reopen")
+
+
+if __name__ == '__main__':
+    print("🧪 Testing FreeVectorStore implementation...")
+    # Failures raise, so a broken feature stops the run with a traceback and a non-zero exit
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+    print("\n🎉 Vector store tests passed!")